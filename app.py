@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import functools
+import html
 import re
+import time
+import urllib.parse
 from contextlib import contextmanager
 from datetime import date, datetime
 
+import httpx
 import pandas as pd
 import streamlit as st
-from supabase import Client, create_client
+from supabase import Client, ClientOptions, create_client
+
+import arquivamento
+import dados_async
+import espelho_local
+import exportacao
+import historico
+import importacao
+import mudancas_realtime
+import relatorios
+import visao
 
 # =========================================================
 # PAGE CONFIG
@@ -171,17 +186,71 @@ hr{ border-color: rgba(15,23,42,0.10); }
 )
 
 RETORNO_STATUS = ["Pendente", "Respondido"]
+CASO_STATUS = ["Recebido", "Distribuído", "Pendente", "Resolvido"]
+PAGE_SIZES = [20, 50, 100, 200]
+# ordenação do Acompanhamento: rótulo -> (coluna, desc); desempate sempre por id no mesmo sentido
+ORDENACOES_DASH = {
+    "Mais recentes": ("id", True),
+    "Prazo final (mais próximo)": ("prazo_final", False),
+    "Prazo final (mais distante)": ("prazo_final", True),
+    "Status": ("status", False),
+}
 STATUS_DISPLAY = {"Pendente": "🔴 Pendente", "Respondido": "🟢 Respondido"}
 DISPLAY_TO_STATUS = {v: k for k, v in STATUS_DISPLAY.items()}
 
 # =========================================================
 # Supabase client
+# - um pool httpx (HTTP/2, keep-alive) compartilhado pelo processo
+# - um Client por sessão (headers de auth próprios, sem corrida entre usuários)
 # =========================================================
+def _secret_int(name: str, default: int) -> int:
+    try:
+        return int(st.secrets.get(name, default))
+    except Exception:
+        return default
+
+
+def _secret_bool(name: str, default: bool) -> bool:
+    try:
+        return str(st.secrets.get(name, default)).strip().lower() in ("1", "true", "sim", "yes")
+    except Exception:
+        return default
+
+
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+
+def _http_limits() -> httpx.Limits:
+    # os mesmos limites no pool síncrono (supabase-py) e no assíncrono (dados_async)
+    return httpx.Limits(
+        max_connections=_secret_int("HTTP_MAX_CONNECTIONS", 50),
+        max_keepalive_connections=_secret_int("HTTP_MAX_KEEPALIVE", 20),
+        keepalive_expiry=_secret_int("HTTP_KEEPALIVE_EXPIRY", 60),
+    )
+
+
 @st.cache_resource
+def _http_pool() -> httpx.Client:
+    return httpx.Client(http2=True, follow_redirects=True, timeout=HTTP_TIMEOUT, limits=_http_limits())
+
+
 def get_supabase() -> Client:
-    url = st.secrets["SUPABASE_URL"]
-    key = st.secrets["SUPABASE_ANON_KEY"]
-    return create_client(url, key)
+    sb = st.session_state.get("__sb_client__")
+    if sb is None:
+        url = st.secrets["SUPABASE_URL"]
+        key = st.secrets["SUPABASE_ANON_KEY"]
+        sb = create_client(url, key, options=ClientOptions(httpx_client=_http_pool()))
+        st.session_state["__sb_client__"] = sb
+    return sb
+
+
+def _async_api() -> dados_async.PostgrestAsync:
+    dados_async.configurar(_http_limits(), HTTP_TIMEOUT)
+    return dados_async.PostgrestAsync(
+        st.secrets["SUPABASE_URL"],
+        st.secrets["SUPABASE_ANON_KEY"],
+        get_session_access_token(),
+    )
 
 
 def get_session_access_token() -> str | None:
@@ -191,12 +260,26 @@ def get_session_access_token() -> str | None:
     return getattr(sess, "access_token", None)
 
 
-def _sb_table(name: str):
+def _sb_remote() -> Client:
     sb = get_supabase()
     token = get_session_access_token()
     if token:
         sb.postgrest.auth(token)
-    return sb.table(name)
+    return sb
+
+
+def _sb_table(name: str):
+    esp = _espelho()
+    if esp is not None:
+        return esp.tabela(name)
+    return _sb_remote().table(name)
+
+
+def _sb_rpc(name: str, params: dict):
+    esp = _espelho()
+    if esp is not None:
+        return esp.rpc(name, params)
+    return _sb_remote().rpc(name, params)
 
 
 def _auth_set_session_from_state():
@@ -283,6 +366,175 @@ def require_auth():
     st.stop()
 
 
+# =========================================================
+# Tempo real (Supabase Realtime em casos / retornos_om / arquivados)
+# - feed por sessão; o fragmento da sidebar drena as deltas a cada poucos segundos
+# - sem realtime (secret REALTIME=false ou sem conexão) fica o botão 🔄 Atualizar
+# =========================================================
+def _realtime_feed() -> mudancas_realtime.FeedMudancas | None:
+    if not _secret_bool("REALTIME", True):
+        return None
+    feed = st.session_state.get("__sb_feed__")
+    if feed is None or not feed.ativo:
+        feed = mudancas_realtime.FeedMudancas(
+            mudancas_realtime.BroadcasterSupabase(
+                st.secrets["SUPABASE_URL"],
+                st.secrets["SUPABASE_ANON_KEY"],
+                get_session_access_token(),
+            )
+        )
+        try:
+            feed.iniciar()
+        except Exception:
+            return None
+        st.session_state["__sb_feed__"] = feed
+    return feed
+
+
+def _stop_realtime_feed():
+    feed = st.session_state.pop("__sb_feed__", None)
+    if feed is not None:
+        try:
+            feed.parar()
+        except Exception:
+            pass
+
+
+def _apply_realtime_events(feed: mudancas_realtime.FeedMudancas, eventos: list[dict]):
+    # invalida só as tabelas tocadas; caso alterado já entra no cache com a linha recebida
+    _invalidate_cache(*{ev["tabela"] for ev in eventos})
+    for ev in eventos:
+        if ev["tabela"] == "casos" and ev["tipo"] != "DELETE":
+            row = ev["registro"]
+            if row.get("id") is not None:
+                fetch_caso.prime(dict(row), int(row["id"]))
+
+
+# =========================================================
+# Espelho local (SQLite por usuário) — secret ESPELHO_LOCAL=true
+# - leituras e escritas do app vão para o SQLite (funciona offline)
+# - escritas entram numa outbox; o sync empurra a outbox e puxa só o que mudou
+# - sync a cada ESPELHO_SYNC_SECONDS (padrão 30), disparado pelo fragmento da sidebar
+# =========================================================
+def _espelho() -> espelho_local.EspelhoLocal | None:
+    if not _secret_bool("ESPELHO_LOCAL", False):
+        return None
+    user = st.session_state.get("sb_user")
+    if not user:
+        return None
+    esp = st.session_state.get("__espelho__")
+    if esp is None:
+        try:
+            pasta = str(st.secrets.get("ESPELHO_DIR", ".espelho"))
+        except Exception:
+            pasta = ".espelho"
+        esp = espelho_local.EspelhoLocal(espelho_local.caminho_padrao(pasta, user.id), owner_id=user.id)
+        st.session_state["__espelho__"] = esp
+    return esp
+
+
+def _sync_espelho(force: bool = False) -> set[str]:
+    esp = _espelho()
+    if esp is None:
+        return set()
+    agora = time.monotonic()
+    ultimo = st.session_state.get("__espelho_sync__")
+    if not force and ultimo is not None and agora - ultimo < _secret_int("ESPELHO_SYNC_SECONDS", 30):
+        return set()
+    st.session_state["__espelho_sync__"] = agora
+    alteradas = esp.sincronizar(_sb_remote())
+    if alteradas:
+        _invalidate_cache(*alteradas)
+    return alteradas
+
+
+def _close_espelho():
+    esp = st.session_state.pop("__espelho__", None)
+    st.session_state.pop("__espelho_sync__", None)
+    if esp is not None:
+        try:
+            esp.conn.close()
+        except Exception:
+            pass
+
+
+# =========================================================
+# Arquivamento automático — secret ARQUIVAR_RESOLVIDOS_DIAS=N (0 = desligado)
+# - resolvidos há mais de N dias vão para arquivados (RPC arquivar_resolvidos, sql/013)
+# - roda na abertura da sessão e depois a cada ARQUIVAR_INTERVALO_MIN (padrão 60)
+# - fora do app (job agendado): python arquivamento.py
+# =========================================================
+def _auto_arquivar() -> int:
+    dias = _secret_int("ARQUIVAR_RESOLVIDOS_DIAS", 0)
+    if dias <= 0:
+        return 0
+    agora = time.monotonic()
+    ultimo = st.session_state.get("__auto_arquivar__")
+    if ultimo is not None and agora - ultimo < _secret_int("ARQUIVAR_INTERVALO_MIN", 60) * 60:
+        return 0
+    st.session_state["__auto_arquivar__"] = agora
+    try:
+        n = arquivamento.arquivar_resolvidos(_sb_rpc, dias, _secret_int("ARQUIVAR_LOTE", arquivamento.LOTE_PADRAO))
+    except Exception:
+        return 0  # servidor sem o sql/013 ou fora do ar: tenta de novo na próxima janela
+    if n:
+        _invalidate_cache("arquivados")
+        st.toast(f"{n} caso(s) resolvido(s) há mais de {dias} dias arquivado(s) 🗄️")
+    return n
+
+
+def _refresh_poll_seconds() -> int | None:
+    if _secret_bool("ESPELHO_LOCAL", False):
+        return min(_secret_int("REALTIME_POLL_SECONDS", 5), _secret_int("ESPELHO_SYNC_SECONDS", 30))
+    if _secret_bool("REALTIME", True):
+        return _secret_int("REALTIME_POLL_SECONDS", 5)
+    return None
+
+
+@st.fragment(run_every=_refresh_poll_seconds())
+def _refresh_control():
+    if _auto_arquivar():
+        st.rerun(scope="app")
+    esp = _espelho()
+    if esp is not None:
+        if _sync_espelho():
+            st.rerun(scope="app")
+        pend = esp.pendentes()
+        if not esp.ultimo_erro:
+            st.markdown(f"<div class='small-muted' style='padding-top:10px'>💾 Local • {pend} pendentes</div>", unsafe_allow_html=True)
+        elif esp.ultimo_erro.startswith("offline"):
+            st.markdown(f"<div class='small-muted' style='padding-top:10px'>📴 Offline • {pend} pendentes</div>", unsafe_allow_html=True)
+        else:
+            st.markdown(f"<div class='small-muted' style='padding-top:10px'>⚠️ Sem sincronizar • {pend} pendentes</div>", unsafe_allow_html=True)
+            st.caption(esp.ultimo_erro)
+        if st.button("🔄 Sincronizar", use_container_width=True):
+            _sync_espelho(force=True)
+            st.rerun(scope="app")
+        falhas = esp.falhas()
+        if falhas:
+            # alterações que o servidor recusou: não voltam sozinhas para a fila
+            with st.expander(f"❌ {len(falhas)} não enviada(s)"):
+                for f in falhas:
+                    st.caption(f"{f['criado_em'][:16].replace('T', ' ')} • {f['tabela']} / {f['operacao']}: {f['erro']}")
+                if st.button("Descartar", key="descartar_falhas", use_container_width=True):
+                    esp.descartar_falhas()
+                    st.rerun(scope="app")
+        return
+
+    feed = _realtime_feed()
+    if feed is not None:
+        eventos = feed.drenar()
+        if eventos:
+            _apply_realtime_events(feed, eventos)
+            st.rerun(scope="app")
+
+    if feed is not None and feed.conectado:
+        st.markdown("<div class='small-muted' style='padding-top:10px'>🟢 Tempo real</div>", unsafe_allow_html=True)
+    elif st.button("🔄 Atualizar", use_container_width=True):
+        _invalidate_cache()
+        st.rerun(scope="app")
+
+
 def _on_change_dash_name():
     save_dash_name_to_user(st.session_state.get("dash_name", "Dashboard"))
 
@@ -314,8 +566,7 @@ def sidebar_layout() -> tuple[str, str]:
         st.markdown("---")
         c1, c2 = st.columns(2)
         with c1:
-            if st.button("🔄 Atualizar", use_container_width=True):
-                st.rerun()
+            _refresh_control()
         with c2:
             if st.button("🚪 Sair", use_container_width=True):
                 try:
@@ -324,6 +575,10 @@ def sidebar_layout() -> tuple[str, str]:
                     pass
                 st.session_state["sb_session"] = None
                 st.session_state["sb_user"] = None
+                _stop_realtime_feed()
+                _close_espelho()
+                st.session_state.pop("__sb_cache__", None)
+                st.session_state.pop("__sb_client__", None)
                 st.rerun()
 
         st.caption("v1.0 • Streamlit + Supabase")
@@ -345,129 +600,360 @@ def card_container():
 
 
 # =========================================================
-# CRUD
+# Cache de leitura (por sessão / owner_id, com TTL)
+# - leituras decoradas com _cached("tabela", ...)
+# - escritas chamam _invalidate_cache() só das tabelas tocadas
 # =========================================================
-def fetch_casos() -> pd.DataFrame:
-    res = _sb_table("casos").select("*").order("id", desc=True).execute()
-    return pd.DataFrame(res.data or [])
+def _cache_ttl() -> float:
+    try:
+        return float(st.secrets.get("CACHE_TTL_SECONDS", 60))
+    except Exception:
+        return 60.0
 
 
+def _cache_entries() -> dict:
+    user = st.session_state.get("sb_user")
+    owner_id = getattr(user, "id", None)
+    store = st.session_state.setdefault("__sb_cache__", {})
+    if store.get("owner_id") != owner_id or "entries" not in store:
+        store["owner_id"] = owner_id
+        store["entries"] = {}
+    return store["entries"]
+
+
+def _cache_copy(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, (set, list, dict)):
+        return type(value)(value)
+    if isinstance(value, tuple):
+        # páginas (DataFrame, total) do keyset
+        return tuple(_cache_copy(v) for v in value)
+    return value
+
+
+def _cached(*tables: str):
+    def deco(fn):
+        def peek(*args):
+            hit = _cache_entries().get((fn.__name__, args))
+            if hit and time.monotonic() - hit[0] < _cache_ttl():
+                return True, _cache_copy(hit[2])
+            return False, None
+
+        def prime(value, *args):
+            _cache_entries()[(fn.__name__, args)] = (time.monotonic(), frozenset(tables), value)
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            found, value = peek(*args)
+            if found:
+                return value
+            value = fn(*args)
+            prime(value, *args)
+            return _cache_copy(value)
+
+        # usados pelo prefetch assíncrono (prefetch_dashboard)
+        wrapper.peek = peek
+        wrapper.prime = prime
+        return wrapper
+
+    return deco
+
+
+def _invalidate_cache(*tables: str):
+    entries = _cache_entries()
+    if not tables:
+        entries.clear()
+        return
+    touched = set(tables)
+    for key in [k for k, v in entries.items() if v[1] & touched]:
+        entries.pop(key, None)
+    _uow_forget(*tables)
+
+
+# =========================================================
+# Mapa de identidade por rerun (casos / retornos do caso)
+# - zerado no início de cada execução do script (APP START)
+# - hidratado com linhas já carregadas (página do dashboard, busca)
+# - o resto cai no fetcher com cache: cada id é lido no máximo uma vez por render
+# - escrita numa tabela (_invalidate_cache) tira a tabela do mapa
+# =========================================================
+_UOW_TABELAS = {"casos": "casos", "retornos_om": "retornos"}
+
+
+def _uow() -> dict:
+    return st.session_state.setdefault("__uow__", {"casos": {}, "retornos": {}})
+
+
+def _uow_reset():
+    st.session_state["__uow__"] = {"casos": {}, "retornos": {}}
+
+
+def _uow_forget(*tables: str):
+    uow = _uow()
+    for t in tables or _UOW_TABELAS:
+        if t in _UOW_TABELAS:
+            uow[_UOW_TABELAS[t]].clear()
+
+
+def _uow_hydrate(df: pd.DataFrame | None):
+    # linhas de casos_dashboard trazem todas as colunas de casos (NaN vira None, como no JSON)
+    if df is None or df.empty or "id" not in df.columns:
+        return
+    casos = _uow()["casos"]
+    for rec in df.astype(object).where(df.notna(), None).to_dict("records"):
+        casos.setdefault(int(rec["id"]), rec)
+
+
+def caso_atual(caso_id: int) -> dict | None:
+    casos = _uow()["casos"]
+    cid = int(caso_id)
+    if cid not in casos:
+        casos[cid] = fetch_caso(cid)
+    return casos[cid]
+
+
+def retornos_atuais(caso_id: int) -> pd.DataFrame:
+    retornos = _uow()["retornos"]
+    cid = int(caso_id)
+    if cid not in retornos:
+        retornos[cid] = fetch_retornos(cid)
+    return retornos[cid]
+
+
+# =========================================================
+# CRUD
+# =========================================================
+@_cached("casos")
 def fetch_caso(caso_id: int) -> dict | None:
     res = _sb_table("casos").select("*").eq("id", int(caso_id)).limit(1).execute()
     data = res.data or []
     return data[0] if data else None
 
 
-def update_caso_by_id_safe(caso_id: int, payload: dict):
-    if "nr_doc_recebido" in payload and (payload["nr_doc_recebido"] is None or str(payload["nr_doc_recebido"]).strip() == ""):
-        payload["nr_doc_recebido"] = "-"
-    if "assunto_doc" in payload and (payload["assunto_doc"] is None or str(payload["assunto_doc"]).strip() == ""):
-        payload["assunto_doc"] = "-"
-    if "origem" in payload and (payload["origem"] is None or str(payload["origem"]).strip() == ""):
-        payload["origem"] = "-"
-    if "observacoes" in payload and (payload["observacoes"] is None or str(payload["observacoes"]).strip() == ""):
-        payload["observacoes"] = "-"
-    _sb_table("casos").update(payload).eq("id", int(caso_id)).execute()
+IMPORT_BATCH = 200
 
 
-def insert_documento_safe(nr_doc: str, assunto_doc: str, origem: str | None, prazo_final: date | None, obs: str | None) -> int:
+def import_documentos(arquivo, nome: str, on_progress=None) -> tuple[int, list[tuple[int, str]]]:
+    # planilha -> casos em lotes multi-linha; devolve (inseridos, [(linha, erro)])
     user = st.session_state["sb_user"]
-    nr_doc = (nr_doc or "").strip() or "-"
-    assunto_doc = (assunto_doc or "").strip() or "-"
-    origem = (origem or "").strip() if origem and origem.strip() else "-"
-    obs = (obs or "").strip() if obs and obs.strip() else "-"
-    payload = {
-        "owner_id": user.id,
-        "nr_doc_recebido": nr_doc,
-        "assunto_doc": assunto_doc,
-        "origem": origem,
-        "prazo_final": prazo_final.isoformat() if prazo_final else None,
-        "observacoes": obs,
-        "status": "Recebido",
-        "created_at": datetime.now().isoformat(),
-    }
-    res = _sb_table("casos").insert(payload).execute()
-    return int(res.data[0]["id"])
+    inseridos, erros = 0, []
+    try:
+        for bloco in importacao.ler_planilha(arquivo, nome):
+            validos, erros_bloco = importacao.validar(bloco)
+            erros += erros_bloco
+            agora = datetime.now().isoformat()
+            for linhas, registros in importacao.lotes(validos, IMPORT_BATCH):
+                payload = [{**r, "owner_id": user.id, "status": "Recebido", "created_at": agora} for r in registros]
+                try:
+                    _sb_table("casos").insert(payload).execute()
+                    inseridos += len(payload)
+                except Exception as e:
+                    erros += [(n, f"não gravado: {e}") for n in linhas]
+            if on_progress:
+                on_progress(int(bloco.index[-1]), inseridos)
+    finally:
+        if inseridos:
+            _invalidate_cache("casos")
+    return inseridos, sorted(erros)
+
+
+@_cached("retornos_om")
+def fetch_retornos(caso_id: int) -> pd.DataFrame:
+    res = _sb_table("retornos_om").select("*").eq("caso_id", int(caso_id)).order("om").execute()
+    return pd.DataFrame(res.data or [])
+
+
+IN_BATCH = 200
 
 
-def insert_solicitacao_sem_documento(assunto_solic: str, prazo_om: date | None, nr_doc_solicitado: str | None) -> int:
+def fetch_retornos_de(caso_ids: list[int]) -> list[dict]:
+    # retornos de muitos casos: in_ em fatias (a lista vai na URL)
+    ids = [int(i) for i in caso_ids]
+    out: list[dict] = []
+    for i in range(0, len(ids), IN_BATCH):
+        res = _sb_table("retornos_om").select("caso_id,om,status").in_("caso_id", ids[i : i + IN_BATCH]).execute()
+        out += res.data or []
+    return out
+
+
+def update_retornos_bulk(ret: pd.DataFrame, original: list[tuple[str, str]], edited: list[tuple[str, str]]) -> int:
+    # só as linhas que mudaram em relação ao snapshot, num único upsert por id
+    if len(original) != len(edited):
+        original = [None] * len(edited)
     user = st.session_state["sb_user"]
-    payload = {
-        "owner_id": user.id,
-        "nr_doc_recebido": "-",
-        "assunto_doc": "-",
-        "origem": "-",
-        "prazo_final": None,
-        "observacoes": "-",
-        "assunto_solic": (assunto_solic or "").strip() or "(sem solicitação)",
-        "prazo_om": prazo_om.isoformat() if prazo_om else None,
-        "nr_doc_solicitado": (nr_doc_solicitado or "").strip() or "00",
-        "status": "Distribuído",
-        "created_at": datetime.now().isoformat(),
-    }
-    res = _sb_table("casos").insert(payload).execute()
-    return int(res.data[0]["id"])
+    rows = []
+    for i, (antes, depois) in enumerate(zip(original, edited)):
+        if antes == depois:
+            continue
+        r = ret.iloc[i]
+        status, obs = depois
+        rows.append(
+            {
+                "id": int(r["id"]),
+                "owner_id": user.id,
+                "caso_id": int(r["caso_id"]),
+                "om": r["om"],
+                "status": status,
+                "observacoes": obs or None,
+            }
+        )
+    if rows:
+        _sb_table("retornos_om").upsert(rows, on_conflict="id").execute()
+        _invalidate_cache("retornos_om")
+    return len(rows)
 
 
-def fetch_retornos(caso_id: int) -> pd.DataFrame:
-    res = _sb_table("retornos_om").select("*").eq("caso_id", int(caso_id)).order("om").execute()
+def _count_method() -> str:
+    # "exact" | "planned" | "estimated" (header Content-Range do PostgREST)
+    try:
+        return str(st.secrets.get("COUNT_METHOD", "exact"))
+    except Exception:
+        return "exact"
+
+
+def _pgrst_quote(v) -> str:
+    # valor dentro de or=(...): aspas protegem vírgula, ponto e parênteses
+    return '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _keyset_filters(cursor, ordem: tuple[str, bool]) -> list[tuple[str, str, str]]:
+    # cursor = último id (ordem por id) ou (valor, id) da última linha (outras colunas, nulls last)
+    if cursor is None:
+        return []
+    col, desc = ordem
+    cmp = "lt" if desc else "gt"
+    if col == "id":
+        return [("id", cmp, str(int(cursor)))]
+    val, last_id = cursor
+    if val is None:
+        return [(col, "is", "null"), ("id", cmp, str(int(last_id)))]
+    v = _pgrst_quote(val)
+    return [("or", "", f"{col}.{cmp}.{v},and({col}.eq.{v},id.{cmp}.{int(last_id)}),{col}.is.null")]
+
+
+def _apply_filters(q, filters):
+    for col, op, val in filters:
+        q = q.or_(val) if col == "or" else q.filter(col, op, val)
+    return q
+
+
+def _order_param(ordem: tuple[str, bool]) -> str:
+    col, desc = ordem
+    d = "desc" if desc else "asc"
+    return f"id.{d}" if col == "id" else f"{col}.{d}.nullslast,id.{d}"
+
+
+def _next_cursor(df_page: pd.DataFrame, ordem: tuple[str, bool]):
+    last = df_page.iloc[-1]
+    if ordem[0] == "id":
+        return int(last["id"])
+    val = last.get(ordem[0])
+    return (None if pd.isna(val) else val, int(last["id"]))
+
+
+def _fetch_page(
+    view: str,
+    cursor,
+    limit: int,
+    filters: tuple = (),
+    ordem: tuple[str, bool] = ("id", True),
+) -> tuple[pd.DataFrame, int]:
+    # retorna (página, qtd de linhas a partir do cursor, inclusive a página)
+    res = _select_page(_sb_table, view, cursor, limit, filters, ordem, count=_count_method())
+    return pd.DataFrame(res.data or []), int(res.count or 0)
+
+
+def _select_page(tabela, view: str, cursor, limit: int, filters: tuple, ordem: tuple[str, bool], count: str | None = None):
+    col, desc = ordem
+    q = tabela(view).select("*", count=count)
+    q = _apply_filters(q, list(filters) + _keyset_filters(cursor, ordem))
+    if col != "id":
+        q = q.order(col, desc=desc, nullsfirst=False)
+    return q.order("id", desc=desc).limit(int(limit)).execute()
+
+
+EXPORT_BATCH = 1000
+
+
+def _iter_view(tabela, view: str, filters: tuple = (), ordem: tuple[str, bool] = ("id", True)):
+    # todas as linhas da view, página a página pelo mesmo keyset da tela (sem count)
+    cursor = None
+    while True:
+        df = pd.DataFrame(_select_page(tabela, view, cursor, EXPORT_BATCH, filters, ordem).data or [])
+        if df.empty:
+            return
+        yield df
+        if len(df) < EXPORT_BATCH:
+            return
+        cursor = _next_cursor(df, ordem)
+
+
+@_cached("casos", "retornos_om", "arquivados")
+def fetch_dashboard_page(cursor, limit: int, filters: tuple = (), ordem: tuple[str, bool] = ("id", True)) -> tuple[pd.DataFrame, int]:
+    return _fetch_page("casos_dashboard", cursor, limit, filters, ordem)
+
+
+@_cached("casos", "retornos_om", "arquivados")
+def fetch_busca_casos(termo: str, limit: int = 50) -> pd.DataFrame:
+    # ranking no servidor (sql/007) ou no índice em memória do espelho local
+    res = _sb_rpc("buscar_casos", {"p_q": termo, "p_limite": int(limit)}).execute()
     return pd.DataFrame(res.data or [])
 
 
-def fetch_pendencias() -> pd.DataFrame:
-    res = _sb_table("retornos_om").select("caso_id,status").execute()
-    data = res.data or []
-    if not data:
-        return pd.DataFrame(columns=["caso_id", "qtd"])
-    dff = pd.DataFrame(data)
-    dff = dff[dff["status"] == "Pendente"]
-    if dff.empty:
-        return pd.DataFrame(columns=["caso_id", "qtd"])
-    return dff.groupby("caso_id").size().reset_index(name="qtd")
-
-
-def set_resposta_e_status(caso_id: int, nr_doc_resposta: str | None):
-    nr = (nr_doc_resposta or "").strip()
-    if nr:
-        payload = {"nr_doc_resposta": nr, "status": "Resolvido", "resolved_at": date.today().isoformat()}
-    else:
-        payload = {"nr_doc_resposta": None, "status": "Pendente", "resolved_at": None}
-    _sb_table("casos").update(payload).eq("id", int(caso_id)).execute()
+def _kpis_from_rows(data: list[dict]) -> dict:
+    return data[0] if data else {"em_acompanhamento": 0, "atrasados": 0, "pendencias": 0}
+
+
+@_cached("casos", "retornos_om", "arquivados")
+def fetch_dashboard_kpis() -> dict:
+    res = _sb_table("dashboard_kpis").select("*").limit(1).execute()
+    return _kpis_from_rows(res.data or [])
+
+
+@_cached("casos", "retornos_om", "arquivados", "responsaveis_contatos")
+def fetch_cobranca_por_responsavel() -> list[dict]:
+    # pendências de casos vencidos agrupadas por OM, já com os contatos (view cobranca_por_responsavel, sql/010)
+    res = _sb_table("cobranca_por_responsavel").select("*").order("responsavel").execute()
+    return res.data or []
 
 
-def archive_caso(caso_id: int):
+def archive_casos(caso_ids: list[int]):
+    # um upsert só para toda a seleção
     user = st.session_state["sb_user"]
-    payload = {"owner_id": user.id, "caso_id": int(caso_id), "archived_at": datetime.now().isoformat()}
+    agora = datetime.now().isoformat()
+    payload = [{"owner_id": user.id, "caso_id": int(i), "archived_at": agora} for i in dict.fromkeys(caso_ids)]
+    if not payload:
+        return
     _sb_table("arquivados").upsert(payload, on_conflict="caso_id").execute()
+    _invalidate_cache("arquivados")
 
 
-def fetch_arquivados_ids() -> set[int]:
-    res = _sb_table("arquivados").select("caso_id").execute()
-    data = res.data or []
-    return set(int(x["caso_id"]) for x in data)
+@_cached("casos", "arquivados", "casos_frios")
+def fetch_arquivados_page(after_id: int | None, limit: int) -> tuple[pd.DataFrame, int]:
+    return _fetch_page("casos_arquivados", after_id, limit)
 
 
-def fetch_arquivados_casos() -> pd.DataFrame:
-    ids = fetch_arquivados_ids()
+def unarchive_casos(caso_ids: list[int]):
+    # arquivado quente só sai de arquivados; o do arquivo frio volta para casos / retornos_om (sql/014)
+    ids = [int(i) for i in dict.fromkeys(caso_ids)]
     if not ids:
-        return pd.DataFrame()
-    res = _sb_table("casos").select("*").in_("id", list(ids)).execute()
-    df = pd.DataFrame(res.data or [])
-    if df.empty:
-        return df
-    return df.sort_values("id", ascending=False)
-
-
-def unarchive_caso(caso_id: int):
-    _sb_table("arquivados").delete().eq("caso_id", int(caso_id)).execute()
+        return
+    _sb_rpc("restaurar_casos", {"p_ids": ids}).execute()
+    _invalidate_cache("retornos_om", "arquivados", "casos", "casos_frios")
 
 
-def delete_caso(caso_id: int):
-    _sb_table("retornos_om").delete().eq("caso_id", int(caso_id)).execute()
-    _sb_table("arquivados").delete().eq("caso_id", int(caso_id)).execute()
-    _sb_table("casos").delete().eq("id", int(caso_id)).execute()
+def delete_casos(caso_ids: list[int]) -> int:
+    # retornos_om + arquivados + casos (+ arquivo frio) numa transação só (sql/012, 014)
+    ids = [int(i) for i in dict.fromkeys(caso_ids)]
+    if not ids:
+        return 0
+    res = _sb_rpc("delete_casos", {"p_ids": ids}).execute()
+    _invalidate_cache("retornos_om", "arquivados", "casos", "casos_frios")
+    return int(res.data or 0)
 
 
+@_cached("master_oms")
 def get_master_oms() -> list[str]:
     res = _sb_table("master_oms").select("nome").order("nome").execute()
     return [x["nome"] for x in (res.data or [])]
@@ -484,6 +970,7 @@ def add_master_om(nome: str):
         return False, "Esse Responsável já existe."
     payload = {"owner_id": user.id, "nome": nome, "created_at": datetime.now().isoformat()}
     _sb_table("master_oms").insert(payload).execute()
+    _invalidate_cache("master_oms")
     return True, f"Responsável adicionado: {nome}"
 
 
@@ -494,50 +981,47 @@ def delete_master_oms(nomes: list[str]):
     for n in nomes:
         _sb_table("master_oms").delete().eq("nome", n).execute()
         _sb_table("retornos_om").delete().eq("om", n).execute()
+    _invalidate_cache("master_oms", "retornos_om")
     return True, "Responsáveis removidos ✅"
 
 
-def salvar_ou_atualizar_solicitacao(
-    caso_id: int,
-    assunto_solic: str | None,
+def save_caso_full(
+    caso_id: int | None,
+    nr_doc: str,
+    assunto_doc: str,
+    origem: str,
+    prazo_final: date | None,
+    obs: str,
+    assunto_solic: str,
     prazo_om: date | None,
-    selecionadas: list[str],
-    nr_doc_solicitado: str | None,
-):
-    payload = {
-        "assunto_solic": (assunto_solic or "").strip() or None,
-        "prazo_om": prazo_om.isoformat() if prazo_om else None,
-        "status": "Distribuído",
-        "nr_doc_solicitado": (nr_doc_solicitado or "").strip() or None,
-    }
-    _sb_table("casos").update(payload).eq("id", int(caso_id)).execute()
-
-    ret = fetch_retornos(int(caso_id))
-    existentes = set(ret["om"].tolist()) if not ret.empty else set()
-    selecionadas_set = set(selecionadas)
-
-    for om in list(existentes - selecionadas_set):
-        _sb_table("retornos_om").delete().eq("caso_id", int(caso_id)).eq("om", om).execute()
-
-    user = st.session_state["sb_user"]
-
-    for om in list(existentes & selecionadas_set):
-        _sb_table("retornos_om").update({"prazo_om": prazo_om.isoformat() if prazo_om else None}).eq("caso_id", int(caso_id)).eq("om", om).execute()
-
-    for om in list(selecionadas_set - existentes):
-        _sb_table("retornos_om").insert(
-            {
-                "owner_id": user.id,
-                "caso_id": int(caso_id),
-                "om": om,
-                "status": "Pendente",
-                "prazo_om": prazo_om.isoformat() if prazo_om else None,
-                "dt_resposta": None,
-                "observacoes": None,
-            }
-        ).execute()
-
-
+    nr_doc_solicitado: str,
+    responsaveis: list[str],
+    nr_doc_resposta: str,
+) -> dict:
+    # documento + solicitação + resposta numa transação (RPC, ver sql/011); devolve a linha final do caso
+    res = _sb_rpc(
+        "save_caso_full",
+        {
+            "p_caso_id": int(caso_id) if caso_id else None,
+            "p_nr_doc_recebido": nr_doc,
+            "p_assunto_doc": assunto_doc,
+            "p_origem": origem,
+            "p_prazo_final": prazo_final.isoformat() if prazo_final else None,
+            "p_observacoes": obs,
+            "p_assunto_solic": assunto_solic,
+            "p_prazo_om": prazo_om.isoformat() if prazo_om else None,
+            "p_nr_doc_solicitado": nr_doc_solicitado,
+            "p_oms": list(dict.fromkeys(responsaveis or [])),
+            "p_nr_doc_resposta": nr_doc_resposta,
+        },
+    ).execute()
+    row = res.data[0] if isinstance(res.data, list) else res.data
+    _invalidate_cache("casos", "retornos_om")
+    fetch_caso.prime(row, int(row["id"]))
+    return row
+
+
+@_cached("responsaveis_contatos")
 def fetch_contatos_responsaveis() -> pd.DataFrame:
     res = _sb_table("responsaveis_contatos").select("*").order("responsavel").order("contato_nome").execute()
     return pd.DataFrame(res.data or [])
@@ -553,10 +1037,12 @@ def insert_contato_responsavel(responsavel: str, contato_nome: str, telefone: st
         "created_at": datetime.now().isoformat(),
     }
     _sb_table("responsaveis_contatos").insert(payload).execute()
+    _invalidate_cache("responsaveis_contatos")
 
 
 def delete_contato_responsavel(contato_id: int):
     _sb_table("responsaveis_contatos").delete().eq("id", int(contato_id)).execute()
+    _invalidate_cache("responsaveis_contatos")
 
 
 def _fmt_date_iso_to_ddmmyyyy(v):
@@ -568,29 +1054,148 @@ def _fmt_date_iso_to_ddmmyyyy(v):
         return "-"
 
 
-def _parse_ddmmyyyy_to_date(s: str):
-    if not s or str(s).strip() in ["-", "NaT", "None"]:
-        return None
+def _date_column_config(layout) -> dict:
+    return {t: st.column_config.DateColumn(t, format="DD/MM/YYYY") for t in visao.colunas_data(layout)}
+
+
+# =========================================================
+# Exportação (XLSX / CSV) da visão atual
+# - o arquivo só é gerado no clique (data= callable, em outra thread):
+#   nada de session_state lá dentro, a fonte das tabelas vai resolvida
+# =========================================================
+def _tabela_export():
+    esp = _espelho()
+    return esp.tabela if esp is not None else _sb_remote().table
+
+
+def _export_buttons(key: str, nome: str, layout, paginas_fn):
+    # paginas_fn: () -> iterável de DataFrames (chamada só no clique)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M")
+    c1, c2, _ = st.columns([0.14, 0.14, 0.72], gap="small")
+    for col, fmt, rotulo in [(c1, "xlsx", "⬇️ Excel"), (c2, "csv", "⬇️ CSV")]:
+        with col:
+            st.download_button(
+                rotulo,
+                data=lambda fmt=fmt: exportacao.exportar(paginas_fn(), layout, fmt, nome),
+                file_name=f"{nome.lower()}_{stamp}.{fmt}",
+                mime=exportacao.FORMATOS[fmt],
+                on_click="ignore",
+                use_container_width=True,
+                key=f"exp_{key}_{fmt}",
+            )
+
+
+# =========================================================
+# Histórico (snapshots de anos antigos do arquivo frio, historico.py)
+# - pasta no secret HISTORICO_DIR (padrão historico)
+# - o arquivo do ano só é lido quando o ano é escolhido
+# =========================================================
+def _historico_dir() -> str:
     try:
-        return datetime.strptime(str(s).strip(), "%d/%m/%Y").date()
+        return str(st.secrets.get("HISTORICO_DIR", historico.PASTA_PADRAO))
     except Exception:
-        return None
+        return historico.PASTA_PADRAO
+
 
+def _historico_box():
+    anos = historico.snapshots(_historico_dir())
+    if not anos:
+        return
+    with st.expander("Histórico (anos antigos)", expanded=False):
+        c1, c2 = st.columns([0.2, 0.8], gap="small")
+        with c1:
+            ano = st.selectbox("Ano", sorted(anos, reverse=True), index=None, placeholder="Ano", key="hist_ano")
+        with c2:
+            termo = st.text_input("Filtrar", key="hist_busca", placeholder="🔎 nº do documento, assunto ou origem")
+        if ano is None:
+            return
+        df_h = historico.ler(anos[ano], st.session_state["sb_user"].id)
+        termo = (termo or "").strip().lower()
+        if termo and not df_h.empty:
+            texto = df_h[["nr_doc_recebido", "assunto_doc", "origem", "assunto_solic", "nr_doc_solicitado"]].fillna("").agg(" ".join, axis=1)
+            df_h = df_h[texto.str.lower().str.contains(termo, regex=False)]
+        if df_h.empty:
+            st.info("Nenhum caso encontrado.")
+            return
+        df_h_show, urgencia_h = visao.montar_tabela(df_h, visao.LAYOUT_ARQUIVADOS)
+        st.dataframe(
+            visao.estilizar(df_h_show, urgencia_h),
+            use_container_width=True,
+            hide_index=True,
+            column_config=_date_column_config(visao.LAYOUT_ARQUIVADOS),
+        )
+        st.markdown(f"<div class='small-muted'>{len(df_h)} caso(s) arquivado(s) em {ano} • somente leitura</div>", unsafe_allow_html=True)
 
-def _row_style_acompanhamento(row):
-    status = str(row.get("Status", "")).strip().lower()
-    if status == "resolvido":
-        return ["background-color: #dcfce7; color: #14532d;"] * len(row)
-    prazo = _parse_ddmmyyyy_to_date(row.get("Prazo Final", ""))
-    if prazo is None:
-        return [""] * len(row)
-    today = date.today()
-    diff = (prazo - today).days
-    if diff <= 0:
-        return ["background-color: #fee2e2; color: #7f1d1d;"] * len(row)
-    if 1 <= diff <= 5:
-        return ["background-color: #fef9c3; color: #713f12;"] * len(row)
-    return [""] * len(row)
+
+# =========================================================
+# Paginação (keyset por id desc)
+# - pg_<key>["cursors"]: pilha com o último id de cada página já vista
+# =========================================================
+def _pager_state(key: str) -> dict:
+    return st.session_state.setdefault(f"pg_{key}", {"cursors": [None], "size": PAGE_SIZES[0]})
+
+
+def _pager_reset(key: str, table_key: str):
+    pg = _pager_state(key)
+    pg["cursors"] = [None]
+    st.session_state.pop(table_key, None)
+
+
+def _load_page(key: str, fetch_page, table_key: str, *extra) -> tuple[pd.DataFrame, int]:
+    pg = _pager_state(key)
+    df_page, total = fetch_page(pg["cursors"][-1], pg["size"], *extra)
+    if df_page.empty and len(pg["cursors"]) > 1:
+        # a página atual esvaziou (arquivou/excluiu tudo): volta para a primeira
+        _pager_reset(key, table_key)
+        df_page, total = fetch_page(None, pg["size"], *extra)
+    return df_page, total
+
+
+def _pager_controls(
+    key: str,
+    df_page: pd.DataFrame,
+    remaining: int,
+    table_key: str,
+    ordem: tuple[str, bool] = ("id", True),
+):
+    pg = _pager_state(key)
+    page_no = len(pg["cursors"])
+    size = int(pg["size"])
+    # o count vem filtrado pelo cursor: soma as páginas anteriores (tamanho fixo)
+    total = (page_no - 1) * size + int(remaining)
+    n_pages = max(1, -(-total // size))
+
+    p1, p2, p3, p4 = st.columns([0.2, 0.07, 0.07, 0.66], gap="small")
+    with p1:
+        new_size = st.selectbox(
+            "Linhas por página",
+            PAGE_SIZES,
+            index=PAGE_SIZES.index(size) if size in PAGE_SIZES else 0,
+            key=f"pg_size_{key}",
+        )
+    with p2:
+        st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+        btn_prev = st.button("◀", key=f"pg_prev_{key}", disabled=page_no <= 1, use_container_width=True)
+    with p3:
+        st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+        has_next = int(remaining) > size
+        btn_next = st.button("▶", key=f"pg_next_{key}", disabled=not has_next, use_container_width=True)
+    with p4:
+        st.markdown("<div style='height: 34px;'></div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='small-muted'>Página {page_no} de {n_pages} • {total} itens</div>", unsafe_allow_html=True)
+
+    if int(new_size) != size:
+        pg["size"] = int(new_size)
+        _pager_reset(key, table_key)
+        st.rerun()
+    if btn_prev:
+        pg["cursors"].pop()
+        st.session_state.pop(table_key, None)
+        st.rerun()
+    if btn_next:
+        pg["cursors"].append(_next_cursor(df_page, ordem))
+        st.session_state.pop(table_key, None)
+        st.rerun()
 
 
 DOC_KEYS = [
@@ -638,7 +1243,7 @@ def _apply_clear_doc_box():
 
 
 def _apply_load_selected_into_doc_box(caso_id: int):
-    caso = fetch_caso(int(caso_id)) or {}
+    caso = caso_atual(int(caso_id)) or {}
 
     def _un_dash(x):
         return "" if x in [None, "-"] else x
@@ -654,7 +1259,7 @@ def _apply_load_selected_into_doc_box(caso_id: int):
     st.session_state["sol_doc_solicitado"] = _un_dash(caso.get("nr_doc_solicitado"))
     st.session_state["resp_nr_doc_resposta"] = _un_dash(caso.get("nr_doc_resposta"))
 
-    ret = fetch_retornos(int(caso_id))
+    ret = retornos_atuais(int(caso_id))
     st.session_state["sol_responsaveis"] = ret["om"].fillna("").astype(str).tolist() if not ret.empty else []
 
 
@@ -679,6 +1284,294 @@ def build_msg_cobranca(caso: dict, ret: pd.DataFrame) -> str:
     )
 
 
+def _whatsapp_link(telefone, texto: str | None = None) -> str:
+    link = f"https://web.whatsapp.com/send?phone=55{''.join(filter(str.isdigit, str(telefone)))}"
+    return link + (f"&text={urllib.parse.quote(texto)}" if texto else "")
+
+
+def build_msg_cobranca_responsavel(responsavel: str, itens: list[dict]) -> str:
+    blocos = [
+        f"📌 Assunto: {it.get('assunto_solic') or '-'}\n"
+        f"📄 Nr Doc: {it.get('nr_doc_solicitado') or '-'}\n"
+        f"⏳ Prazo: {_fmt_date_iso_to_ddmmyyyy(it.get('prazo_om') or it.get('prazo_final'))}"
+        for it in itens
+    ]
+    return (
+        "🚨 Atenção!\n\n"
+        f"Solicito verificar a situação dos retornos de {responsavel} referentes às seguintes solicitações "
+        f"({len(itens)} pendente(s), prazo vencido):\n\n" + "\n\n".join(blocos) + "\n"
+    )
+
+
+def build_msgs_cobranca() -> list[dict]:
+    # uma mensagem por responsável, com os contatos para o WhatsApp (uma consulta só, sql/010)
+    out = []
+    for r in fetch_cobranca_por_responsavel():
+        out.append(
+            {
+                "responsavel": r["responsavel"],
+                "qtd": int(r["qtd"]),
+                "mensagem": build_msg_cobranca_responsavel(r["responsavel"], r.get("itens") or []),
+                "contatos": [(c.get("contato_nome") or "-", c.get("telefone") or "") for c in r.get("contatos") or []],
+            }
+        )
+    return out
+
+
+def prefetch_dashboard(selected_id: int | None):
+    # dispara juntas (asyncio) só as leituras do dashboard que não estão no cache;
+    # depois os fetchers síncronos do script encontram tudo pronto
+    if _espelho() is not None:
+        return  # com o espelho local as leituras já são locais
+    pg = _pager_state("dash")
+    cursor, size = pg["cursors"][-1], int(pg["size"])
+    filtros, ordem = _filtros_dash()
+    api = _async_api()
+
+    jobs = [] if _busca_dash() else [
+        (
+            fetch_dashboard_page,
+            (cursor, size, filtros, ordem),
+            lambda: api.select(
+                "casos_dashboard",
+                filters=list(filtros) + _keyset_filters(cursor, ordem),
+                order=_order_param(ordem),
+                limit=size,
+                count=_count_method(),
+            ),
+            lambda rows, n: (pd.DataFrame(rows), int(n or 0)),
+        ),
+    ]
+    jobs += [
+        (fetch_dashboard_kpis, (), lambda: api.select("dashboard_kpis", limit=1), lambda rows, n: _kpis_from_rows(rows)),
+        (get_master_oms, (), lambda: api.select("master_oms", columns="nome", order="nome"), lambda rows, n: [x["nome"] for x in rows]),
+    ]
+    if selected_id:
+        sid = int(selected_id)
+        # a linha selecionada normalmente já veio na página em cache: sem leitura de casos
+        if not _busca_dash():
+            found, cached = fetch_dashboard_page.peek(cursor, size, filtros, ordem)
+            if found:
+                _uow_hydrate(cached[0])
+        if sid not in _uow()["casos"]:
+            jobs.append(
+                (fetch_caso, (sid,), lambda: api.select("casos", filters=[("id", "eq", sid)], limit=1), lambda rows, n: rows[0] if rows else None)
+            )
+        jobs.append(
+            (fetch_retornos, (sid,), lambda: api.select("retornos_om", filters=[("caso_id", "eq", sid)], order="om"), lambda rows, n: pd.DataFrame(rows))
+        )
+
+    missing = {i: make() for i, (fn, args, make, _) in enumerate(jobs) if not fn.peek(*args)[0]}
+    for i, (rows, n) in dados_async.gather(missing).items():
+        fn, args, _, shape = jobs[i]
+        fn.prime(shape(rows, n), *args)
+
+
+def _busca_dash() -> str:
+    return str(st.session_state.get("busca_dash") or "").strip()
+
+
+def _on_change_busca_dash():
+    # linhas mudam de posição: a seleção antiga apontaria para outro caso
+    st.session_state.pop("tbl_dash", None)
+
+
+def _import_box():
+    res = st.session_state.get("__import_result__")
+    with st.expander("Importar planilha", expanded=bool(res)):
+        st.caption("Colunas: Nr Doc, Assunto, Origem, Prazo Final (dd/mm/aaaa) e Obs — uma linha por documento (.xlsx ou .csv).")
+        arq = st.file_uploader(
+            "Planilha",
+            type=["xlsx", "csv"],
+            key="imp_arquivo",
+            label_visibility="collapsed",
+            on_change=lambda: st.session_state.pop("__import_result__", None),
+        )
+        if st.button("Importar", key="btn_importar", type="primary", disabled=arq is None):
+            andamento = st.empty()
+            try:
+                n, erros = import_documentos(
+                    arq,
+                    arq.name,
+                    lambda linha, ok: andamento.caption(f"Linha {linha} • {ok} importado(s)..."),
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.session_state["__import_result__"] = {"arquivo": arq.name, "inseridos": n, "erros": erros}
+                st.rerun()
+
+        if res:
+            st.success(f"{res['inseridos']} documento(s) importado(s) de {res['arquivo']}.")
+            if res["erros"]:
+                st.warning(f"{len(res['erros'])} linha(s) não importada(s):")
+                st.dataframe(pd.DataFrame(res["erros"], columns=["Linha", "Erro"]), hide_index=True, use_container_width=True)
+
+
+RELATORIOS = {
+    "Cartas em PDF (ZIP)": ("pdf", "zip"),
+    "Cartas em DOCX (ZIP)": ("docx", "zip"),
+    "Cartas em PDF único": ("pdf", "pdf"),
+    "Pendências por responsável (PDF)": ("consolidado", "pdf"),
+}
+
+
+def gerar_relatorio(casos: list[dict], tipo: str, consolidado: bool) -> tuple[str, bytes, str, int]:
+    # (nome do arquivo, bytes, mime, qtd de cartas)
+    formato, saida = RELATORIOS[tipo]
+    cartas = relatorios.montar_cartas(casos, fetch_retornos_de([c["id"] for c in casos]))
+    grupos = None
+    if formato == "consolidado" or consolidado:
+        grupos = relatorios.montar_pendencias(cartas, fetch_contatos_responsaveis().to_dict("records"))
+    stamp = datetime.now().strftime("%Y%m%d_%H%M")
+    if formato == "consolidado":
+        return f"pendencias_{stamp}.pdf", relatorios.pdf_pendencias(grupos), relatorios.FORMATOS["pdf"], len(cartas)
+    if saida == "pdf":
+        return f"cobrancas_{stamp}.pdf", relatorios.gerar_pdf_unico(cartas), relatorios.FORMATOS["pdf"], len(cartas)
+    return f"cobrancas_{stamp}.zip", relatorios.gerar_zip(cartas, formato, grupos), relatorios.FORMATOS["zip"], len(cartas)
+
+
+def _relatorios_box(termo: str, df_busca: pd.DataFrame, filtros: tuple, ordem: tuple[str, bool]):
+    res = st.session_state.get("__relatorio__")
+    with st.expander("Relatórios de cobrança", expanded=bool(res)):
+        st.caption("Casos com pendência da visão atual (busca e filtros aplicados).")
+        r1, r2 = st.columns([0.6, 0.4], gap="small")
+        with r1:
+            tipo = st.radio("Relatório", list(RELATORIOS), key="rel_tipo", label_visibility="collapsed")
+        with r2:
+            consolidado = st.checkbox(
+                "Incluir pendências por responsável",
+                key="rel_consolidado",
+                disabled=RELATORIOS[tipo][1] != "zip",
+            )
+        if st.button("Gerar", key="btn_rel_gerar", type="primary"):
+            with st.spinner("Gerando..."):
+                if termo:
+                    casos = df_busca.to_dict("records")
+                else:
+                    casos = [
+                        r
+                        for df in _iter_view(_sb_table, "casos_dashboard", filtros + (("pendencias_qtd", "gt", "0"),), ordem)
+                        for r in df.to_dict("records")
+                    ]
+                nome, dados, mime, n = gerar_relatorio(casos, tipo, consolidado)
+            if not n:
+                st.session_state.pop("__relatorio__", None)
+                st.info("Nenhum caso com pendência na visão atual.")
+            else:
+                st.session_state["__relatorio__"] = {"nome": nome, "dados": dados, "mime": mime, "qtd": n}
+                st.rerun()
+
+        if res:
+            st.download_button(
+                f"⬇️ {res['nome']} ({res['qtd']} caso(s))",
+                data=res["dados"],
+                file_name=res["nome"],
+                mime=res["mime"],
+                on_click="ignore",
+                key="btn_rel_baixar",
+            )
+
+
+def _cobranca_box():
+    with st.expander("Cobrança por responsável", expanded=bool(st.session_state.get("cob_ativa"))):
+        if not st.session_state.get("cob_ativa"):
+            st.caption("Uma mensagem por responsável com todas as pendências de casos vencidos.")
+            if st.button("Montar mensagens", key="btn_cob_montar", type="primary"):
+                st.session_state["cob_ativa"] = True
+                st.rerun()
+            return
+
+        msgs = build_msgs_cobranca()
+        h1, h2 = st.columns([0.8, 0.2], gap="small")
+        with h1:
+            st.caption(f"{len(msgs)} responsável(is) • {sum(m['qtd'] for m in msgs)} pendência(s) em casos vencidos")
+        with h2:
+            if st.button("Fechar", key="btn_cob_fechar", use_container_width=True):
+                st.session_state.pop("cob_ativa", None)
+                st.rerun()
+        if not msgs:
+            st.info("Nenhuma pendência em caso vencido.")
+        for m in msgs:
+            st.markdown(f"**{html.escape(m['responsavel'])}** • {m['qtd']} pendência(s)")
+            chave = f"cob_msg_{m['responsavel']}"
+            if st.session_state.get(f"{chave}__base") != m["mensagem"]:
+                # pendências mudaram (novas / respondidas): a edição antiga não vale para o texto novo
+                st.session_state[f"{chave}__base"] = m["mensagem"]
+                st.session_state.pop(chave, None)
+            texto = st.text_area("Mensagem", value=m["mensagem"], key=chave, height=160, label_visibility="collapsed")
+            if m["contatos"]:
+                cols = st.columns(min(len(m["contatos"]), 4), gap="small")
+                for j, (nome, tel) in enumerate(m["contatos"]):
+                    with cols[j % len(cols)]:
+                        st.link_button(f"🟢 {nome}", _whatsapp_link(tel, texto), use_container_width=True)
+            else:
+                st.caption("Sem contato cadastrado para este responsável.")
+
+
+FILTROS_DASH_KEYS = ["flt_status", "flt_origem", "flt_prazo_de", "flt_prazo_ate", "flt_atrasados", "flt_pendentes", "flt_responsavel"]
+
+
+def _filtros_dash() -> tuple[tuple[tuple[str, str, str], ...], tuple[str, bool]]:
+    # estado dos controles -> filtros do PostgREST (col, op, critério) + ordenação
+    ss = st.session_state
+    f: list[tuple[str, str, str]] = []
+    if ss.get("flt_status"):
+        f.append(("status", "in", "(" + ",".join(_pgrst_quote(x) for x in ss["flt_status"]) + ")"))
+    origem = str(ss.get("flt_origem") or "").strip()
+    if origem:
+        f.append(("origem", "ilike", f"*{origem}*"))
+    if ss.get("flt_prazo_de"):
+        f.append(("prazo_final", "gte", ss["flt_prazo_de"].isoformat()))
+    if ss.get("flt_prazo_ate"):
+        f.append(("prazo_final", "lte", ss["flt_prazo_ate"].isoformat()))
+    if ss.get("flt_atrasados"):
+        # o prazo deixa o índice (owner_id, prazo_final) trabalhar; atrasado fecha a regra do status
+        f.append(("prazo_final", "lte", date.today().isoformat()))
+        f.append(("atrasado", "is", "true"))
+    if ss.get("flt_pendentes"):
+        f.append(("pendencias_qtd", "gt", "0"))
+    if ss.get("flt_responsavel"):
+        f.append(("responsaveis", "cs", "{" + _pgrst_quote(ss["flt_responsavel"]) + "}"))
+    return tuple(f), ORDENACOES_DASH.get(ss.get("flt_ordem"), ORDENACOES_DASH["Mais recentes"])
+
+
+def _on_change_filtros_dash():
+    _pager_reset("dash", "tbl_dash")
+
+
+def _clear_filtros_dash():
+    for k in FILTROS_DASH_KEYS:
+        st.session_state.pop(k, None)
+    _pager_reset("dash", "tbl_dash")
+
+
+def _filtros_dash_controls(n_ativos: int):
+    label = f"Filtros ({n_ativos})" if n_ativos else "Filtros"
+    with st.expander(label, expanded=False):
+        f1, f2, f3, f4 = st.columns([1.2, 1.0, 0.8, 0.8], gap="small")
+        with f1:
+            st.multiselect("Status", CASO_STATUS, key="flt_status", on_change=_on_change_filtros_dash)
+            st.text_input("Origem", key="flt_origem", on_change=_on_change_filtros_dash)
+        with f2:
+            st.selectbox(
+                "Responsável",
+                [""] + get_master_oms(),
+                key="flt_responsavel",
+                format_func=lambda x: x or "Todos",
+                on_change=_on_change_filtros_dash,
+            )
+            st.selectbox("Ordenar por", list(ORDENACOES_DASH), key="flt_ordem", on_change=_on_change_filtros_dash)
+        with f3:
+            st.date_input("Prazo final de", value=None, key="flt_prazo_de", format="DD/MM/YYYY", on_change=_on_change_filtros_dash)
+            st.date_input("até", value=None, key="flt_prazo_ate", format="DD/MM/YYYY", on_change=_on_change_filtros_dash)
+        with f4:
+            st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+            st.checkbox("Só atrasados", key="flt_atrasados", on_change=_on_change_filtros_dash)
+            st.checkbox("Com pendências", key="flt_pendentes", on_change=_on_change_filtros_dash)
+            st.button("Limpar filtros", key="flt_limpar", on_click=_clear_filtros_dash, use_container_width=True)
+
+
 def _snapshot_from_editor(edited_df: pd.DataFrame) -> list[tuple[str, str]]:
     snap: list[tuple[str, str]] = []
     for _, r in edited_df.iterrows():
@@ -693,6 +1586,10 @@ def _snapshot_from_editor(edited_df: pd.DataFrame) -> list[tuple[str, str]]:
 # APP START
 # =========================================================
 require_auth()
+_uow_reset()
+if _espelho() is not None and "__espelho_sync__" not in st.session_state:
+    _sync_espelho(force=True)  # primeira carga do espelho antes de desenhar
+_auto_arquivar()
 page, dash_title = sidebar_layout()
 _apply_defaults_if_missing()
 
@@ -701,6 +1598,9 @@ if st.session_state.pop("__clear_doc_box__", False):
     st.session_state["current_selected_id"] = None
     st.session_state["pending_select_id"] = None
 
+if page == f"📋 {dash_title}":
+    prefetch_dashboard(st.session_state.get("pending_select_id") or st.session_state.get("current_selected_id"))
+
 pending = st.session_state.get("pending_select_id")
 if pending is not None:
     st.session_state["current_selected_id"] = int(pending)
@@ -713,27 +1613,22 @@ if pending is not None:
 if page == f"📋 {dash_title}":
     hoje = date.today()
 
-    df = fetch_casos()
-    arq_ids = fetch_arquivados_ids()
-    df_acomp = df[~df["id"].astype(int).isin(arq_ids)].copy() if not df.empty else pd.DataFrame()
-
-    pend = fetch_pendencias()
-    pend_total = int(pend["qtd"].sum()) if not pend.empty else 0
-
-    atrasados = 0
-    if not df_acomp.empty and "prazo_final" in df_acomp.columns:
-        prazos = pd.to_datetime(df_acomp["prazo_final"], errors="coerce").dt.date
-        status = df_acomp.get("status", pd.Series([""] * len(df_acomp))).astype(str).str.lower()
-        mask = prazos.notna() & (prazos <= hoje) & (status != "resolvido")
-        atrasados = int(mask.sum())
+    termo_busca = _busca_dash()
+    filtros_dash, ordem_dash = _filtros_dash()
+    if termo_busca:
+        df_acomp, rest_acomp = fetch_busca_casos(termo_busca), 0
+    else:
+        df_acomp, rest_acomp = _load_page("dash", fetch_dashboard_page, "tbl_dash", filtros_dash, ordem_dash)
+    _uow_hydrate(df_acomp)
+    kpis = fetch_dashboard_kpis()
 
     st.title(f"📋 {dash_title}")
     st.markdown('<div class="small-muted">Visão geral, pendências e acompanhamento</div>', unsafe_allow_html=True)
 
     k1, k2, k3, k4 = st.columns(4)
-    k1.metric("Em acompanhamento", 0 if df_acomp.empty else len(df_acomp))
-    k2.metric("Atrasados", atrasados)
-    k3.metric("Pendências", pend_total)
+    k1.metric("Em acompanhamento", int(kpis.get("em_acompanhamento") or 0))
+    k2.metric("Atrasados", int(kpis.get("atrasados") or 0))
+    k3.metric("Pendências", int(kpis.get("pendencias") or 0))
     k4.metric("Hoje", hoje.strftime("%d/%m/%Y"))
     st.divider()
 
@@ -785,59 +1680,22 @@ if page == f"📋 {dash_title}":
                     responsaveis = st.session_state.get("sol_responsaveis") or []
                     nr_resp = (st.session_state.get("resp_nr_doc_resposta") or "").strip()
 
-                    try:
-                        if sel_id:
-                            update_payload = {
-                                "nr_doc_recebido": nr_doc,
-                                "assunto_doc": assunto_doc,
-                                "origem": origem,
-                                "prazo_final": prazo_final.isoformat() if prazo_final else None,
-                                "observacoes": obs_doc,
-                                "assunto_solic": assunto_solic or None,
-                                "prazo_om": prazo_om.isoformat() if prazo_om else None,
-                                "nr_doc_solicitado": nr_solic or None,
-                            }
-                            update_caso_by_id_safe(int(sel_id), update_payload)
-
-                            if assunto_solic or nr_solic or prazo_om or responsaveis:
-                                salvar_ou_atualizar_solicitacao(
-                                    caso_id=int(sel_id),
-                                    assunto_solic=assunto_solic or None,
-                                    prazo_om=prazo_om,
-                                    selecionadas=responsaveis,
-                                    nr_doc_solicitado=nr_solic or "00",
-                                )
-
-                            set_resposta_e_status(int(sel_id), nr_resp)
-                            st.toast("Atualizado ✅")
-                            st.rerun()
-                        else:
-                            if nr_doc or assunto_doc or origem or prazo_final or obs_doc:
-                                new_id = insert_documento_safe(nr_doc, assunto_doc, origem or None, prazo_final, obs_doc or None)
-                                if assunto_solic or nr_solic or prazo_om or responsaveis:
-                                    salvar_ou_atualizar_solicitacao(
-                                        caso_id=int(new_id),
-                                        assunto_solic=assunto_solic or None,
-                                        prazo_om=prazo_om,
-                                        selecionadas=responsaveis,
-                                        nr_doc_solicitado=nr_solic or "00",
-                                    )
-                                set_resposta_e_status(int(new_id), nr_resp)
-                                st.session_state["pending_select_id"] = int(new_id)
-                                st.toast("Salvo ✅")
-                                st.rerun()
-                            elif assunto_solic:
-                                new_id = insert_solicitacao_sem_documento(assunto_solic, prazo_om, nr_solic or "00")
-                                if responsaveis:
-                                    salvar_ou_atualizar_solicitacao(int(new_id), assunto_solic, prazo_om, responsaveis, nr_solic or "00")
-                                set_resposta_e_status(int(new_id), nr_resp)
-                                st.session_state["pending_select_id"] = int(new_id)
-                                st.toast("Salvo ✅")
-                                st.rerun()
+                    if not (sel_id or nr_doc or assunto_doc or origem or prazo_final or obs_doc or assunto_solic):
+                        st.error("Preencha algum campo para salvar.")
+                    else:
+                        try:
+                            row = save_caso_full(
+                                sel_id, nr_doc, assunto_doc, origem, prazo_final, obs_doc,
+                                assunto_solic, prazo_om, nr_solic, responsaveis, nr_resp,
+                            )
+                            if sel_id:
+                                st.toast("Atualizado ✅")
                             else:
-                                st.error("Preencha algum campo para salvar.")
-                    except Exception as e:
-                        st.error(f"Erro ao salvar: {e}")
+                                st.session_state["pending_select_id"] = int(row["id"])
+                                st.toast("Salvo ✅")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Erro ao salvar: {e}")
 
                 if st.button("Limpar", key="btn_clear_doc", use_container_width=True):
                     st.session_state.pop("tbl_dash", None)
@@ -846,27 +1704,26 @@ if page == f"📋 {dash_title}":
                     _request_clear_doc_box()
                     st.rerun()
 
+    _import_box()
+    _relatorios_box(termo_busca, df_acomp, filtros_dash, ordem_dash)
+    _cobranca_box()
+
+    st.text_input(
+        "Buscar",
+        key="busca_dash",
+        placeholder="🔎 Buscar por nº do documento, assunto ou origem",
+        label_visibility="collapsed",
+        on_change=_on_change_busca_dash,
+    )
+    _filtros_dash_controls(sum(1 for k in FILTROS_DASH_KEYS if st.session_state.get(k)))
+
     if df_acomp.empty:
-        st.info("Nenhum item em acompanhamento.")
+        if termo_busca or filtros_dash:
+            st.info("Nenhum caso encontrado.")
+        else:
+            st.info("Nenhum item em acompanhamento.")
     else:
-        pend_map = {int(r["caso_id"]): int(r["qtd"]) for _, r in pend.iterrows()} if not pend.empty else {}
-        df_acomp["Pendências (Qtd)"] = df_acomp["id"].astype(int).map(lambda x: pend_map.get(int(x), 0))
-
-        df_show = pd.DataFrame(
-            {
-                "Id": df_acomp["id"].astype(int),
-                "Origem": df_acomp.get("origem").fillna("-"),
-                "Nr Doc (Recebido)": df_acomp["nr_doc_recebido"].fillna("-"),
-                "Assunto (Documento)": df_acomp["assunto_doc"].fillna("-"),
-                "Prazo Final": pd.to_datetime(df_acomp.get("prazo_final"), errors="coerce").dt.strftime("%d/%m/%Y").fillna("-"),
-                "Nr Doc (Solicitado)": df_acomp.get("nr_doc_solicitado").fillna("-"),
-                "Assunto (Solicitação)": df_acomp.get("assunto_solic").fillna("-"),
-                "Prazo OM": pd.to_datetime(df_acomp.get("prazo_om"), errors="coerce").dt.strftime("%d/%m/%Y").fillna("-"),
-                "Pendências (Qtd)": df_acomp["Pendências (Qtd)"],
-                "Status": df_acomp.get("status").fillna("-"),
-                "Nr Doc (Resposta)": df_acomp.get("nr_doc_resposta").fillna("-"),
-            }
-        )
+        df_show, urgencia = visao.montar_tabela(df_acomp, visao.LAYOUT_ACOMPANHAMENTO)
 
         topL, topR = st.columns([1, 0.22])
         with topL:
@@ -875,20 +1732,32 @@ if page == f"📋 {dash_title}":
             st.markdown("<div style='padding-top:6px'></div>", unsafe_allow_html=True)
             btn_arquivar = st.button("🗄️ Arquivar", type="primary", key="dash_btn_arquivar")
 
-        df_styled = df_show.style.apply(_row_style_acompanhamento, axis=1)
+        df_styled = visao.estilizar(df_show, urgencia)
         sel = st.dataframe(
             df_styled,
             use_container_width=True,
             hide_index=True,
-            selection_mode="single-row",
+            column_config=_date_column_config(visao.LAYOUT_ACOMPANHAMENTO),
+            selection_mode="multi-row",
             on_select="rerun",
             key="tbl_dash",
         )
-
-        clicked_id = None
-        if sel and sel.get("selection", {}).get("rows"):
-            idx = sel["selection"]["rows"][0]
-            clicked_id = int(df_show.iloc[idx]["Id"])
+        if termo_busca:
+            st.markdown(f"<div class='small-muted'>{len(df_acomp)} resultado(s) para “{html.escape(termo_busca)}”</div>", unsafe_allow_html=True)
+            _export_buttons("dash", "Acompanhamento", visao.LAYOUT_ACOMPANHAMENTO, lambda df=df_acomp: [df])
+        else:
+            _pager_controls("dash", df_acomp, rest_acomp, "tbl_dash", ordem_dash)
+            tabela = _tabela_export()
+            _export_buttons(
+                "dash",
+                "Acompanhamento",
+                visao.LAYOUT_ACOMPANHAMENTO,
+                lambda: _iter_view(tabela, "casos_dashboard", filtros_dash, ordem_dash),
+            )
+
+        # uma linha: abre no formulário; várias: só para ações em lote
+        sel_ids = [int(df_show.iloc[i]["Id"]) for i in (sel or {}).get("selection", {}).get("rows", []) if i < len(df_show)]
+        clicked_id = sel_ids[0] if len(sel_ids) == 1 else None
 
         prev_id = st.session_state.get("current_selected_id")
 
@@ -904,17 +1773,19 @@ if page == f"📋 {dash_title}":
 
         selected_id = st.session_state.get("current_selected_id")
 
-        if btn_arquivar and selected_id:
-            archive_caso(int(selected_id))
-            st.toast("Arquivado ✅")
+        if btn_arquivar and sel_ids:
+            archive_casos(sel_ids)
+            st.toast(f"{len(sel_ids)} arquivado(s) ✅")
+            st.session_state.pop("tbl_dash", None)
+            st.session_state["current_selected_id"] = None
             _request_clear_doc_box()
             st.rerun()
-        elif btn_arquivar and not selected_id:
-            st.warning("Selecione uma linha na tabela.")
+        elif btn_arquivar:
+            st.warning("Selecione uma ou mais linhas na tabela.")
 
         if selected_id:
-            caso = fetch_caso(int(selected_id)) or {}
-            ret = fetch_retornos(int(selected_id))
+            caso = caso_atual(int(selected_id)) or {}
+            ret = retornos_atuais(int(selected_id))
 
             with st.expander("Mensagem", expanded=False):
                 msg_key = f"msg_edit_{selected_id}"
@@ -926,7 +1797,6 @@ if page == f"📋 {dash_title}":
                     st.info("Sem responsáveis cadastrados.")
                 else:
                     ret = ret.sort_values("om").reset_index(drop=True)
-                    retorno_ids = ret["id"].astype(int).tolist()
 
                     def to_display_status(s: str) -> str:
                         s0 = (s or "Pendente").strip().title()
@@ -980,14 +1850,10 @@ if page == f"📋 {dash_title}":
                         cc1, cc2 = st.columns([0.22, 0.78], gap="small")
                         with cc1:
                             if st.button("Confirmar", key=f"btn_confirm_save_ret_{selected_id}"):
-                                for i, row in edited.reset_index(drop=True).iterrows():
-                                    rid = retorno_ids[i]
-                                    disp = (row.get("Status") or STATUS_DISPLAY["Pendente"]).strip()
-                                    new_status = DISPLAY_TO_STATUS.get(disp, "Pendente")
-                                    new_obs = (row.get("Obs") or "").strip() or None
-                                    _sb_table("retornos_om").update({"status": new_status, "observacoes": new_obs}).eq("id", int(rid)).execute()
-
-                                st.session_state[orig_key] = _snapshot_from_editor(edited)
+                                novo_snapshot = _snapshot_from_editor(edited)
+                                update_retornos_bulk(ret, st.session_state.get(orig_key, []), novo_snapshot)
+
+                                st.session_state[orig_key] = novo_snapshot
                                 st.session_state.pop(f"confirm_save_ret_{selected_id}", None)
                                 st.toast("Alterações salvas ✅")
                                 st.rerun()
@@ -1073,7 +1939,7 @@ elif page == "👥 Responsável":
 
         row = df_view[(df_view["Responsável"] == resp_sel) & (df_view["Nome"] == nome_sel)].iloc[0]
         telefone = row["Telefone"]
-        link = f"https://web.whatsapp.com/send?phone=55{''.join(filter(str.isdigit, str(telefone)))}"
+        link = _whatsapp_link(telefone)
 
         with a3:
             st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
@@ -1102,72 +1968,65 @@ else:
     st.title("🗄️ Arquivados")
     st.divider()
 
-    df_a = fetch_arquivados_casos()
+    df_a, rest_arq = _load_page("arq", fetch_arquivados_page, "tbl_arq")
     if df_a.empty:
         st.info("Nenhum documento arquivado.")
     else:
-        df_a_show = pd.DataFrame(
-            {
-                "Id": df_a["id"].astype(int),
-                "Origem": df_a.get("origem").fillna("-"),
-                "Nr Doc (Recebido)": df_a["nr_doc_recebido"].fillna("-"),
-                "Assunto (Documento)": df_a["assunto_doc"].fillna("-"),
-                "Prazo Final": pd.to_datetime(df_a.get("prazo_final"), errors="coerce").dt.strftime("%d/%m/%Y").fillna("-"),
-                "Nr Doc (Solicitado)": df_a.get("nr_doc_solicitado").fillna("-"),
-                "Assunto (Solicitação)": df_a.get("assunto_solic").fillna("-"),
-                "Prazo OM": pd.to_datetime(df_a.get("prazo_om"), errors="coerce").dt.strftime("%d/%m/%Y").fillna("-"),
-                "Nr Doc (Resposta)": df_a.get("nr_doc_resposta").fillna("-"),
-                "Status": df_a.get("status").fillna("-"),
-            }
-        )
+        df_a_show, urgencia_a = visao.montar_tabela(df_a, visao.LAYOUT_ARQUIVADOS)
 
         tL, tR1, tR2 = st.columns([1, 0.12, 0.12], gap="small")
         with tL:
             st.subheader("Arquivados")
         with tR1:
-            btn_restaurar = st.button("↩️", help="Restaurar selecionado", type="primary", use_container_width=True, key="btn_arq_restore")
+            btn_restaurar = st.button("↩️", help="Restaurar selecionados", type="primary", use_container_width=True, key="btn_arq_restore")
         with tR2:
-            btn_excluir = st.button("🗑️", help="Excluir selecionado", use_container_width=True, key="btn_arq_del")
+            btn_excluir = st.button("🗑️", help="Excluir selecionados", use_container_width=True, key="btn_arq_del")
 
-        df_styled = df_a_show.style.apply(_row_style_acompanhamento, axis=1)
+        df_styled = visao.estilizar(df_a_show, urgencia_a)
 
         sel_arq = st.dataframe(
             df_styled,
             use_container_width=True,
             hide_index=True,
-            selection_mode="single-row",
+            column_config=_date_column_config(visao.LAYOUT_ARQUIVADOS),
+            selection_mode="multi-row",
             on_select="rerun",
             key="tbl_arq",
         )
+        _pager_controls("arq", df_a, rest_arq, "tbl_arq")
+        tabela = _tabela_export()
+        _export_buttons("arq", "Arquivados", visao.LAYOUT_ARQUIVADOS, lambda: _iter_view(tabela, "casos_arquivados"))
 
-        selected_arch_id = None
-        if sel_arq and sel_arq.get("selection", {}).get("rows"):
-            idx = sel_arq["selection"]["rows"][0]
-            selected_arch_id = int(df_a_show.iloc[idx]["Id"])
+        sel_arq_ids = [int(df_a_show.iloc[i]["Id"]) for i in (sel_arq or {}).get("selection", {}).get("rows", []) if i < len(df_a_show)]
 
         if btn_restaurar:
-            if not selected_arch_id:
-                st.warning("Selecione uma linha na tabela.")
+            if not sel_arq_ids:
+                st.warning("Selecione uma ou mais linhas na tabela.")
             else:
-                unarchive_caso(int(selected_arch_id))
-                st.toast("Restaurado ✅")
+                unarchive_casos(sel_arq_ids)
+                st.session_state.pop("tbl_arq", None)
+                st.toast(f"{len(sel_arq_ids)} restaurado(s) ✅")
                 st.rerun()
 
         if btn_excluir:
-            if not selected_arch_id:
-                st.warning("Selecione uma linha na tabela.")
+            if not sel_arq_ids:
+                st.warning("Selecione uma ou mais linhas na tabela.")
             else:
-                st.session_state["confirm_del_arch_one"] = int(selected_arch_id)
+                st.session_state["confirm_del_arch"] = sel_arq_ids
 
-        if st.session_state.get("confirm_del_arch_one"):
-            st.warning("Confirmar EXCLUIR? (não pode desfazer)")
+        if st.session_state.get("confirm_del_arch"):
+            ids_del = st.session_state["confirm_del_arch"]
+            st.warning(f"Confirmar EXCLUIR {len(ids_del)} caso(s)? (não pode desfazer)")
             c1, c2 = st.columns([0.18, 0.18], gap="small")
             with c1:
                 if st.button("✅", use_container_width=True, key="btn_del_arch_yes"):
-                    delete_caso(int(st.session_state["confirm_del_arch_one"]))
-                    st.session_state.pop("confirm_del_arch_one", None)
-                    st.toast("Excluído ✅")
+                    n = delete_casos(ids_del)
+                    st.session_state.pop("confirm_del_arch", None)
+                    st.session_state.pop("tbl_arq", None)
+                    st.toast(f"{n} excluído(s) ✅")
                     st.rerun()
             with c2:
                 if st.button("❌", use_container_width=True, key="btn_del_arch_no"):
-                    st.session_state.pop("confirm_del_arch_one", None)
+                    st.session_state.pop("confirm_del_arch", None)
+
+    _historico_box()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+# =========================================================
+# Arquivamento automático (política "resolvido há mais de N dias")
+# - a regra mora no banco: RPC arquivar_resolvidos (sql/013), em lotes
+# - no app: secret ARQUIVAR_RESOLVIDOS_DIAS liga a rodada periódica da sessão
+# - fora do app (job agendado): este script, com a service role do Supabase
+# - --congelar-dias M: arquivados há mais de M dias vão para o arquivo frio
+#   (RPC congelar_arquivados, sql/014); anos antigos do frio: historico.py
+#
+# Conexão pelo ambiente (nada de chave no código):
+#   SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+#   ARQUIVAR_DIAS (padrão 90), ARQUIVAR_LOTE (padrão 500), CONGELAR_DIAS (padrão: não congela)
+#
+# Uso: python arquivamento.py [--dias 90] [--lote 500] [--congelar-dias 365] [--a-cada 60]
+#   sem --a-cada: roda uma vez (cron / Agendador de Tarefas do Windows)
+#   com --a-cada MIN: fica rodando e repete a cada MIN minutos
+# =========================================================
+DIAS_PADRAO = 90
+LOTE_PADRAO = 500
+
+
+def _em_lotes(rpc: Callable, nome: str, dias: int, lote: int) -> int:
+    # rpc(nome, params) no formato do supabase-py (app: _sb_rpc; script: client.rpc)
+    lote = max(1, int(lote))
+    total = 0
+    while True:
+        res = rpc(nome, {"p_dias": max(0, int(dias)), "p_limite": lote}).execute()
+        n = int(res.data or 0)
+        total += n
+        if n < lote:
+            return total
+
+
+def arquivar_resolvidos(rpc: Callable, dias: int, lote: int = LOTE_PADRAO) -> int:
+    return _em_lotes(rpc, "arquivar_resolvidos", dias, lote)
+
+
+def congelar_arquivados(rpc: Callable, dias: int, lote: int = LOTE_PADRAO) -> int:
+    return _em_lotes(rpc, "congelar_arquivados", dias, lote)
+
+
+def _args(argv=None):
+    p = argparse.ArgumentParser(description="Arquiva os casos resolvidos há mais de N dias.")
+    p.add_argument("--dias", type=int, default=int(os.environ.get("ARQUIVAR_DIAS", DIAS_PADRAO)))
+    p.add_argument("--lote", type=int, default=int(os.environ.get("ARQUIVAR_LOTE", LOTE_PADRAO)))
+    p.add_argument(
+        "--congelar-dias",
+        type=int,
+        default=int(os.environ["CONGELAR_DIAS"]) if os.environ.get("CONGELAR_DIAS") else None,
+        help="move para o arquivo frio os arquivados há mais de N dias",
+    )
+    p.add_argument("--a-cada", type=float, default=None, metavar="MIN", help="repete a cada MIN minutos (sem isso roda uma vez)")
+    return p.parse_args(argv)
+
+
+def connect_supabase():
+    from supabase import create_client
+
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        raise SystemExit("Defina SUPABASE_URL e SUPABASE_SERVICE_ROLE_KEY.")
+    return create_client(url, key)
+
+
+def rodada(sb, dias: int, lote: int, congelar_dias: int | None = None) -> int:
+    t0 = time.perf_counter()
+    n = arquivar_resolvidos(sb.rpc, dias, lote)
+    print(f"[{datetime.now():%d/%m/%Y %H:%M}] {n} caso(s) resolvido(s) há mais de {dias} dias arquivado(s) em {time.perf_counter() - t0:.1f}s.")
+    if congelar_dias is not None:
+        t0 = time.perf_counter()
+        f = congelar_arquivados(sb.rpc, congelar_dias, lote)
+        print(f"[{datetime.now():%d/%m/%Y %H:%M}] {f} arquivado(s) há mais de {congelar_dias} dias movido(s) para o arquivo frio em {time.perf_counter() - t0:.1f}s.")
+    return n
+
+
+def main(argv=None):
+    args = _args(argv)
+    sb = connect_supabase()
+    if not args.a_cada:
+        rodada(sb, args.dias, args.lote, args.congelar_dias)
+        return 0
+    while True:
+        try:
+            rodada(sb, args.dias, args.lote, args.congelar_dias)
+        except Exception as e:
+            # falha de rede / servidor: tenta de novo na próxima rodada
+            print(f"[{datetime.now():%d/%m/%Y %H:%M}] ❌ Erro no arquivamento: {e}")
+        time.sleep(max(1.0, args.a_cada * 60))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import visao
+
+# Compara o estilo antigo (Styler.apply por linha, reparse de "dd/mm/aaaa")
+# com a classificação vetorizada do visao.py; o tempo inclui o Styler.to_html()
+# (renderização completa, como a tabela chega ao navegador).
+# Uso, da raiz do repo: python -m bench.bench_estilo [n_linhas ...]   (padrão: 10000 100000)
+
+
+def _parse_ddmmyyyy_to_date(s: str):
+    if not s or str(s).strip() in ["-", "NaT", "None"]:
+        return None
+    try:
+        return datetime.strptime(str(s).strip(), "%d/%m/%Y").date()
+    except Exception:
+        return None
+
+
+def _row_style_legado(row):
+    status = str(row.get("Status", "")).strip().lower()
+    if status == "resolvido":
+        return ["background-color: #dcfce7; color: #14532d;"] * len(row)
+    prazo = _parse_ddmmyyyy_to_date(row.get("Prazo Final", ""))
+    if prazo is None:
+        return [""] * len(row)
+    diff = (prazo - date.today()).days
+    if diff <= 0:
+        return ["background-color: #fee2e2; color: #7f1d1d;"] * len(row)
+    if 1 <= diff <= 5:
+        return ["background-color: #fef9c3; color: #713f12;"] * len(row)
+    return [""] * len(row)
+
+
+def _dados(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    hoje = date.today()
+    prazos = [(hoje + timedelta(days=int(d))).isoformat() for d in rng.integers(-30, 30, n)]
+    prazos = [p if i % 7 else None for i, p in enumerate(prazos)]
+    status = rng.choice(["Recebido", "Distribuído", "Resolvido", "Pendente"], n)
+    return pd.DataFrame({"id": np.arange(n, 0, -1), "prazo_final": prazos, "status": status})
+
+
+def _df_show(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Id": df["id"],
+            "Prazo Final": pd.to_datetime(df["prazo_final"], errors="coerce").dt.strftime("%d/%m/%Y").fillna("-"),
+            "Status": df["status"],
+        }
+    )
+
+
+def _tempo(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(tamanhos: list[int]):
+    for n in tamanhos:
+        df = _dados(n)
+        show = _df_show(df)
+
+        t_legado = _tempo(lambda: show.style.apply(_row_style_legado, axis=1).to_html())
+        t_vetor = _tempo(lambda: visao.estilizar(show, visao.classificar_urgencia(df["prazo_final"], df["status"])).to_html())
+        t_class = _tempo(lambda: visao.classificar_urgencia(df["prazo_final"], df["status"]))
+
+        legado = show.apply(_row_style_legado, axis=1, result_type="expand").to_numpy()
+        vetor = visao.estilos_por_urgencia(show, visao.classificar_urgencia(df["prazo_final"], df["status"])).to_numpy()
+        igual = "ok" if (legado == vetor).all() else "DIFERENTE"
+
+        print(
+            f"{n:>8} linhas | legado {t_legado:8.3f}s | vetorizado {t_vetor:8.3f}s "
+            f"(classificação {t_class * 1000:7.1f}ms) | {t_legado / t_vetor:6.1f}x | {igual}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10_000, 100_000])
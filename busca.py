@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+# =========================================================
+# Busca de casos em memória (equivalente local do RPC buscar_casos, sql/007)
+# - índice invertido token -> {id: peso}, tokens sem acento e minúsculos
+# - cada termo da consulta casa por prefixo ("solic" acha "solicitação"); todos os termos precisam casar
+# - nº de documento: trigramas estilo pg_trgm (similaridade >= 0.3) ou trecho contido
+# - ranking: pesos por campo (A/B/C como o ts_rank) + 2 x similaridade do nº do documento
+# =========================================================
+PESOS = {
+    "nr_doc_recebido": 1.0,
+    "nr_doc_solicitado": 1.0,
+    "origem": 0.4,
+    "assunto_doc": 0.2,
+    "assunto_solic": 0.2,
+}
+CAMPOS_NR_DOC = ("nr_doc_recebido", "nr_doc_solicitado")
+LIMIAR_TRIGRAMA = 0.3
+
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+
+def normalizar(texto) -> str:
+    s = unicodedata.normalize("NFKD", str(texto or ""))
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+
+
+def tokens(texto) -> list[str]:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+def trigramas(texto) -> set[str]:
+    # mesma regra do pg_trgm: cada palavra com 2 espaços antes e 1 depois
+    out: set[str] = set()
+    for w in tokens(texto):
+        w = f"  {w} "
+        out.update(w[i : i + 3] for i in range(len(w) - 2))
+    return out
+
+
+def similaridade(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class IndiceBusca:
+    def __init__(self, linhas: list[dict]):
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._tri: dict[str, list[tuple[int, int]]] = defaultdict(list)  # trigrama -> [(id, campo)]
+        self._tri_qtd: dict[tuple[int, int], int] = {}
+        self._nr_doc: dict[int, list[str]] = {}
+        partes: list[str] = []
+        self._blob_ini: list[int] = []  # nº de documento concatenados: "trecho contido" vira str.find
+        self._blob_rid: list[int] = []
+        pos = 0
+
+        for r in linhas:
+            rid = int(r["id"])
+            for campo, peso in PESOS.items():
+                for tok in tokens(r.get(campo)):
+                    atual = self._postings[tok].get(rid, 0.0)
+                    self._postings[tok][rid] = max(atual, peso)
+            docs = []
+            for k, campo in enumerate(CAMPOS_NR_DOC):
+                valor = r.get(campo)
+                if valor:
+                    tri = trigramas(valor)
+                    docs.append(normalizar(valor))
+                    self._tri_qtd[(rid, k)] = len(tri)
+                    for t in tri:
+                        self._tri[t].append((rid, k))
+            self._nr_doc[rid] = docs
+            for d in docs:
+                self._blob_ini.append(pos)
+                self._blob_rid.append(rid)
+                partes.append(d)
+                pos += len(d) + 1
+
+        self._blob = "\x00".join(partes)
+        self._vocab = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._nr_doc)
+
+    def _por_prefixo(self, termo: str) -> dict[int, float]:
+        # todos os tokens que começam com o termo; exato vale inteiro, prefixo vale metade
+        achados: dict[int, float] = {}
+        i = bisect.bisect_left(self._vocab, termo)
+        while i < len(self._vocab) and self._vocab[i].startswith(termo):
+            tok = self._vocab[i]
+            fator = 1.0 if tok == termo else 0.5
+            for rid, peso in self._postings[tok].items():
+                achados[rid] = max(achados.get(rid, 0.0), peso * fator)
+            i += 1
+        return achados
+
+    def _contidos(self, texto: str) -> set[int]:
+        achados: set[int] = set()
+        i = self._blob.find(texto)
+        while i != -1:
+            achados.add(self._blob_rid[bisect.bisect_right(self._blob_ini, i) - 1])
+            i = self._blob.find(texto, i + 1)
+        return achados
+
+    def buscar(self, consulta: str, limite: int = 50) -> list[tuple[int, float]]:
+        texto = normalizar(consulta).strip()
+        termos = tokens(texto)
+        if not termos:
+            return []
+
+        # texto: todos os termos precisam casar (como o "&" do tsquery)
+        score: dict[int, float] | None = None
+        for termo in termos:
+            achados = self._por_prefixo(termo)
+            if score is None:
+                score = dict(achados)
+            else:
+                score = {rid: s + achados[rid] for rid, s in score.items() if rid in achados}
+            if not score:
+                break
+        score = score or {}
+
+        # nº do documento: trigramas parecidos (contagem de trigramas em comum) ou trecho contido
+        tri_q = trigramas(texto)
+        comuns = Counter(chave for t in tri_q for chave in self._tri.get(t, ()))
+        sims: dict[int, float] = {}
+        for (rid, k), n in comuns.items():
+            sim = n / (len(tri_q) + self._tri_qtd[(rid, k)] - n)
+            if sim > sims.get(rid, 0.0):
+                sims[rid] = sim
+        contidos = self._contidos(texto)
+        for rid in contidos | {rid for rid, sim in sims.items() if sim >= LIMIAR_TRIGRAMA}:
+            score[rid] = score.get(rid, 0.0) + 2 * sims.get(rid, 0.0) + (0.5 if rid in contidos else 0.0)
+
+        melhores = heapq.nlargest(max(1, int(limite)), zip(score.values(), score.keys()))
+        return [(rid, s) for s, rid in melhores]
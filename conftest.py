@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import glob
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# =========================================================
+# Postgres para os testes das migrações (sql/) e do migrar_sqlite_para_supabase.py
+# - TEST_DATABASE_URL: servidor descartável (cada teste cria e apaga o seu banco)
+# - sem ele: sobe um Postgres local com pgserver (pip install pgserver); sem os dois, pula
+# - banco: as tabelas base do Supabase (o repo não as cria) + auth.uid() e os papéis
+#   authenticated / anon; o usuário do teste entra por request.jwt.claim.sub
+# =========================================================
+PASTA_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+ESQUEMA_BASE = """
+create schema if not exists auth;
+create or replace function auth.uid() returns uuid language sql stable as $$
+    select nullif(current_setting('request.jwt.claim.sub', true), '')::uuid
+$$;
+do $$
+begin
+    create role authenticated;
+exception when duplicate_object then null;
+end;
+$$;
+do $$
+begin
+    create role anon;
+exception when duplicate_object then null;
+end;
+$$;
+create publication supabase_realtime;
+
+create table public.casos (
+    id bigint generated by default as identity primary key, owner_id uuid, nr_doc_recebido text, assunto_doc text,
+    origem text, prazo_final date, observacoes text, assunto_solic text, prazo_om date, nr_doc_solicitado text,
+    status text, created_at timestamptz default now(), nr_doc_resposta text, resolved_at date
+);
+create table public.retornos_om (
+    id bigint generated by default as identity primary key, owner_id uuid, caso_id bigint references public.casos (id),
+    om text, status text, dt_solicitacao date, prazo_om date, dt_resposta date, link_arquivo text, observacoes text,
+    unique (caso_id, om)
+);
+create table public.arquivados (
+    id bigint generated by default as identity primary key, owner_id uuid,
+    caso_id bigint unique references public.casos (id), archived_at timestamptz default now()
+);
+create table public.master_oms (
+    id bigint generated by default as identity primary key, owner_id uuid, nome text, created_at timestamptz default now()
+);
+create table public.responsaveis_contatos (
+    id bigint generated by default as identity primary key, owner_id uuid, responsavel text, contato_nome text,
+    telefone text, created_at timestamptz default now()
+);
+"""
+
+# sql/007 e 008 pedem pg_trgm / unaccent; sem elas fica uma busca gerada no mesmo formato
+PRECISAM_TRGM = {"007_busca.sql", "008_filtros_acompanhamento.sql"}
+BUSCA_SEM_EXTENSAO = """
+alter table public.casos
+    add column if not exists busca tsvector generated always as (
+        to_tsvector('simple', coalesce(nr_doc_recebido, '') || ' ' || coalesce(origem, '') || ' ' || coalesce(assunto_doc, ''))
+    ) stored;
+"""
+
+
+@pytest.fixture(scope="session")
+def pg_url():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver")
+    srv = pgserver.get_server(tempfile.mkdtemp(), cleanup_mode="stop")
+    yield srv.get_uri()
+    srv.cleanup()
+
+
+@pytest.fixture
+def banco(pg_url):
+    # conninfo de um banco novo com ESQUEMA_BASE
+    psycopg = pytest.importorskip("psycopg")
+    from psycopg.conninfo import make_conninfo
+
+    nome = f"teste_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(pg_url, autocommit=True) as c:
+        c.execute(f'create database "{nome}"')
+    url = make_conninfo(pg_url, dbname=nome)
+    with psycopg.connect(url, autocommit=True) as c:
+        c.execute(ESQUEMA_BASE)
+    yield url
+    with psycopg.connect(pg_url, autocommit=True) as c:
+        c.execute(f'drop database "{nome}" with (force)')
+
+
+@pytest.fixture
+def banco_migrado(banco):
+    # banco + sql/*.sql na ordem, como no SQL Editor do Supabase
+    import psycopg
+
+    with psycopg.connect(banco, autocommit=True) as c:
+        tem_trgm = c.execute(
+            "select count(*) = 2 from pg_available_extensions where name in ('pg_trgm', 'unaccent')"
+        ).fetchone()[0]
+        for caminho in sorted(glob.glob(os.path.join(PASTA_SQL, "*.sql"))):
+            if not tem_trgm and os.path.basename(caminho) in PRECISAM_TRGM:
+                c.execute(BUSCA_SEM_EXTENSAO)
+                continue
+            with open(caminho, encoding="utf-8") as f:
+                c.execute(f.read())
+    return banco
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+import httpx
+
+# =========================================================
+# Leituras concorrentes no PostgREST (asyncio + httpx.AsyncClient)
+# - um event loop em thread própria, vivo enquanto o processo do Streamlit existir
+# - um AsyncClient (HTTP/2, keep-alive) reaproveitado por todas as sessões
+# - o script síncrono chama gather() e recebe os resultados prontos
+# - limites / timeout do pool vêm do app (configurar), os mesmos do cliente síncrono
+# =========================================================
+_LOCK = threading.Lock()
+_LOOP: asyncio.AbstractEventLoop | None = None
+_CLIENT: httpx.AsyncClient | None = None
+_LIMITS: httpx.Limits | None = None
+_TIMEOUT: httpx.Timeout | None = None
+
+
+def configurar(limits: httpx.Limits, timeout: httpx.Timeout):
+    # vale para o AsyncClient criado depois desta chamada (um por processo)
+    global _LIMITS, _TIMEOUT
+    with _LOCK:
+        _LIMITS, _TIMEOUT = limits, timeout
+
+
+def _loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="dados_async", daemon=True).start()
+    return _LOOP
+
+
+def _client() -> httpx.AsyncClient:
+    # só é chamado de dentro do loop, então não precisa de lock
+    global _CLIENT
+    if _CLIENT is None:
+        if _LIMITS is None or _TIMEOUT is None:
+            raise RuntimeError("dados_async.configurar() precisa ser chamado antes das leituras")
+        _CLIENT = httpx.AsyncClient(http2=True, timeout=_TIMEOUT, limits=_LIMITS, follow_redirects=True)
+    return _CLIENT
+
+
+def _parse_count(content_range: str | None) -> int | None:
+    # "0-19/347" -> 347 ; "*/0" -> 0 ; "0-19/*" -> None
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+class PostgrestAsync:
+    def __init__(self, supabase_url: str, apikey: str, access_token: str | None = None):
+        self.rest_url = supabase_url.rstrip("/") + "/rest/v1"
+        self.headers = {
+            "apikey": apikey,
+            "Authorization": f"Bearer {access_token or apikey}",
+            "Accept": "application/json",
+        }
+
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: list[tuple[str, str, Any]] | None = None,
+        order: str | None = None,
+        limit: int | None = None,
+        count: str | None = None,
+    ) -> tuple[list[dict], int | None]:
+        params: list[tuple[str, str]] = [("select", columns)]
+        for col, op, val in filters or []:
+            # ("or", "", "a.eq.1,b.is.null") vira or=(a.eq.1,b.is.null)
+            params.append((col, f"({val})" if col == "or" else f"{op}.{val}"))
+        if order:
+            params.append(("order", order))
+        if limit is not None:
+            params.append(("limit", str(int(limit))))
+
+        headers = dict(self.headers)
+        if count:
+            headers["Prefer"] = f"count={count}"
+
+        resp = await _client().get(f"{self.rest_url}/{table}", params=params, headers=headers)
+        resp.raise_for_status()
+        return resp.json() or [], _parse_count(resp.headers.get("content-range"))
+
+
+def submit(coro: Awaitable):
+    # agenda no loop de fundo sem esperar (ex.: assinaturas do realtime)
+    return asyncio.run_coroutine_threadsafe(coro, _loop())
+
+
+def gather(coros: dict[Any, Awaitable]) -> dict[Any, Any]:
+    if not coros:
+        return {}
+
+    async def _all():
+        values = await asyncio.gather(*coros.values())
+        return dict(zip(coros.keys(), values))
+
+    return submit(_all()).result()
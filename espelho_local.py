@@ -0,0 +1,923 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import httpx
+from postgrest import APIError
+
+import busca
+
+# =========================================================
+# Espelho local (SQLite) dos dados do usuário
+# - leituras: TabelaLocal imita a cadeia do postgrest usada no app
+#   (select/eq/in_/order/limit/execute ...) e responde do SQLite
+# - escritas: aplicadas no SQLite e gravadas numa outbox durável
+# - sincronizar(): reenvia a outbox em lotes e puxa do Supabase só o que
+#   mudou (marca d'água updated_at/id por tabela + tombstones de exclusão)
+# - ids criados offline são negativos até a outbox ser reenviada
+# =========================================================
+TABELAS = {
+    "casos": [
+        "id", "owner_id", "nr_doc_recebido", "assunto_doc", "origem", "prazo_final", "observacoes",
+        "assunto_solic", "prazo_om", "nr_doc_solicitado", "status", "created_at", "nr_doc_resposta",
+        "resolved_at", "updated_at",
+    ],
+    "retornos_om": [
+        "id", "owner_id", "caso_id", "om", "status", "dt_solicitacao", "prazo_om", "dt_resposta",
+        "link_arquivo", "observacoes", "updated_at",
+    ],
+    "arquivados": ["id", "owner_id", "caso_id", "archived_at", "updated_at"],
+    "master_oms": ["id", "owner_id", "nome", "created_at", "updated_at"],
+    "responsaveis_contatos": ["id", "owner_id", "responsavel", "contato_nome", "telefone", "created_at", "updated_at"],
+}
+# arquivo frio (sql/014): a linha do caso + archived_at + retornos (json com as linhas de retornos_om)
+TABELAS["casos_frios"] = TABELAS["casos"] + ["archived_at", "retornos"]
+
+# colunas que apontam para casos.id (remapeadas quando um caso criado offline ganha id real)
+REFERENCIAS_CASO = {"retornos_om": "caso_id", "arquivados": "caso_id"}
+
+# RPCs só de leitura: respondidas do SQLite e fora da outbox
+RPCS_LEITURA = {"buscar_casos"}
+# RPCs que podem criar um caso (p_caso_id nulo): o id real vem na resposta do push
+RPCS_CRIAM_CASO = {"save_caso_full"}
+
+LOTE_PULL = 1000
+LOTE_PUSH = 500
+
+# erros que não são da entrada em si (rede, sessão expirada, timeout, limite de taxa, servidor fora):
+# a entrada fica na outbox e o envio para até a próxima sincronização; 403 / RLS (42501) não
+# passam com nova tentativa e vão para _outbox_falhas como qualquer recusa
+HTTP_RETENTAVEIS = {401, 408, 429}
+# o mesmo em códigos do PostgREST / SQLSTATE: conexão (PGRST0xx, 08), JWT (PGRST3xx),
+# transação abortada (40), recursos (53), timeout / servidor parando (57)
+_PG_RETENTAVEIS = ("PGRST0", "PGRST3", "08", "40", "53", "57")
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS casos (
+    id INTEGER PRIMARY KEY, owner_id TEXT, nr_doc_recebido TEXT, assunto_doc TEXT, origem TEXT,
+    prazo_final TEXT, observacoes TEXT, assunto_solic TEXT, prazo_om TEXT, nr_doc_solicitado TEXT,
+    status TEXT, created_at TEXT, nr_doc_resposta TEXT, resolved_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS retornos_om (
+    id INTEGER PRIMARY KEY, owner_id TEXT, caso_id INTEGER, om TEXT, status TEXT, dt_solicitacao TEXT,
+    prazo_om TEXT, dt_resposta TEXT, link_arquivo TEXT, observacoes TEXT, updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS retornos_om_caso_om_uidx ON retornos_om (caso_id, om);
+CREATE TABLE IF NOT EXISTS arquivados (
+    id INTEGER PRIMARY KEY, owner_id TEXT, caso_id INTEGER UNIQUE, archived_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS casos_frios (
+    id INTEGER PRIMARY KEY, owner_id TEXT, nr_doc_recebido TEXT, assunto_doc TEXT, origem TEXT,
+    prazo_final TEXT, observacoes TEXT, assunto_solic TEXT, prazo_om TEXT, nr_doc_solicitado TEXT,
+    status TEXT, created_at TEXT, nr_doc_resposta TEXT, resolved_at TEXT, updated_at TEXT,
+    archived_at TEXT, retornos TEXT
+);
+CREATE TABLE IF NOT EXISTS master_oms (
+    id INTEGER PRIMARY KEY, owner_id TEXT, nome TEXT, created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS responsaveis_contatos (
+    id INTEGER PRIMARY KEY, owner_id TEXT, responsavel TEXT, contato_nome TEXT, telefone TEXT,
+    created_at TEXT, updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS _sync (tabela TEXT PRIMARY KEY, wm_updated_at TEXT, wm_id INTEGER);
+CREATE TABLE IF NOT EXISTS _outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, tabela TEXT NOT NULL, operacao TEXT NOT NULL,
+    payload TEXT, filtros TEXT, opcoes TEXT, criado_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS _outbox_falhas (
+    seq INTEGER PRIMARY KEY, tabela TEXT, operacao TEXT, payload TEXT, filtros TEXT, opcoes TEXT,
+    criado_em TEXT, erro TEXT, falhou_em TEXT
+);
+CREATE TABLE IF NOT EXISTS _id_map (tabela TEXT NOT NULL, temp_id INTEGER NOT NULL, real_id INTEGER NOT NULL,
+    PRIMARY KEY (tabela, temp_id));
+
+"""
+
+# views recriadas a cada abertura (acompanham as do Supabase, sql/001..003, 009, 010 e 014)
+_VIEWS = """
+DROP VIEW IF EXISTS cobranca_por_responsavel;
+DROP VIEW IF EXISTS dashboard_kpis;
+DROP VIEW IF EXISTS casos_arquivados;
+DROP VIEW IF EXISTS casos_dashboard;
+DROP VIEW IF EXISTS pendencias_por_caso;
+CREATE VIEW pendencias_por_caso AS
+    SELECT caso_id, count(*) AS qtd FROM retornos_om WHERE status = 'Pendente' GROUP BY caso_id;
+CREATE VIEW casos_dashboard AS
+    SELECT c.*,
+           coalesce(p.qtd, 0) AS pendencias_qtd,
+           (coalesce(c.prazo_final, '') <> ''
+            AND date(c.prazo_final) <= date('now', 'localtime')
+            AND lower(coalesce(c.status, '')) <> 'resolvido') AS atrasado
+      FROM casos c
+      LEFT JOIN pendencias_por_caso p ON p.caso_id = c.id
+     WHERE NOT EXISTS (SELECT 1 FROM arquivados a WHERE a.caso_id = c.id);
+CREATE VIEW casos_arquivados AS
+    SELECT c.*, a.archived_at FROM casos c JOIN arquivados a ON a.caso_id = c.id
+    UNION ALL
+    SELECT id, owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, assunto_solic, prazo_om,
+           nr_doc_solicitado, status, created_at, nr_doc_resposta, resolved_at, updated_at, archived_at
+      FROM casos_frios;
+CREATE VIEW dashboard_kpis AS
+    SELECT count(*) AS em_acompanhamento,
+           coalesce(sum(atrasado), 0) AS atrasados,
+           coalesce(sum(pendencias_qtd), 0) AS pendencias
+      FROM casos_dashboard;
+CREATE VIEW cobranca_por_responsavel AS
+    WITH pend AS (
+        SELECT r.om, d.id AS caso_id, d.assunto_solic, d.nr_doc_solicitado,
+               coalesce(nullif(r.prazo_om, ''), nullif(d.prazo_om, '')) AS prazo_om,
+               nullif(d.prazo_final, '') AS prazo_final
+          FROM retornos_om r
+          JOIN casos_dashboard d ON d.id = r.caso_id
+         WHERE lower(coalesce(r.status, '')) <> 'respondido'
+           AND lower(coalesce(d.status, '')) <> 'resolvido'
+           AND (d.atrasado
+                OR date(coalesce(nullif(r.prazo_om, ''), nullif(d.prazo_om, ''))) <= date('now', 'localtime'))
+         ORDER BY coalesce(nullif(r.prazo_om, ''), nullif(d.prazo_om, ''), nullif(d.prazo_final, '')) IS NULL,
+                  coalesce(nullif(r.prazo_om, ''), nullif(d.prazo_om, ''), nullif(d.prazo_final, '')), d.id
+    )
+    SELECT p.om AS responsavel,
+           count(*) AS qtd,
+           min(coalesce(p.prazo_om, p.prazo_final)) AS prazo_mais_antigo,
+           json_group_array(json_object(
+               'caso_id', p.caso_id, 'assunto_solic', p.assunto_solic, 'nr_doc_solicitado', p.nr_doc_solicitado,
+               'prazo_om', p.prazo_om, 'prazo_final', p.prazo_final
+           )) AS itens,
+           coalesce((
+               SELECT json_group_array(json_object('contato_nome', ct.contato_nome, 'telefone', ct.telefone))
+                 FROM (SELECT * FROM responsaveis_contatos WHERE responsavel = p.om ORDER BY contato_nome) ct
+           ), '[]') AS contatos
+      FROM pend p
+     GROUP BY p.om;
+"""
+
+# colunas jsonb das views do servidor: no SQLite chegam como texto
+COLUNAS_JSON = {"cobranca_por_responsavel": ("itens", "contatos"), "casos_frios": ("retornos",)}
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_NUMERO = re.compile(r"^-?(0|[1-9][0-9]*)(\.[0-9]+)?$")
+
+
+def caminho_padrao(pasta: str, owner_id: str) -> str:
+    os.makedirs(pasta, exist_ok=True)
+    return os.path.join(pasta, f"espelho_{re.sub(r'[^A-Za-z0-9_-]', '_', str(owner_id))}.sqlite")
+
+
+def erro_retentavel(e: Exception) -> bool:
+    if isinstance(e, httpx.TransportError):
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+    else:
+        # APIError: código do PostgREST / SQLSTATE, ou o status HTTP quando a resposta não é JSON
+        code = getattr(e, "code", None)
+        if isinstance(code, str) and code.startswith(_PG_RETENTAVEIS):
+            return True
+        status = code if isinstance(code, int) else None
+    return status is not None and (status in HTTP_RETENTAVEIS or status >= 500)
+
+
+def _descrever_erro(e: Exception) -> str:
+    if isinstance(e, httpx.TransportError):
+        return f"offline: {e.__class__.__name__}"
+    if isinstance(e, APIError):
+        return f"servidor: {e.code or ''} {e.message or ''}".strip()
+    return f"servidor: {e}"
+
+
+def _ident(nome: str) -> str:
+    if not _IDENT.match(nome or ""):
+        raise ValueError(f"identificador inválido: {nome!r}")
+    return f'"{nome}"'
+
+
+def _valor(v):
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, (list, dict)):
+        return json.dumps(v)
+    return v
+
+
+def _dividir(texto: str) -> list[str]:
+    # separa por vírgula no nível de fora (respeita aspas e parênteses), como o PostgREST
+    partes, atual, nivel, aspas = [], [], 0, False
+    i = 0
+    while i < len(texto):
+        ch = texto[i]
+        if ch == "\\" and aspas and i + 1 < len(texto):
+            atual.append(texto[i : i + 2])
+            i += 2
+            continue
+        if ch == '"':
+            aspas = not aspas
+        elif not aspas and ch in "({":
+            nivel += 1
+        elif not aspas and ch in ")}":
+            nivel -= 1
+        elif not aspas and nivel == 0 and ch == ",":
+            partes.append("".join(atual))
+            atual = []
+            i += 1
+            continue
+        atual.append(ch)
+        i += 1
+    partes.append("".join(atual))
+    return [p.strip() for p in partes if p.strip()]
+
+
+def _sem_aspas(v: str):
+    v = v.strip()
+    if len(v) >= 2 and v[0] == v[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", v[1:-1])
+    return v
+
+
+def _criterio(op: str, criterio: str):
+    # texto do PostgREST ("in.(a,b)", "cs.{x}", "is.true" ...) -> (op local, valor python)
+    if op == "in":
+        return "in_", [_sem_aspas(v) for v in _dividir(criterio.strip()[1:-1])]
+    if op == "cs":
+        return "cs", [_sem_aspas(v) for v in _dividir(criterio.strip()[1:-1])]
+    if op == "is":
+        return "is_", criterio.strip().lower()
+    v = _sem_aspas(criterio)
+    if op in TabelaLocal._OPS and v == criterio.strip() and _NUMERO.match(v):
+        # o PostgREST tipa pelo esquema; aqui número comparado como texto nunca casa
+        return op, float(v) if "." in v else int(v)
+    return op, v
+
+
+class Resultado:
+    def __init__(self, data: list[dict], count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class TabelaLocal:
+    _OPS = {"eq": "=", "neq": "<>", "lt": "<", "gt": ">", "lte": "<=", "gte": ">="}
+    # colunas calculadas do servidor (funções sobre a linha, sql/008): coluna -> (tabela, fk, valor)
+    _LISTAS = {"responsaveis": ("retornos_om", "caso_id", "om")}
+    # filtro gravado na outbox -> método do builder do postgrest que o refaz no envio
+    # ("or_" recebe só a expressão); filtro fora daqui não entra na outbox
+    _REENVIO = {**{op: op for op in _OPS}, "in_": "in_", "is_": "is_", "ilike": "ilike", "cs": "contains", "or_": "or_"}
+
+    def __init__(self, espelho: "EspelhoLocal", nome: str):
+        self.espelho = espelho
+        self.nome = nome
+        self._operacao = "select"
+        self._colunas = "*"
+        self._count = None
+        self._filtros: list[tuple[str, str, Any]] = []
+        self._ordem: list[tuple[str, bool, bool | None]] = []
+        self._limite: int | None = None
+        self._payload = None
+        self._opcoes: dict = {}
+
+    # ---- leitura
+    def select(self, *colunas: str, count: str | None = None, **_):
+        self._colunas = ",".join(colunas) if colunas else "*"
+        self._count = count
+        return self
+
+    def order(self, coluna: str, desc: bool = False, nullsfirst: bool | None = None, **_):
+        self._ordem.append((coluna, bool(desc), nullsfirst))
+        return self
+
+    def limit(self, n: int, **_):
+        self._limite = int(n)
+        return self
+
+    # ---- filtros
+    def _filtro(self, op: str, coluna: str, valor):
+        self._filtros.append((op, coluna, valor))
+        return self
+
+    def eq(self, c, v):
+        return self._filtro("eq", c, v)
+
+    def neq(self, c, v):
+        return self._filtro("neq", c, v)
+
+    def lt(self, c, v):
+        return self._filtro("lt", c, v)
+
+    def gt(self, c, v):
+        return self._filtro("gt", c, v)
+
+    def lte(self, c, v):
+        return self._filtro("lte", c, v)
+
+    def gte(self, c, v):
+        return self._filtro("gte", c, v)
+
+    def in_(self, c, valores):
+        return self._filtro("in_", c, list(valores))
+
+    def is_(self, c, v):
+        return self._filtro("is_", c, v)
+
+    def ilike(self, c, padrao):
+        return self._filtro("ilike", c, padrao)
+
+    def contains(self, c, valores):
+        return self._filtro("cs", c, list(valores))
+
+    def filter(self, c, op, criterio):
+        op, valor = _criterio(op, str(criterio))
+        return self._filtro(op, c, valor)
+
+    def or_(self, filtros: str, **_):
+        return self._filtro("or_", "", filtros)
+
+    # ---- escrita
+    def insert(self, payload, **_):
+        self._operacao, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", **_):
+        self._operacao, self._payload = "upsert", payload
+        self._opcoes = {"on_conflict": on_conflict}
+        return self
+
+    def update(self, payload, **_):
+        self._operacao, self._payload = "update", payload
+        return self
+
+    def delete(self, **_):
+        self._operacao = "delete"
+        return self
+
+    def _condicao(self, op: str, col: str, val) -> tuple[str, list]:
+        if op == "or_":
+            return self._logica("or", val)
+        c = _ident(col)
+        if op in self._OPS:
+            return f"{c} {self._OPS[op]} ?", [_valor(val)]
+        if op == "in_":
+            if not val:
+                return "0", []
+            return f"{c} IN ({','.join('?' * len(val))})", [_valor(v) for v in val]
+        if op == "is_":
+            v = str(val).lower() if val is not None else "null"
+            if v == "null":
+                return f"{c} IS NULL", []
+            return f"{c} IS ?", [1 if v == "true" else 0]
+        if op == "ilike":
+            return f"lower({c}) LIKE lower(?)", [str(val).replace("*", "%")]
+        if op == "cs" and col in self._LISTAS:
+            tabela, fk, campo = self._LISTAS[col]
+            sub = f"EXISTS (SELECT 1 FROM {_ident(tabela)} x WHERE x.{_ident(fk)} = {_ident(self.nome)}.id AND x.{_ident(campo)} = ?)"
+            return " AND ".join([sub] * len(val)) or "1", list(val)
+        raise ValueError(f"filtro sem equivalente local: {op} em {col}")
+
+    def _logica(self, juncao: str, expr: str) -> tuple[str, list]:
+        # "a.eq.1,and(b.gt.2,c.is.null)" -> SQL com a mesma precedência
+        partes, args = [], []
+        for termo in _dividir(expr):
+            m = re.match(r"^(and|or)\((.*)\)$", termo, re.S)
+            if m:
+                sql, a = self._logica(m.group(1), m.group(2))
+            else:
+                col, op, criterio = termo.split(".", 2)
+                op, val = _criterio(op, criterio)
+                sql, a = self._condicao(op, col, val)
+            partes.append(f"({sql})")
+            args.extend(a)
+        return f" {juncao.upper()} ".join(partes) or "1", args
+
+    def _where(self) -> tuple[str, list]:
+        partes, args = [], []
+        for op, col, val in self._filtros:
+            sql, a = self._condicao(op, col, val)
+            partes.append(sql if op != "or_" else f"({sql})")
+            args.extend(a)
+        return (" WHERE " + " AND ".join(partes)) if partes else "", args
+
+    def execute(self) -> Resultado:
+        if self._operacao == "select":
+            return self.espelho._select(self)
+        return self.espelho._escrever(self)
+
+
+class EspelhoLocal:
+    def __init__(self, caminho: str, owner_id: str | None = None):
+        self.caminho = caminho
+        self.owner_id = owner_id  # dono das linhas criadas por RPC (no servidor: auth.uid())
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_DDL)
+        self.conn.executescript(_VIEWS)
+        self.ultimo_erro: str | None = None
+        self._busca: busca.IndiceBusca | None = None
+        self._busca_versao = -1
+
+    def tabela(self, nome: str) -> TabelaLocal:
+        return TabelaLocal(self, nome)
+
+    def pendentes(self) -> int:
+        return int(self.conn.execute("SELECT count(*) FROM _outbox").fetchone()[0])
+
+    def falhas(self) -> list[dict]:
+        # entradas que o servidor recusou (constraint, regra do RPC...): fora da fila, guardadas aqui
+        return [dict(r) for r in self.conn.execute("SELECT * FROM _outbox_falhas ORDER BY seq")]
+
+    def descartar_falhas(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM _outbox_falhas")
+
+    # -----------------------------------------------------
+    # leitura local
+    # -----------------------------------------------------
+    def _select(self, q: TabelaLocal) -> Resultado:
+        cols = "*" if q._colunas.strip() == "*" else ",".join(_ident(c.strip()) for c in q._colunas.split(","))
+        where, args = q._where()
+        sql = f"SELECT {cols} FROM {_ident(q.nome)}{where}"
+        if q._ordem:
+            sql += " ORDER BY " + ", ".join(
+                f"{_ident(c)} {'DESC' if d else 'ASC'}" + ("" if nf is None else " NULLS FIRST" if nf else " NULLS LAST")
+                for c, d, nf in q._ordem
+            )
+        if q._limite is not None:
+            sql += f" LIMIT {int(q._limite)}"
+        with self._lock:
+            data = [dict(r) for r in self.conn.execute(sql, args)]
+            for col in COLUNAS_JSON.get(q.nome, ()):
+                for r in data:
+                    if isinstance(r.get(col), str):
+                        r[col] = json.loads(r[col])
+            total = None
+            if q._count:
+                total = int(self.conn.execute(f"SELECT count(*) FROM {_ident(q.nome)}{where}", args).fetchone()[0])
+        return Resultado(data, total)
+
+    # -----------------------------------------------------
+    # escrita local + outbox
+    # -----------------------------------------------------
+    def _colunas_validas(self, tabela: str, row: dict) -> dict:
+        cols = TABELAS.get(tabela)
+        if cols is None:
+            raise ValueError(f"tabela fora do espelho: {tabela}")
+        return {k: _valor(v) for k, v in row.items() if k in cols}
+
+    def _proximo_temp_id(self, tabela: str) -> int:
+        menor = self.conn.execute(f"SELECT min(id) FROM {_ident(tabela)}").fetchone()[0]
+        return min(int(menor or 0), 0) - 1
+
+    def _enfileirar(self, tabela: str, operacao: str, payload=None, filtros=None, opcoes=None):
+        self.conn.execute(
+            "INSERT INTO _outbox (tabela, operacao, payload, filtros, opcoes, criado_em) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                tabela,
+                operacao,
+                json.dumps(payload, default=str) if payload is not None else None,
+                json.dumps(filtros, default=str) if filtros is not None else None,
+                json.dumps(opcoes) if opcoes else None,
+                datetime.now().isoformat(),
+            ),
+        )
+
+    def _upsert_linhas(self, tabela: str, linhas: list[dict], chave: str = "id"):
+        for row in linhas:
+            row = self._colunas_validas(tabela, row)
+            if not row:
+                continue
+            cols = list(row)
+            sets = ", ".join(f"{_ident(c)} = excluded.{_ident(c)}" for c in cols if c != chave) or f"{_ident(chave)} = excluded.{_ident(chave)}"
+            self.conn.execute(
+                f"INSERT INTO {_ident(tabela)} ({', '.join(_ident(c) for c in cols)}) "
+                f"VALUES ({', '.join('?' * len(cols))}) ON CONFLICT ({_ident(chave)}) DO UPDATE SET {sets}",
+                [row[c] for c in cols],
+            )
+
+    def _gravar_do_servidor(self, tabela: str, linhas: list[dict]):
+        # no pull o servidor manda: REPLACE resolve também conflitos em chaves únicas
+        cols = TABELAS[tabela]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {_ident(tabela)} ({', '.join(_ident(c) for c in cols)}) VALUES ({', '.join('?' * len(cols))})",
+            [[_valor(r.get(c)) for c in cols] for r in linhas],
+        )
+
+    def _ler_por_ids(self, tabela: str, ids: list) -> list[dict]:
+        if not ids:
+            return []
+        sql = f"SELECT * FROM {_ident(tabela)} WHERE id IN ({','.join('?' * len(ids))})"
+        return [dict(r) for r in self.conn.execute(sql, ids)]
+
+    def _escrever(self, q: TabelaLocal) -> Resultado:
+        tabela = q.nome
+        with self._lock, self.conn:
+            if q._operacao in ("insert", "upsert"):
+                linhas = q._payload if isinstance(q._payload, list) else [q._payload]
+                linhas = [dict(r) for r in linhas]
+                chave = q._opcoes.get("on_conflict", "id")
+                if q._operacao == "insert":
+                    for r in linhas:
+                        if r.get("id") is None:
+                            r["id"] = self._proximo_temp_id(tabela)
+                        self._upsert_linhas(tabela, [r])
+                else:
+                    self._upsert_linhas(tabela, linhas, chave)
+                self._enfileirar(tabela, q._operacao, linhas, opcoes=q._opcoes)
+                if chave == "id":
+                    return Resultado(self._ler_por_ids(tabela, [r["id"] for r in linhas if r.get("id") is not None]))
+                vals = [r.get(chave) for r in linhas]
+                sql = f"SELECT * FROM {_ident(tabela)} WHERE {_ident(chave)} IN ({','.join('?' * len(vals))})"
+                return Resultado([dict(r) for r in self.conn.execute(sql, vals)])
+
+            sem_reenvio = sorted({op for op, _, _ in q._filtros if op not in q._REENVIO})
+            if sem_reenvio:
+                raise ValueError(f"filtro sem reenvio ao servidor: {', '.join(sem_reenvio)}")
+            where, args = q._where()
+            afetadas = [dict(r) for r in self.conn.execute(f"SELECT * FROM {_ident(tabela)}{where}", args)]
+            if q._operacao == "update":
+                row = self._colunas_validas(tabela, q._payload or {})
+                if row:
+                    sets = ", ".join(f"{_ident(c)} = ?" for c in row)
+                    self.conn.execute(f"UPDATE {_ident(tabela)} SET {sets}{where}", list(row.values()) + args)
+                self._enfileirar(tabela, "update", q._payload, q._filtros)
+                return Resultado(self._ler_por_ids(tabela, [r["id"] for r in afetadas]))
+            if q._operacao == "delete":
+                self.conn.execute(f"DELETE FROM {_ident(tabela)}{where}", args)
+                self._enfileirar(tabela, "delete", None, q._filtros)
+                return Resultado(afetadas)
+        raise ValueError(f"operação desconhecida: {q._operacao}")
+
+    # -----------------------------------------------------
+    # RPCs com equivalente local (mesma semântica do sql/)
+    # -----------------------------------------------------
+    def rpc(self, nome: str, params: dict):
+        impl = getattr(self, f"_rpc_{nome}", None)
+        if impl is None:
+            raise ValueError(f"RPC sem equivalente local: {nome}")
+        if nome in RPCS_LEITURA:
+            with self._lock:
+                return _RpcLocal(impl(dict(params or {})))
+        with self._lock, self.conn:
+            limites = {t: self._proximo_temp_id(t) for t in TABELAS}
+            data = impl(dict(params or {}))
+            opcoes = {}
+            if nome in RPCS_CRIAM_CASO and (params or {}).get("p_caso_id") is None and data and int(data["id"]) < 0:
+                opcoes["temp_id"] = int(data["id"])
+            # linhas criadas com id temporário que o push não remapeia (ex.: retornos_om do RPC):
+            # saem do SQLite quando o RPC for aceito e voltam com id real no pull
+            temporarios = {}
+            for t, limite in limites.items():
+                ids = [int(r[0]) for r in self.conn.execute(f"SELECT id FROM {_ident(t)} WHERE id <= ?", (limite,))]
+                ids = [i for i in ids if (t, i) != ("casos", opcoes.get("temp_id"))]
+                if ids:
+                    temporarios[t] = ids
+            if temporarios:
+                opcoes["temporarios"] = temporarios
+            self._enfileirar("rpc", nome, params, opcoes=opcoes)
+        return _RpcLocal(data)
+
+    def _rpc_salvar_solicitacao(self, p: dict):
+        caso_id = int(p["p_caso_id"])
+        oms = list(dict.fromkeys(p.get("p_oms") or []))
+        prazo = _valor(p.get("p_prazo_om"))
+        self.conn.execute(
+            "UPDATE casos SET assunto_solic = ?, prazo_om = ?, status = 'Distribuído', nr_doc_solicitado = ? WHERE id = ?",
+            (p.get("p_assunto_solic"), prazo, p.get("p_nr_doc_solicitado"), caso_id),
+        )
+        marcas = ",".join("?" * len(oms))
+        if oms:
+            self.conn.execute(f"DELETE FROM retornos_om WHERE caso_id = ? AND om NOT IN ({marcas})", [caso_id, *oms])
+            self.conn.execute(f"UPDATE retornos_om SET prazo_om = ? WHERE caso_id = ? AND om IN ({marcas})", [prazo, caso_id, *oms])
+        else:
+            self.conn.execute("DELETE FROM retornos_om WHERE caso_id = ?", (caso_id,))
+        owner = self.conn.execute("SELECT owner_id FROM casos WHERE id = ?", (caso_id,)).fetchone()
+        for om in oms:
+            self.conn.execute(
+                "INSERT INTO retornos_om (id, owner_id, caso_id, om, status, prazo_om) VALUES (?, ?, ?, ?, 'Pendente', ?) "
+                "ON CONFLICT (caso_id, om) DO NOTHING",
+                (self._proximo_temp_id("retornos_om"), owner[0] if owner else None, caso_id, om, prazo),
+            )
+        return None
+
+    def _rpc_save_caso_full(self, p: dict):
+        # mesma regra do sql/011; a transação é a do rpc()
+        def txt(k: str) -> str | None:
+            return (p.get(k) or "").strip() or None
+
+        oms = list(dict.fromkeys(p.get("p_oms") or []))
+        prazo_final, prazo_om = _valor(p.get("p_prazo_final")), _valor(p.get("p_prazo_om"))
+        nr_doc, assunto_doc, origem, obs = txt("p_nr_doc_recebido"), txt("p_assunto_doc"), txt("p_origem"), txt("p_observacoes")
+        assunto_solic, nr_solic, nr_resp = txt("p_assunto_solic"), txt("p_nr_doc_solicitado"), txt("p_nr_doc_resposta")
+        tem_solic = bool(assunto_solic or nr_solic or prazo_om or oms)
+        agora = datetime.now().isoformat()
+
+        caso_id = p.get("p_caso_id")
+        if caso_id is not None:
+            caso_id = int(caso_id)
+            cur = self.conn.execute(
+                "UPDATE casos SET nr_doc_recebido = ?, assunto_doc = ?, origem = ?, prazo_final = ?, observacoes = ?, "
+                "assunto_solic = ?, prazo_om = ?, nr_doc_solicitado = ? WHERE id = ?",
+                (nr_doc or "-", assunto_doc or "-", origem or "-", prazo_final, obs or "-", assunto_solic, prazo_om, nr_solic, caso_id),
+            )
+            if cur.rowcount == 0:
+                raise ValueError(f"Caso {caso_id} não encontrado.")
+            aplicar_solic = tem_solic
+        elif nr_doc or assunto_doc or origem or prazo_final or obs:
+            caso_id = self._proximo_temp_id("casos")
+            self.conn.execute(
+                "INSERT INTO casos (id, owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 'Recebido', ?)",
+                (caso_id, self.owner_id, nr_doc or "-", assunto_doc or "-", origem or "-", prazo_final, obs or "-", agora),
+            )
+            aplicar_solic = tem_solic
+        elif assunto_solic:
+            caso_id = self._proximo_temp_id("casos")
+            self.conn.execute(
+                "INSERT INTO casos (id, owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, "
+                "assunto_solic, prazo_om, nr_doc_solicitado, status, created_at) "
+                "VALUES (?, ?, '-', '-', '-', NULL, '-', ?, ?, ?, 'Distribuído', ?)",
+                (caso_id, self.owner_id, assunto_solic, prazo_om, nr_solic or "00", agora),
+            )
+            aplicar_solic = bool(oms)
+        else:
+            raise ValueError("Preencha algum campo para salvar.")
+
+        if aplicar_solic:
+            self._rpc_salvar_solicitacao(
+                {
+                    "p_caso_id": caso_id,
+                    "p_assunto_solic": assunto_solic,
+                    "p_prazo_om": prazo_om,
+                    "p_oms": oms,
+                    "p_nr_doc_solicitado": nr_solic or "00",
+                }
+            )
+
+        self.conn.execute(
+            "UPDATE casos SET nr_doc_resposta = ?, status = ?, resolved_at = ? WHERE id = ?",
+            (nr_resp, "Resolvido" if nr_resp else "Pendente", date.today().isoformat() if nr_resp else None, caso_id),
+        )
+        return self._ler_por_ids("casos", [caso_id])[0]
+
+    def _rpc_delete_casos(self, p: dict):
+        # mesma ordem do sql/012 (e 014: também o arquivo frio); a transação é a do rpc()
+        ids = [int(i) for i in p.get("p_ids") or []]
+        if not ids:
+            return 0
+        marcas = ",".join("?" * len(ids))
+        self.conn.execute(f"DELETE FROM retornos_om WHERE caso_id IN ({marcas})", ids)
+        self.conn.execute(f"DELETE FROM arquivados WHERE caso_id IN ({marcas})", ids)
+        n = self.conn.execute(f"DELETE FROM casos WHERE id IN ({marcas})", ids).rowcount
+        return n + self.conn.execute(f"DELETE FROM casos_frios WHERE id IN ({marcas})", ids).rowcount
+
+    def _rpc_restaurar_casos(self, p: dict):
+        # mesma regra do sql/014: sai de arquivados e, se estiver no frio, volta para casos / retornos_om
+        ids = [int(i) for i in p.get("p_ids") or []]
+        if not ids:
+            return 0
+        marcas = ",".join("?" * len(ids))
+        n = self.conn.execute(f"DELETE FROM arquivados WHERE caso_id IN ({marcas})", ids).rowcount
+        frios = [dict(r) for r in self.conn.execute(f"SELECT * FROM casos_frios WHERE id IN ({marcas})", ids)]
+        for f in frios:
+            self._upsert_linhas("casos", [f])
+            self._upsert_linhas("retornos_om", json.loads(f.get("retornos") or "[]"))
+        self.conn.execute(f"DELETE FROM casos_frios WHERE id IN ({marcas})", ids)
+        return n + len(frios)
+
+    def _rpc_arquivar_resolvidos(self, p: dict):
+        # mesma regra do sql/013; a transação é a do rpc()
+        limite = max(1, int(p.get("p_limite") or 500))
+        corte = (date.today() - timedelta(days=max(0, int(p.get("p_dias") or 0)))).isoformat()
+        casos = self.conn.execute(
+            "SELECT id, owner_id FROM casos c WHERE lower(coalesce(status, '')) = 'resolvido' "
+            "AND nullif(resolved_at, '') IS NOT NULL AND substr(resolved_at, 1, 10) <= ? "
+            "AND NOT EXISTS (SELECT 1 FROM arquivados a WHERE a.caso_id = c.id) "
+            "ORDER BY resolved_at, id LIMIT ?",
+            (corte, limite),
+        ).fetchall()
+        agora = datetime.now().isoformat()
+        for caso_id, owner in casos:
+            self.conn.execute(
+                "INSERT INTO arquivados (id, owner_id, caso_id, archived_at) VALUES (?, ?, ?, ?)",
+                (self._proximo_temp_id("arquivados"), owner, caso_id, agora),
+            )
+        return len(casos)
+
+    def _indice_busca(self) -> busca.IndiceBusca:
+        # refeito só quando o SQLite mudou (total_changes conta todas as escritas desta conexão)
+        versao = self.conn.total_changes
+        if self._busca is None or self._busca_versao != versao:
+            cols = ", ".join(["id", *busca.PESOS])
+            self._busca = busca.IndiceBusca([dict(r) for r in self.conn.execute(f"SELECT {cols} FROM casos")])
+            self._busca_versao = versao
+        return self._busca
+
+    def _rpc_buscar_casos(self, p: dict):
+        limite = min(max(int(p.get("p_limite") or 50), 1), 200)
+        indice = self._indice_busca()
+        rank = dict(indice.buscar(p.get("p_q") or "", limite=max(len(indice), 1)))
+        if not rank:
+            return []
+        ids = list(rank)
+        marcas = ",".join("?" * len(ids))
+        rows = [dict(r) for r in self.conn.execute(f"SELECT * FROM casos_dashboard WHERE id IN ({marcas})", ids)]
+        rows.sort(key=lambda r: (-rank[r["id"]], -r["id"]))
+        return rows[:limite]
+
+    # -----------------------------------------------------
+    # sincronização com o Supabase
+    # -----------------------------------------------------
+    def sincronizar(self, sb) -> set[str]:
+        # push primeiro (não sobrescrever edição local com estado antigo do servidor)
+        na_fila = self.pendentes()
+        alteradas: set[str] = set()
+        try:
+            self.reenviar_outbox(sb)
+            alteradas = self.puxar(sb)
+            self.ultimo_erro = None
+        except (httpx.HTTPError, APIError) as e:
+            # rede / sessão / servidor: o que não foi aceito continua na outbox
+            self.ultimo_erro = _descrever_erro(e)
+        if self.pendentes() < na_fila:
+            alteradas |= set(TABELAS)  # ids remapeados / linhas temporárias trocadas
+        return alteradas
+
+    def _wm(self, tabela: str) -> tuple[str | None, int]:
+        r = self.conn.execute("SELECT wm_updated_at, wm_id FROM _sync WHERE tabela = ?", (tabela,)).fetchone()
+        return (r[0], int(r[1] or 0)) if r else (None, 0)
+
+    def _set_wm(self, tabela: str, ts: str | None, rid: int):
+        self.conn.execute(
+            "INSERT INTO _sync (tabela, wm_updated_at, wm_id) VALUES (?, ?, ?) "
+            "ON CONFLICT (tabela) DO UPDATE SET wm_updated_at = excluded.wm_updated_at, wm_id = excluded.wm_id",
+            (tabela, ts, int(rid)),
+        )
+
+    def puxar(self, sb) -> set[str]:
+        alteradas: set[str] = set()
+
+        # exclusões feitas no servidor primeiro (tombstones, sql/006)
+        _, wm = self._wm("_exclusoes")
+        while True:
+            rows = sb.table("exclusoes").select("*").gt("id", wm).order("id").limit(LOTE_PULL).execute().data or []
+            if not rows:
+                break
+            with self._lock, self.conn:
+                for r in rows:
+                    if r.get("tabela") in TABELAS:
+                        self.conn.execute(f"DELETE FROM {_ident(r['tabela'])} WHERE id = ?", (int(r["registro_id"]),))
+                        alteradas.add(r["tabela"])
+                wm = int(rows[-1]["id"])
+                self._set_wm("_exclusoes", None, wm)
+            if len(rows) < LOTE_PULL:
+                break
+
+        for tabela in TABELAS:
+            while True:
+                ts, rid = self._wm(tabela)
+                q = sb.table(tabela).select("*").order("updated_at").order("id").limit(LOTE_PULL)
+                if ts:
+                    q = q.or_(f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{rid})')
+                rows = q.execute().data or []
+                if not rows:
+                    break
+                with self._lock, self.conn:
+                    self._gravar_do_servidor(tabela, rows)
+                    self._set_wm(tabela, rows[-1].get("updated_at"), int(rows[-1]["id"]))
+                alteradas.add(tabela)
+                if len(rows) < LOTE_PULL:
+                    break
+        return alteradas
+
+    def _id_map(self) -> dict[tuple[str, int], int]:
+        return {(t, int(a)): int(b) for t, a, b in self.conn.execute("SELECT tabela, temp_id, real_id FROM _id_map")}
+
+    def _remap(self, tabela: str, row: dict, mapa: dict) -> dict:
+        row = dict(row)
+        refs = {"id": tabela, "p_caso_id": "casos", "p_ids": "casos"}
+        if tabela in REFERENCIAS_CASO:
+            refs[REFERENCIAS_CASO[tabela]] = "casos"
+        for col, alvo in refs.items():
+            v = row.get(col)
+            if isinstance(v, int) and v < 0:
+                row[col] = mapa.get((alvo, v), v)
+            elif isinstance(v, list):
+                row[col] = [mapa.get((alvo, x), x) if isinstance(x, int) and x < 0 else x for x in v]
+        return row
+
+    def _remap_filtros(self, tabela: str, filtros: list, mapa: dict) -> list:
+        out = []
+        for op, col, val in filtros or []:
+            alvo = "casos" if (col == REFERENCIAS_CASO.get(tabela) or (tabela == "casos" and col == "id")) else tabela
+            if isinstance(val, int) and val < 0:
+                val = mapa.get((alvo, val), val)
+            elif isinstance(val, list):
+                val = [mapa.get((alvo, v), v) if isinstance(v, int) and v < 0 else v for v in val]
+            out.append((op, col, val))
+        return out
+
+    def _registrar_id_real(self, tabela: str, temp_id: int, real_id: int):
+        self.conn.execute("INSERT OR REPLACE INTO _id_map (tabela, temp_id, real_id) VALUES (?, ?, ?)", (tabela, temp_id, real_id))
+        self.conn.execute(f"UPDATE {_ident(tabela)} SET id = ? WHERE id = ?", (real_id, temp_id))
+        if tabela == "casos":
+            for t, col in REFERENCIAS_CASO.items():
+                self.conn.execute(f"UPDATE {_ident(t)} SET {_ident(col)} = ? WHERE {_ident(col)} = ?", (real_id, temp_id))
+
+    def _lotes_outbox(self) -> list[list[sqlite3.Row]]:
+        # agrupa entradas consecutivas de insert/upsert na mesma tabela num único envio
+        rows = self.conn.execute("SELECT * FROM _outbox ORDER BY seq LIMIT ?", (LOTE_PUSH,)).fetchall()
+        lotes: list[list[sqlite3.Row]] = []
+        for r in rows:
+            ant = lotes[-1][-1] if lotes else None
+            if (
+                ant is not None
+                and r["operacao"] in ("insert", "upsert")
+                and (ant["tabela"], ant["operacao"], ant["opcoes"]) == (r["tabela"], r["operacao"], r["opcoes"])
+            ):
+                lotes[-1].append(r)
+            else:
+                lotes.append([r])
+        return lotes
+
+    def _enviar_lote(self, sb, lote: list[sqlite3.Row], mapa: dict):
+        tabela, operacao = lote[0]["tabela"], lote[0]["operacao"]
+        opcoes = json.loads(lote[0]["opcoes"] or "{}")
+        if operacao in ("insert", "upsert"):
+            linhas = [self._remap(tabela, x, mapa) for r in lote for x in json.loads(r["payload"])]
+            if operacao == "insert":
+                temp_ids = [x.pop("id", None) for x in linhas]
+                res = sb.table(tabela).insert(linhas).execute()
+                for temp, real in zip(temp_ids, res.data or []):
+                    if isinstance(temp, int) and temp < 0:
+                        mapa[(tabela, temp)] = int(real["id"])
+                        self._registrar_id_real(tabela, temp, int(real["id"]))
+            else:
+                sb.table(tabela).upsert(linhas, on_conflict=opcoes.get("on_conflict", "id")).execute()
+            return
+
+        r = lote[0]
+        filtros = self._remap_filtros(tabela, json.loads(r["filtros"] or "[]"), mapa)
+        if operacao == "update":
+            q = sb.table(tabela).update(self._remap(tabela, json.loads(r["payload"]), mapa))
+        else:
+            q = sb.table(tabela).delete()
+        for op, col, val in filtros:
+            metodo = getattr(q, TabelaLocal._REENVIO[op])
+            q = metodo(val) if op == "or_" else metodo(col, val)
+        q.execute()
+
+    def _descartar_temporarios(self, temporarios: dict):
+        for tabela, ids in temporarios.items():
+            if tabela in TABELAS and ids:
+                marcas = ",".join("?" * len(ids))
+                self.conn.execute(f"DELETE FROM {_ident(tabela)} WHERE id < 0 AND id IN ({marcas})", [int(i) for i in ids])
+
+    def reenviar_outbox(self, sb) -> int:
+        # devolve quantas entradas o servidor aceitou; erro retentável (erro_retentavel) sobe
+        # e a entrada da vez continua na fila
+        enviados = 0
+        mapa = self._id_map()
+        while True:
+            with self._lock:
+                lotes = self._lotes_outbox()
+            if not lotes:
+                return enviados
+            for lote in lotes:
+                with self._lock, self.conn:
+                    try:
+                        if lote[0]["tabela"] == "rpc":
+                            params = self._remap("rpc", json.loads(lote[0]["payload"] or "{}"), mapa)
+                            res = sb.rpc(lote[0]["operacao"], params).execute()
+                            temp = json.loads(lote[0]["opcoes"] or "{}").get("temp_id")
+                            row = res.data[0] if isinstance(res.data, list) and res.data else res.data
+                            if temp is not None and isinstance(row, dict) and row.get("id") is not None:
+                                mapa[("casos", int(temp))] = int(row["id"])
+                                self._registrar_id_real("casos", int(temp), int(row["id"]))
+                            self._descartar_temporarios(json.loads(lote[0]["opcoes"] or "{}").get("temporarios") or {})
+                        else:
+                            self._enviar_lote(sb, lote, mapa)
+                        enviados += len(lote)
+                    except Exception as e:
+                        if erro_retentavel(e):
+                            raise
+                        # recusado pelo servidor (constraint, regra do RPC...): vai para _outbox_falhas
+                        # (a tela mostra) e sai da fila para não travar o resto; as linhas locais ficam
+                        self.conn.executemany(
+                            "INSERT OR REPLACE INTO _outbox_falhas "
+                            "SELECT seq, tabela, operacao, payload, filtros, opcoes, criado_em, ?, ? FROM _outbox WHERE seq = ?",
+                            [(_descrever_erro(e), datetime.now().isoformat(), r["seq"]) for r in lote],
+                        )
+                    self.conn.executemany("DELETE FROM _outbox WHERE seq = ?", [(r["seq"],) for r in lote])
+
+
+class _RpcLocal:
+    def __init__(self, data):
+        self._data = data
+
+    def execute(self) -> Resultado:
+        return Resultado(self._data)
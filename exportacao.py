@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+from datetime import date
+from typing import IO, Iterable
+
+import numpy as np
+import pandas as pd
+
+import visao
+
+# =========================================================
+# Exportação (Acompanhamento / Arquivados) para XLSX e CSV
+# - entrada: páginas (DataFrames) vindas do keyset do app, uma de cada vez
+# - XLSX: openpyxl write_only (linhas vão direto para o zip, nada fica na planilha)
+# - CSV: ";" + utf-8-sig, que é o que o Excel em português abre direto
+# - cores das linhas = mesmas categorias de urgência da tela (visao.URGENCIA_CSS)
+# - saída em bytes: é o que o st.download_button aceita de um data= adiado
+# =========================================================
+FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+LARGURA_MAX = 60
+
+
+def _cores_css(css: str) -> tuple[str | None, str | None]:
+    # "background-color: #fef9c3; color: #713f12;" -> ("FEF9C3", "713F12")
+    fundo = re.search(r"background-color:\s*#([0-9a-fA-F]{6})", css)
+    texto = re.search(r"(?<![-\w])color:\s*#([0-9a-fA-F]{6})", css)
+    return (fundo.group(1).upper() if fundo else None, texto.group(1).upper() if texto else None)
+
+
+def _celulas(df_show: pd.DataFrame, layout: list[tuple[str, str, str]]) -> list[np.ndarray]:
+    # colunas como arrays de objetos Python (datas -> date, vazio -> None)
+    out = []
+    for titulo, _, tipo in layout:
+        serie = df_show[titulo]
+        if tipo == "data":
+            out.append(np.array([None if pd.isna(d) else d.date() for d in serie], dtype=object))
+        else:
+            out.append(serie.astype(object).to_numpy())
+    return out
+
+
+def _tabelas(paginas: Iterable[pd.DataFrame], layout: list[tuple[str, str, str]], hoje: date):
+    for df in paginas:
+        if df is None or df.empty:
+            continue
+        df_show, urgencia = visao.montar_tabela(df, layout, hoje, memo=False)
+        yield _celulas(df_show, layout), urgencia
+
+
+def escrever_csv(paginas: Iterable[pd.DataFrame], layout: list[tuple[str, str, str]], destino: IO[bytes], hoje: date) -> int:
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="")
+    w = csv.writer(texto, delimiter=";")
+    w.writerow([titulo for titulo, _, _ in layout])
+    n = 0
+    for colunas, _ in _tabelas(paginas, layout, hoje):
+        for linha in zip(*colunas):
+            w.writerow(["" if v is None else v.strftime("%d/%m/%Y") if isinstance(v, date) else v for v in linha])
+        n += len(colunas[0])
+    texto.flush()
+    texto.detach()  # devolve o binário aberto para quem chamou
+    return n
+
+
+def escrever_xlsx(
+    paginas: Iterable[pd.DataFrame],
+    layout: list[tuple[str, str, str]],
+    destino: IO[bytes],
+    hoje: date,
+    titulo: str = "Planilha",
+) -> int:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo[:31])
+
+    # um estilo nomeado por (urgência, é data): cada célula só recebe o nome
+    estilos: dict[tuple[int, bool], str] = {}
+    for urg, css in visao.URGENCIA_CSS.items():
+        fundo, cor = _cores_css(css)
+        for eh_data in (False, True):
+            nome = f"urg{urg}{'_data' if eh_data else ''}"
+            est = NamedStyle(name=nome)
+            if fundo:
+                est.fill = PatternFill("solid", start_color=fundo, end_color=fundo)
+            if cor:
+                est.font = Font(color=cor)
+            if eh_data:
+                est.number_format = "DD/MM/YYYY"
+            wb.add_named_style(est)
+            estilos[(urg, eh_data)] = nome
+
+    eh_data = [tipo == "data" for _, _, tipo in layout]
+    larguras = [max(10, len(t) + 2) for t, _, _ in layout]
+    for i, w in enumerate(larguras, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = min(w, LARGURA_MAX)
+    ws.freeze_panes = "A2"
+
+    cab = []
+    for t, _, _ in layout:
+        c = WriteOnlyCell(ws, t)
+        c.font = Font(bold=True)
+        cab.append(c)
+    ws.append(cab)
+
+    n = 0
+    for colunas, urgencia in _tabelas(paginas, layout, hoje):
+        for i, linha in enumerate(zip(*colunas)):
+            urg = int(urgencia[i])
+            if urg == visao.URG_OK:
+                # linha sem cor: só as datas precisam de célula com formato
+                valores = list(linha)
+                for j, d in enumerate(eh_data):
+                    if d and valores[j] is not None:
+                        c = WriteOnlyCell(ws, valores[j])
+                        c.style = estilos[(urg, True)]
+                        valores[j] = c
+                ws.append(valores)
+            else:
+                cells = []
+                for v, d in zip(linha, eh_data):
+                    c = WriteOnlyCell(ws, v)
+                    c.style = estilos[(urg, d)]
+                    cells.append(c)
+                ws.append(cells)
+        n += len(colunas[0])
+
+    wb.save(destino)
+    return n
+
+
+def exportar(
+    paginas: Iterable[pd.DataFrame],
+    layout: list[tuple[str, str, str]],
+    formato: str,
+    titulo: str = "Planilha",
+    hoje: date | None = None,
+) -> bytes:
+    # conteúdo do arquivo pronto para download
+    hoje = hoje or date.today()
+    destino = io.BytesIO()
+    if formato == "xlsx":
+        escrever_xlsx(paginas, layout, destino, hoje, titulo)
+    elif formato == "csv":
+        escrever_csv(paginas, layout, destino, hoje)
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+    return destino.getvalue()
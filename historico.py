@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from datetime import date
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+import arquivamento
+import espelho_local
+
+# =========================================================
+# Snapshots históricos do arquivo frio (casos_frios, sql/014)
+# - um arquivo por ano de arquivamento: arquivados_<ano>.parquet (zstd) ou .jsonl.gz
+# - exportar: lê o frio do ano em páginas (keyset por id) e grava o arquivo;
+#   com --remover apaga do banco o que foi gravado (o banco fica só com o recente)
+# - rodar de novo no mesmo ano junta o que chegou depois ao arquivo que já existe
+# - o app lê um ano só quando ele é escolhido em Arquivados → Histórico (ler)
+#
+# Conexão pelo ambiente (mesma do arquivamento.py):
+#   SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, HISTORICO_DIR (padrão historico)
+#
+# Uso: python historico.py --ano 2022 [--formato parquet|jsonl] [--remover]
+# =========================================================
+FORMATOS = {"parquet": ".parquet", "jsonl": ".jsonl.gz"}
+PASTA_PADRAO = "historico"
+LOTE_PADRAO = 1000
+IN_BATCH = 200
+COLUNAS = espelho_local.TABELAS["casos_frios"]
+_NOME = re.compile(r"^arquivados_(\d{4})\.(parquet|jsonl\.gz)$")
+
+
+def nome_arquivo(ano: int, formato: str) -> str:
+    return f"arquivados_{int(ano)}{FORMATOS[formato]}"
+
+
+def snapshots(pasta: str) -> dict[int, str]:
+    # {ano: caminho}; com os dois formatos no mesmo ano fica o parquet
+    out: dict[int, str] = {}
+    try:
+        nomes = sorted(os.listdir(pasta), key=lambda n: n.endswith(".parquet"))
+    except FileNotFoundError:
+        return out
+    for nome in nomes:
+        m = _NOME.match(nome)
+        if m:
+            out[int(m.group(1))] = os.path.join(pasta, nome)
+    return out
+
+
+def _linha(r: dict) -> dict:
+    # tudo texto (como o PostgREST devolve datas), id inteiro, retornos em JSON
+    out = {}
+    for c in COLUNAS:
+        v = r.get(c)
+        if c == "id":
+            out[c] = int(v)
+        elif v is None:
+            out[c] = None
+        elif isinstance(v, (list, dict)):
+            out[c] = json.dumps(v, ensure_ascii=False, default=str)
+        else:
+            out[c] = str(v)
+    return out
+
+
+def escrever(paginas: Iterable[list[dict]], caminho: str, formato: str) -> int:
+    # grava num .tmp e troca no fim: arquivo pela metade nunca substitui o anterior
+    tmp = caminho + ".tmp"
+    n = 0
+    if formato == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(c, pa.int64() if c == "id" else pa.string()) for c in COLUNAS])
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as w:
+            for linhas in paginas:
+                if linhas:
+                    w.write_table(pa.Table.from_pylist([_linha(r) for r in linhas], schema=schema))
+                    n += len(linhas)
+    elif formato == "jsonl":
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for linhas in paginas:
+                for r in linhas:
+                    f.write(json.dumps(_linha(r), ensure_ascii=False) + "\n")
+                n += len(linhas)
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+    os.replace(tmp, caminho)
+    return n
+
+
+def _ler_linhas(caminho: str, owner_id: str | None = None, colunas: list[str] | None = None) -> pd.DataFrame:
+    if caminho.endswith(".parquet"):
+        filtros = [("owner_id", "==", owner_id)] if owner_id else None
+        return pd.read_parquet(caminho, columns=colunas, filters=filtros)
+    linhas = []
+    with gzip.open(caminho, "rt", encoding="utf-8") as f:
+        for texto in f:
+            r = json.loads(texto)
+            if owner_id is None or r.get("owner_id") == owner_id:
+                linhas.append({c: r.get(c) for c in colunas} if colunas else r)
+    return pd.DataFrame(linhas, columns=colunas or COLUNAS)
+
+
+@functools.lru_cache(maxsize=4)
+def _ler_cache(caminho: str, mtime: float, owner_id: str) -> pd.DataFrame:
+    df = _ler_linhas(caminho, owner_id, [c for c in COLUNAS if c != "retornos"])
+    return df.sort_values("id", ascending=False, ignore_index=True)
+
+
+def ler(caminho: str, owner_id: str) -> pd.DataFrame:
+    # só os casos do usuário e sem os retornos; somente leitura (vem do cache)
+    return _ler_cache(caminho, os.path.getmtime(caminho), owner_id)
+
+
+# =========================================================
+# Exportação (linha de comando)
+# =========================================================
+def _args(argv=None):
+    p = argparse.ArgumentParser(description="Exporta um ano do arquivo frio para um snapshot comprimido.")
+    p.add_argument("--ano", type=int, required=True)
+    p.add_argument("--formato", choices=list(FORMATOS), default="parquet")
+    p.add_argument("--pasta", default=os.environ.get("HISTORICO_DIR", PASTA_PADRAO))
+    p.add_argument("--lote", type=int, default=LOTE_PADRAO)
+    p.add_argument("--remover", action="store_true", help="apaga do banco o que foi gravado no snapshot")
+    return p.parse_args(argv)
+
+
+def iter_frios(sb, ano: int, lote: int) -> Iterator[list[dict]]:
+    ultimo = 0
+    while True:
+        rows = (
+            sb.table("casos_frios")
+            .select("*")
+            .gte("archived_at", f"{ano}-01-01")
+            .lt("archived_at", f"{ano + 1}-01-01")
+            .gt("id", ultimo)
+            .order("id")
+            .limit(lote)
+            .execute()
+            .data
+            or []
+        )
+        if not rows:
+            return
+        yield rows
+        ultimo = int(rows[-1]["id"])
+        if len(rows) < lote:
+            return
+
+
+def exportar_ano(sb, ano: int, pasta: str, formato: str, lote: int = LOTE_PADRAO) -> tuple[str, int, list[int]]:
+    # devolve (arquivo, quantos entraram agora, ids lidos do banco — todos já no arquivo)
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, nome_arquivo(ano, formato))
+    anteriores: list[dict] = []
+    if os.path.exists(caminho):
+        df = _ler_linhas(caminho)
+        anteriores = df.astype(object).where(df.notna(), None).to_dict("records")
+    vistos = {int(r["id"]) for r in anteriores}
+    lidos: list[int] = []
+
+    def paginas():
+        yield anteriores
+        for rows in iter_frios(sb, ano, max(1, lote)):
+            lidos.extend(int(r["id"]) for r in rows)
+            yield [r for r in rows if int(r["id"]) not in vistos]
+
+    n = escrever(paginas(), caminho, formato)
+    return caminho, n - len(anteriores), lidos
+
+
+def remover_do_banco(sb, ids: list[int]):
+    # in_ em fatias (a lista vai na URL)
+    for i in range(0, len(ids), IN_BATCH):
+        sb.table("casos_frios").delete().in_("id", ids[i : i + IN_BATCH]).execute()
+
+
+def main(argv=None):
+    args = _args(argv)
+    if args.ano >= date.today().year:
+        raise SystemExit("Só anos já encerrados vão para o histórico.")
+    sb = arquivamento.connect_supabase()
+    t0 = time.perf_counter()
+    caminho, novos, lidos = exportar_ano(sb, args.ano, args.pasta, args.formato, args.lote)
+    print(f"[{args.ano}] {novos} caso(s) novo(s) gravado(s) em {caminho} ({time.perf_counter() - t0:.1f}s).")
+    if args.remover and lidos:
+        remover_do_banco(sb, lidos)
+        print(f"[{args.ano}] {len(lidos)} caso(s) removido(s) do arquivo frio.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+from typing import IO, Iterator
+
+import numpy as np
+import pandas as pd
+
+import busca
+
+# =========================================================
+# Importação de documentos (Excel/CSV)
+# - leitura em blocos: openpyxl read_only (xlsx) ou pandas chunksize (csv)
+# - validação/normalização vetorizada por bloco, com os mesmos padrões "-"
+#   do formulário (campo vazio vira "-"); erro reportado pela linha da planilha
+# - o app insere os registros válidos em lotes multi-linha
+# =========================================================
+LINHAS_POR_BLOCO = 500
+
+CAMPOS = ["nr_doc_recebido", "assunto_doc", "origem", "prazo_final", "observacoes"]
+
+# cabeçalhos aceitos (já normalizados: sem acento, minúsculo, só letras/números; "Nº" vira "no")
+CABECALHOS = {
+    "nr_doc_recebido": [
+        "nr doc recebido", "nr doc", "nr documento", "no doc", "no documento",
+        "numero", "numero do documento", "n doc", "documento", "nr",
+    ],
+    "assunto_doc": ["assunto doc", "assunto documento", "assunto do documento", "assunto"],
+    "origem": ["origem"],
+    "prazo_final": ["prazo final", "prazo"],
+    "observacoes": ["observacoes", "observacao", "obs"],
+}
+_ALIAS = {alias: campo for campo, aliases in CABECALHOS.items() for alias in aliases}
+
+_FORMATOS_DATA = ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%y"]
+
+
+def _chave_cabecalho(nome) -> str:
+    return " ".join(busca.tokens(nome))
+
+
+def mapear_cabecalho(cabecalho: list) -> dict[int, str]:
+    # posição da coluna na planilha -> campo do caso (a primeira ocorrência vence)
+    mapa: dict[int, str] = {}
+    for i, nome in enumerate(cabecalho):
+        campo = _ALIAS.get(_chave_cabecalho(nome))
+        if campo and campo not in mapa.values():
+            mapa[i] = campo
+    if not mapa:
+        raise ValueError("Cabeçalho não reconhecido: use colunas como Nr Doc, Assunto, Origem, Prazo Final, Obs.")
+    return mapa
+
+
+def _bloco(linhas: list[tuple], mapa: dict[int, str], primeira_linha: int) -> pd.DataFrame:
+    cols = {campo: [r[i] if i < len(r) else None for r in linhas] for i, campo in mapa.items()}
+    df = pd.DataFrame(cols, dtype=object).reindex(columns=CAMPOS)
+    df.index = pd.RangeIndex(primeira_linha, primeira_linha + len(linhas), name="linha")
+    return df
+
+
+def _ler_xlsx(arquivo: IO[bytes], linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        mapa = mapear_cabecalho(list(cabecalho))
+        buf: list[tuple] = []
+        inicio = 2
+        for n, r in enumerate(linhas, start=2):
+            if not buf:
+                inicio = n
+            buf.append(r)
+            if len(buf) >= linhas_por_bloco:
+                yield _bloco(buf, mapa, inicio)
+                buf = []
+        if buf:
+            yield _bloco(buf, mapa, inicio)
+    finally:
+        wb.close()
+
+
+def _codificacao_csv(arquivo: IO[bytes]) -> str:
+    # utf-8 (com ou sem BOM) se o arquivo todo decodifica; senão latin-1 (CSV do Excel antigo)
+    # confere em pedaços, sem montar o arquivo inteiro na memória
+    dec = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for pedaco in iter(lambda: arquivo.read(1 << 16), b""):
+            dec.decode(pedaco)
+        dec.decode(b"", final=True)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "latin-1"
+    finally:
+        arquivo.seek(0)
+
+
+def _ler_csv(arquivo: IO[bytes], linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+    texto = io.TextIOWrapper(arquivo, encoding=_codificacao_csv(arquivo), newline="")
+    try:
+        try:
+            sep = csv.Sniffer().sniff(texto.read(4096), delimiters=";,\t").delimiter
+        except csv.Error:
+            sep = ";"
+        texto.seek(0)
+
+        leitor = pd.read_csv(texto, sep=sep, dtype=str, keep_default_na=False, chunksize=linhas_por_bloco)
+        mapa = None
+        inicio = 2
+        for chunk in leitor:
+            if mapa is None:
+                mapa = mapear_cabecalho(list(chunk.columns))
+            linhas = list(chunk.itertuples(index=False, name=None))
+            yield _bloco(linhas, mapa, inicio)
+            inicio += len(linhas)
+    finally:
+        texto.detach()  # o arquivo é de quem chamou: não fecha junto com o wrapper
+
+
+def ler_planilha(arquivo: IO[bytes], nome: str, linhas_por_bloco: int = LINHAS_POR_BLOCO) -> Iterator[pd.DataFrame]:
+    # blocos com as colunas de CAMPOS; o índice é o nº da linha na planilha
+    if nome.lower().endswith((".xlsx", ".xlsm")):
+        return _ler_xlsx(arquivo, linhas_por_bloco)
+    if nome.lower().endswith((".csv", ".txt")):
+        return _ler_csv(arquivo, linhas_por_bloco)
+    raise ValueError("Formato não suportado: envie .xlsx ou .csv")
+
+
+def _str(v) -> str:
+    # número do Excel: 1235.0 -> "1235"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _texto(serie: pd.Series) -> pd.Series:
+    s = serie.astype(object).where(serie.notna(), "")
+    return s.map(_str).str.strip()
+
+
+def _datas(serie: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    # (datas ISO ou None, máscara de inválidas); aceita datetime do Excel e texto dd/mm/aaaa ou ISO
+    texto = _texto(serie)
+    vazio = (texto == "").to_numpy()
+    eh_data = serie.map(lambda v: hasattr(v, "year")).to_numpy(dtype=bool)
+
+    datas = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+    if eh_data.any():
+        datas[eh_data] = pd.to_datetime(serie[eh_data], errors="coerce")
+    pend = ~eh_data & ~vazio
+    for fmt in _FORMATOS_DATA:
+        if not pend.any():
+            break
+        tent = pd.to_datetime(texto[pend].str.slice(0, 10), format=fmt, errors="coerce")
+        ok = tent.notna().to_numpy()
+        idx = texto.index[pend][ok]
+        datas[idx] = tent[ok]
+        pend[np.flatnonzero(pend)[ok]] = False
+
+    iso = datas.dt.strftime("%Y-%m-%d").astype(object).where(datas.notna(), None)
+    return iso, pend
+
+
+def validar(bloco: pd.DataFrame) -> tuple[pd.DataFrame, list[tuple[int, str]]]:
+    # devolve (válidos já normalizados, índice = linha; [(linha, erro)]); linhas vazias são ignoradas
+    txt = {c: _texto(bloco[c]) for c in CAMPOS if c != "prazo_final"}
+    prazo, prazo_invalido = _datas(bloco["prazo_final"])
+
+    vazia = np.logical_and.reduce([(s == "").to_numpy() for s in txt.values()] + [(_texto(bloco["prazo_final"]) == "").to_numpy()])
+    sem_ident = (txt["nr_doc_recebido"] == "").to_numpy() & (txt["assunto_doc"] == "").to_numpy()
+
+    erros: list[tuple[int, str]] = []
+    for mask, msg in [
+        (sem_ident & ~vazia, "sem Nr Doc e sem Assunto"),
+        (prazo_invalido & ~vazia, "Prazo Final inválido (use dd/mm/aaaa)"),
+    ]:
+        erros += [(int(linha), msg) for linha in bloco.index[mask]]
+
+    ok = ~vazia & ~sem_ident & ~prazo_invalido
+    out = pd.DataFrame(
+        {
+            "nr_doc_recebido": txt["nr_doc_recebido"][ok].replace("", "-"),
+            "assunto_doc": txt["assunto_doc"][ok].replace("", "-"),
+            "origem": txt["origem"][ok].replace("", "-"),
+            "prazo_final": prazo[ok],
+            "observacoes": txt["observacoes"][ok].replace("", "-"),
+        }
+    )
+    return out, sorted(erros)
+
+
+def lotes(validos: pd.DataFrame, tamanho: int) -> Iterator[tuple[list[int], list[dict]]]:
+    # (linhas da planilha, registros) em fatias de até `tamanho`
+    for i in range(0, len(validos), tamanho):
+        fatia = validos.iloc[i : i + tamanho]
+        yield [int(x) for x in fatia.index], fatia.to_dict("records")
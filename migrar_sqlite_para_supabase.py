@@ -1,68 +1,191 @@
+import argparse
+import json
+import os
 import sqlite3
+import sys
+import time
+
 import psycopg
+from psycopg import sql
+
+# =========================================================
+# Migração SQLite -> Supabase (Postgres)
+# - lê em lotes (fetchmany, keyset por id) sem carregar a tabela inteira
+# - cada lote: COPY FROM STDIN numa tabela temporária + upsert por id
+# - commit por lote + checkpoint por tabela: rodar de novo continua de onde parou
+# - nada de TRUNCATE: rodar duas vezes não duplica nem apaga nada
+#
+# Conexão pelo ambiente (nada de senha no código):
+#   DATABASE_URL=postgresql://...   ou   PGHOST / PGPORT / PGDATABASE / PGUSER / PGPASSWORD
+#   SQLITE_PATH (padrão controle_docs.sqlite), MIGRAR_OWNER_ID (preenche owner_id)
+#
+# Uso: python migrar_sqlite_para_supabase.py [--tabelas casos retornos_om] [--lote 5000] [--reiniciar]
+# =========================================================
+# Ordem correta (por causa de chaves estrangeiras)
+TABELAS = ["casos", "master_oms", "retornos_om", "arquivados", "responsaveis_contatos"]
+LOTE_PADRAO = 5000
+
+
+def _args(argv=None):
+    p = argparse.ArgumentParser(description="Migra o SQLite local para o Postgres do Supabase.")
+    p.add_argument("--sqlite", default=os.environ.get("SQLITE_PATH", "controle_docs.sqlite"))
+    p.add_argument("--tabelas", nargs="+", default=TABELAS, choices=TABELAS)
+    p.add_argument("--lote", type=int, default=int(os.environ.get("MIGRAR_LOTE", LOTE_PADRAO)))
+    p.add_argument("--owner-id", default=os.environ.get("MIGRAR_OWNER_ID"))
+    p.add_argument("--checkpoint", default=None, help="arquivo de checkpoint (padrão: <sqlite>.migracao.json)")
+    p.add_argument("--reiniciar", action="store_true", help="ignora o checkpoint e migra tudo de novo")
+    return p.parse_args(argv)
+
+
+def connect_pg() -> psycopg.Connection:
+    # sem DATABASE_URL a libpq lê PGHOST/PGPORT/PGDATABASE/PGUSER/PGPASSWORD
+    return psycopg.connect(os.environ.get("DATABASE_URL", ""), connect_timeout=10)
+
+
+# =========================================================
+# Checkpoint (JSON ao lado do SQLite)
+# =========================================================
+def load_checkpoint(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoint(path: str, estado: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2)
+    os.replace(tmp, path)
 
-SQLITE_PATH = "controle_docs.sqlite"
 
-# >>> PREENCHA COM SEUS DADOS (USE A SENHA NOVA ROTACIONADA) <<<
-PG_HOST = "db.buseivqfsrunktqbeasn.supabase.co"
-PG_PORT = 5432
-PG_DB   = "postgres"
-PG_USER = "postgres"
-PG_PASS = "B0nf@d1n12018"
+# =========================================================
+# Leitura (SQLite) / escrita (Postgres)
+# =========================================================
+def sqlite_tables(conn) -> set[str]:
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
 
 
-def fetch_all_sqlite(conn, table: str):
-    cur = conn.cursor()
-    cur.execute(f"SELECT * FROM {table}")
-    rows = cur.fetchall()
+def pg_columns(pg_conn, table: str) -> list[str]:
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position",
+            (table,),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+
+def iter_sqlite(conn, table: str, after_id: int, lote: int):
+    cur = conn.execute(f'SELECT * FROM "{table}" WHERE id > ? ORDER BY id', (after_id,))
     cols = [d[0] for d in cur.description]
-    return cols, rows
+    while True:
+        rows = cur.fetchmany(lote)
+        if not rows:
+            return
+        yield cols, rows
 
 
-def migrate_table(pg_conn, table: str, cols, rows):
-    if not rows:
-        print(f"[{table}] sem dados, pulando.")
+def prepare_staging(pg_conn, table: str) -> sql.Identifier:
+    stg = sql.Identifier(f"_mig_{table}")
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            sql.SQL("CREATE TEMP TABLE IF NOT EXISTS {} (LIKE {} INCLUDING DEFAULTS)").format(
+                stg, sql.Identifier("public", table)
+            )
+        )
+    return stg
+
+
+def load_batch(pg_conn, table: str, stg: sql.Identifier, cols: list[str], rows: list[tuple]):
+    col_ids = sql.SQL(", ").join(map(sql.Identifier, cols))
+    updates = sql.SQL(", ").join(
+        sql.SQL("{c} = EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in cols if c != "id"
+    )
+    with pg_conn.cursor() as cur:
+        cur.execute(sql.SQL("TRUNCATE {}").format(stg))
+        with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(stg, col_ids)) as cp:
+            for r in rows:
+                cp.write_row(r)
+        cur.execute(
+            sql.SQL(
+                "INSERT INTO {dst} ({cols}) OVERRIDING SYSTEM VALUE SELECT {cols} FROM {stg} "
+                "ON CONFLICT (id) DO UPDATE SET {upd}"
+            ).format(dst=sql.Identifier("public", table), cols=col_ids, stg=stg, upd=updates)
+        )
+
+
+def sync_sequence(pg_conn, table: str):
+    # ids vieram do SQLite: a sequence precisa andar para os próximos inserts do app
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            sql.SQL(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), GREATEST((SELECT max(id) FROM {}), 1))"
+            ).format(sql.Identifier("public", table)),
+            (f"public.{table}",),
+        )
+
+
+def migrate_table(sconn, pg_conn, table: str, estado: dict, checkpoint_path: str, lote: int, owner_id: str | None):
+    ck = estado.setdefault(table, {"ultimo_id": 0, "linhas": 0, "concluida": False})
+    if ck["concluida"]:
+        print(f"[{table}] já migrada ({ck['linhas']} linhas), pulando.")
         return
 
-    col_list = ", ".join(cols)
-    placeholders = ", ".join(["%s"] * len(cols))
-    sql = f"INSERT INTO public.{table} ({col_list}) VALUES ({placeholders})"
+    destino = set(pg_columns(pg_conn, table))
+    stg = prepare_staging(pg_conn, table)
+    pg_conn.commit()
+
+    t0 = time.perf_counter()
+    feitas = 0
+    for cols, rows in iter_sqlite(sconn, table, int(ck["ultimo_id"]), lote):
+        keep = [i for i, c in enumerate(cols) if c in destino]
+        out_cols = [cols[i] for i in keep]
+        out_rows = [tuple(r[i] for i in keep) for r in rows]
+        if owner_id and "owner_id" in destino and "owner_id" not in out_cols:
+            out_cols.append("owner_id")
+            out_rows = [r + (owner_id,) for r in out_rows]
+
+        load_batch(pg_conn, table, stg, out_cols, out_rows)
+        pg_conn.commit()
 
-    with pg_conn.cursor() as cur:
-        # limpa para evitar duplicar (ordem importa por FKs)
-        cur.execute(f"TRUNCATE TABLE public.{table} RESTART IDENTITY CASCADE;")
+        # checkpoint só depois do commit: no pior caso o lote é reenviado (upsert)
+        feitas += len(rows)
+        ck["ultimo_id"] = int(rows[-1][cols.index("id")])
+        ck["linhas"] += len(rows)
+        save_checkpoint(checkpoint_path, estado)
 
-        cur.executemany(sql, rows)
+        dt = time.perf_counter() - t0
+        print(f"[{table}] {ck['linhas']} linhas (até id {ck['ultimo_id']}) • {feitas / dt if dt else 0:,.0f} linhas/s")
 
-    print(f"[{table}] inseriu {len(rows)} linhas.")
+    sync_sequence(pg_conn, table)
+    pg_conn.commit()
+    ck["concluida"] = True
+    save_checkpoint(checkpoint_path, estado)
+    dt = time.perf_counter() - t0
+    print(f"[{table}] concluída: {feitas} linhas nesta execução em {dt:.1f}s.")
 
 
-def main():
-    # SQLite
-    sconn = sqlite3.connect(SQLITE_PATH)
-    sconn.row_factory = None
+def main(argv=None):
+    args = _args(argv)
+    checkpoint_path = args.checkpoint or args.sqlite + ".migracao.json"
+    estado = {} if args.reiniciar else load_checkpoint(checkpoint_path)
 
-    # Postgres (Supabase)
-    pg_conn = psycopg.connect(
-        host=PG_HOST,
-        port=PG_PORT,
-        dbname=PG_DB,
-        user=PG_USER,
-        password=PG_PASS,
-        connect_timeout=10,
-    )
+    sconn = sqlite3.connect(args.sqlite)
+    existentes = sqlite_tables(sconn)
+    pg_conn = connect_pg()
 
     try:
-        # Ordem correta (por causa de chaves estrangeiras)
-        for table in ["casos", "master_oms", "retornos_om", "arquivados"]:
-            cols, rows = fetch_all_sqlite(sconn, table)
-            migrate_table(pg_conn, table, cols, rows)
-
-        pg_conn.commit()
+        for table in [t for t in TABELAS if t in args.tabelas]:
+            if table not in existentes:
+                print(f"[{table}] não existe no SQLite, pulando.")
+                continue
+            migrate_table(sconn, pg_conn, table, estado, checkpoint_path, max(1, args.lote), args.owner_id)
         print("\n✅ Migração concluída com sucesso.")
-    except Exception as e:
+    except Exception:
         pg_conn.rollback()
-        print("\n❌ Erro na migração. Nada foi gravado.")
+        print(f"\n❌ Erro na migração. Lotes já confirmados ficam; rode de novo para continuar ({checkpoint_path}).")
         raise
     finally:
         sconn.close()
@@ -70,4 +193,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import dados_async
+
+# =========================================================
+# Feed de mudanças (Supabase Realtime / postgres_changes)
+# - um broadcaster entrega eventos normalizados:
+#   {"tabela", "tipo" (INSERT/UPDATE/DELETE), "registro", "anterior"}
+# - FeedMudancas (um por sessão) enfileira os eventos; o app drena a fila,
+#   invalida só as tabelas tocadas e põe no cache a linha nova de cada caso
+# - BroadcasterLocal é o falso para testes / uso offline
+# =========================================================
+TABELAS = ("casos", "retornos_om", "arquivados")
+IDLE_SEGUNDOS = 600  # sessão que não drena há 10 min (aba fechada) solta a assinatura
+
+
+def _evento(tabela: str, tipo: str, registro: dict | None, anterior: dict | None = None) -> dict:
+    return {
+        "tabela": tabela,
+        "tipo": str(tipo).upper(),
+        "registro": dict(registro or {}),
+        "anterior": dict(anterior or {}),
+    }
+
+
+class BroadcasterLocal:
+    def __init__(self):
+        self._assinantes: list[Callable[[dict], None]] = []
+        self.conectado = False
+
+    def assinar(self, callback: Callable[[dict], None]):
+        self._assinantes.append(callback)
+
+    def iniciar(self):
+        self.conectado = True
+
+    def parar(self):
+        self.conectado = False
+        self._assinantes.clear()
+
+    def publicar(self, tabela: str, tipo: str, registro: dict | None = None, anterior: dict | None = None):
+        if not self.conectado:
+            return
+        ev = _evento(tabela, tipo, registro, anterior)
+        for cb in list(self._assinantes):
+            cb(ev)
+
+
+class BroadcasterSupabase:
+    def __init__(self, supabase_url: str, apikey: str, access_token: str | None):
+        self.url = supabase_url.rstrip("/") + "/realtime/v1"
+        self.apikey = apikey
+        self.access_token = access_token
+        self._assinantes: list[Callable[[dict], None]] = []
+        self._client = None
+        self.conectado = False
+
+    def assinar(self, callback: Callable[[dict], None]):
+        self._assinantes.append(callback)
+
+    def _receber(self, payload: dict):
+        data = payload.get("data") or {}
+        ev = _evento(data.get("table", ""), data.get("type", ""), data.get("record"), data.get("old_record"))
+        for cb in list(self._assinantes):
+            cb(ev)
+
+    async def _conectar(self):
+        from realtime import AsyncRealtimeClient
+
+        self._client = AsyncRealtimeClient(self.url, token=self.apikey, auto_reconnect=True)
+        await self._client.connect()
+        if self.access_token:
+            await self._client.set_auth(self.access_token)
+        canal = self._client.channel("controle-docs")
+        for tabela in TABELAS:
+            canal.on_postgres_changes("*", schema="public", table=tabela, callback=self._receber)
+        await canal.subscribe()
+        self.conectado = True
+
+    async def _desconectar(self):
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+
+    def iniciar(self):
+        # não bloqueia o script: conecta no loop de fundo do dados_async
+        dados_async.submit(self._conectar())
+
+    def parar(self):
+        self.conectado = False
+        self._assinantes.clear()
+        dados_async.submit(self._desconectar())
+
+
+class FeedMudancas:
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self._fila: deque[dict] = deque()
+        self._ultimo_dreno = time.monotonic()
+        self._lock = threading.Lock()
+        self.ativo = False
+        broadcaster.assinar(self._receber)
+
+    @property
+    def conectado(self) -> bool:
+        return bool(getattr(self.broadcaster, "conectado", False))
+
+    def _receber(self, evento: dict):
+        if time.monotonic() - self._ultimo_dreno > IDLE_SEGUNDOS:
+            self.parar()
+            return
+        with self._lock:
+            self._fila.append(evento)
+
+    def iniciar(self):
+        self.ativo = True
+        self.broadcaster.iniciar()
+
+    def parar(self):
+        self.ativo = False
+        self.broadcaster.parar()
+
+    def drenar(self) -> list[dict]:
+        # devolve (e tira da fila) os eventos recebidos desde o último dreno
+        self._ultimo_dreno = time.monotonic()
+        with self._lock:
+            eventos = list(self._fila)
+            self._fila.clear()
+        return eventos
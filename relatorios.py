@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import io
+import os
+import re
+import zipfile
+from collections import defaultdict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable
+
+# =========================================================
+# Relatórios de cobrança em lote (PDF / DOCX)
+# - entra dado pronto (dicts simples), sai bytes: nada de Supabase/Streamlit aqui,
+#   o módulo roda igual no app e fora dele
+# - cartas: uma por caso com retorno pendente (conteúdo do build_msg_cobranca)
+# - consolidado: pendências agrupadas por responsável, com os contatos cadastrados
+# - fonte, estilos e o modelo DOCX são montados uma vez por processo (lru_cache)
+# - renderização em série: reportlab / python-docx são Python puro e seguram o GIL,
+#   então threads não aceleram nada; cada carta vai para o zip assim que fica pronta
+# Fonte: Helvetica (cobre o português); RELATORIOS_FONTE=<arquivo .ttf> troca
+# =========================================================
+FORMATOS = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "zip": "application/zip",
+}
+
+
+def _fmt_data(v) -> str:
+    if not v or str(v).strip() in ("", "-", "None"):
+        return "-"
+    try:
+        return datetime.fromisoformat(str(v)[:10]).strftime("%d/%m/%Y")
+    except ValueError:
+        return str(v)
+
+
+def _txt(v) -> str:
+    s = "" if v is None else str(v).strip()
+    return s or "-"
+
+
+def _pendente(status) -> bool:
+    return str(status or "").strip().lower() != "respondido"
+
+
+# =========================================================
+# Dados: casos + retornos -> cartas / linhas do consolidado
+# =========================================================
+def montar_cartas(casos: Iterable[dict], retornos: Iterable[dict]) -> list[dict]:
+    # só casos com pelo menos um responsável pendente; ordem dos casos preservada
+    pendentes: dict[int, list[str]] = defaultdict(list)
+    for r in retornos:
+        if _pendente(r.get("status")) and r.get("caso_id") is not None:
+            pendentes[int(r["caso_id"])].append(_txt(r.get("om")))
+
+    emitida = date.today().strftime("%d/%m/%Y")
+    cartas = []
+    for c in casos:
+        oms = sorted(pendentes.get(int(c["id"]), []))
+        if not oms:
+            continue
+        cartas.append(
+            {
+                "id": int(c["id"]),
+                "assunto": _txt(c.get("assunto_solic")),
+                "nr_doc": _txt(c.get("nr_doc_solicitado")),
+                "prazo": _fmt_data(c.get("prazo_om")),
+                "nr_doc_recebido": _txt(c.get("nr_doc_recebido")),
+                "origem": _txt(c.get("origem")),
+                "pendentes": oms,
+                "emitida": emitida,
+            }
+        )
+    return cartas
+
+
+def montar_pendencias(cartas: list[dict], contatos: Iterable[dict]) -> list[dict]:
+    # [{responsavel, contatos: [(nome, telefone)], itens: [carta, ...]}] por nome do responsável
+    por_resp: dict[str, list[dict]] = defaultdict(list)
+    for c in cartas:
+        for om in c["pendentes"]:
+            por_resp[om].append(c)
+
+    agenda: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    for ct in contatos:
+        agenda[_txt(ct.get("responsavel"))].append((_txt(ct.get("contato_nome")), _txt(ct.get("telefone"))))
+
+    return [
+        {"responsavel": resp, "contatos": agenda.get(resp, []), "itens": itens}
+        for resp, itens in sorted(por_resp.items(), key=lambda kv: kv[0].lower())
+    ]
+
+
+def nome_arquivo(carta: dict, ext: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", carta["nr_doc"]).strip("-")[:40] or "sem-nr"
+    return f"cobranca_{carta['id']}_{slug}.{ext}"
+
+
+# =========================================================
+# PDF (reportlab)
+# =========================================================
+@lru_cache(maxsize=1)
+def _fonte() -> tuple[str, str]:
+    caminho = os.environ.get("RELATORIOS_FONTE")
+    if caminho and os.path.exists(caminho):
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        pdfmetrics.registerFont(TTFont("RelatorioFonte", caminho))
+        return "RelatorioFonte", "RelatorioFonte"
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=1)
+def _estilos() -> dict:
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    normal, negrito = _fonte()
+    base = getSampleStyleSheet()
+    return {
+        "titulo": ParagraphStyle("titulo", parent=base["Title"], fontName=negrito, fontSize=15, spaceAfter=10),
+        "sub": ParagraphStyle("sub", parent=base["Heading2"], fontName=negrito, fontSize=12, spaceBefore=8, spaceAfter=4),
+        "corpo": ParagraphStyle("corpo", parent=base["BodyText"], fontName=normal, fontSize=10.5, leading=14),
+        "item": ParagraphStyle("item", parent=base["BodyText"], fontName=normal, fontSize=10.5, leading=14, leftIndent=14),
+        "rodape": ParagraphStyle("rodape", parent=base["BodyText"], fontName=normal, fontSize=8.5, textColor=colors.grey),
+        "cel": ParagraphStyle("cel", parent=base["BodyText"], fontName=normal, fontSize=8.5, leading=10),
+        "cab": ParagraphStyle("cab", parent=base["BodyText"], fontName=negrito, fontSize=8.5, leading=10),
+    }
+
+
+def _esc(s: str) -> str:
+    return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _flowables_carta(carta: dict) -> list:
+    from reportlab.platypus import Paragraph, Spacer
+
+    e = _estilos()
+    out = [
+        Paragraph("Cobrança de retorno", e["titulo"]),
+        Paragraph(f"Emitida em {carta['emitida']} • Caso nº {carta['id']}", e["rodape"]),
+        Spacer(1, 10),
+        Paragraph("Solicito verificar a situação do retorno referente à seguinte solicitação:", e["corpo"]),
+        Spacer(1, 6),
+        Paragraph(f"<b>Assunto:</b> {_esc(carta['assunto'])}", e["item"]),
+        Paragraph(f"<b>Nr Doc:</b> {_esc(carta['nr_doc'])}", e["item"]),
+        Paragraph(f"<b>Prazo:</b> {carta['prazo']}", e["item"]),
+        Paragraph(f"<b>Documento de origem:</b> {_esc(carta['nr_doc_recebido'])} ({_esc(carta['origem'])})", e["item"]),
+        Paragraph("Pendentes", e["sub"]),
+    ]
+    out += [Paragraph(f"• {_esc(om)}", e["item"]) for om in carta["pendentes"]]
+    return out
+
+
+def _doc_pdf(buf: io.BytesIO, titulo: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(
+        buf, pagesize=A4, title=titulo, leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm
+    )
+
+
+def pdf_cartas(cartas: list[dict]) -> bytes:
+    # todas as cartas num PDF só, uma por página
+    from reportlab.platypus import PageBreak
+
+    story = []
+    for i, c in enumerate(cartas):
+        if i:
+            story.append(PageBreak())
+        story += _flowables_carta(c)
+    buf = io.BytesIO()
+    _doc_pdf(buf, "Cobranças").build(story)
+    return buf.getvalue()
+
+
+def pdf_pendencias(grupos: list[dict]) -> bytes:
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+    from reportlab.platypus import KeepTogether, Paragraph, Spacer, Table, TableStyle
+
+    e = _estilos()
+    story = [
+        Paragraph("Pendências por responsável", e["titulo"]),
+        Paragraph(
+            f"Emitido em {date.today().strftime('%d/%m/%Y')} • {len(grupos)} responsável(is) • "
+            f"{sum(len(g['itens']) for g in grupos)} pendência(s)",
+            e["rodape"],
+        ),
+        Spacer(1, 8),
+    ]
+    estilo_tab = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E2E8F0")),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#CBD5E1")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]
+    )
+    for g in grupos:
+        contatos = "; ".join(f"{n} ({t})" for n, t in g["contatos"]) or "sem contato cadastrado"
+        linhas = [[Paragraph(t, e["cab"]) for t in ("Caso", "Nr Doc", "Assunto", "Prazo")]]
+        linhas += [
+            [
+                Paragraph(str(c["id"]), e["cel"]),
+                Paragraph(_esc(c["nr_doc"]), e["cel"]),
+                Paragraph(_esc(c["assunto"]), e["cel"]),
+                Paragraph(c["prazo"], e["cel"]),
+            ]
+            for c in g["itens"]
+        ]
+        tab = Table(linhas, colWidths=[1.6 * cm, 4 * cm, 9 * cm, 2.4 * cm], repeatRows=1)
+        tab.setStyle(estilo_tab)
+        story += [
+            KeepTogether(
+                [
+                    Paragraph(f"{_esc(g['responsavel'])} — {len(g['itens'])} pendência(s)", e["sub"]),
+                    Paragraph(_esc(contatos), e["rodape"]),
+                    Spacer(1, 4),
+                ]
+            ),
+            tab,
+            Spacer(1, 10),
+        ]
+    buf = io.BytesIO()
+    _doc_pdf(buf, "Pendências por responsável").build(story)
+    return buf.getvalue()
+
+
+# =========================================================
+# DOCX (python-docx): modelo com estilos montado uma vez, clonado por carta
+# =========================================================
+@lru_cache(maxsize=1)
+def _modelo_docx() -> bytes:
+    from docx import Document
+    from docx.shared import Pt
+
+    doc = Document()
+    doc.styles["Normal"].font.name = "Calibri"
+    doc.styles["Normal"].font.size = Pt(11)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def docx_carta(carta: dict) -> bytes:
+    from docx import Document
+
+    doc = Document(io.BytesIO(_modelo_docx()))
+    doc.add_heading("Cobrança de retorno", level=1)
+    doc.add_paragraph(f"Emitida em {carta['emitida']} • Caso nº {carta['id']}")
+    doc.add_paragraph("Solicito verificar a situação do retorno referente à seguinte solicitação:")
+    for rotulo, valor in [
+        ("Assunto", carta["assunto"]),
+        ("Nr Doc", carta["nr_doc"]),
+        ("Prazo", carta["prazo"]),
+        ("Documento de origem", f"{carta['nr_doc_recebido']} ({carta['origem']})"),
+    ]:
+        p = doc.add_paragraph()
+        p.add_run(f"{rotulo}: ").bold = True
+        p.add_run(valor)
+    doc.add_heading("Pendentes", level=2)
+    for om in carta["pendentes"]:
+        doc.add_paragraph(om, style="List Bullet")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+# =========================================================
+# Arquivos de saída
+# =========================================================
+def _render(formato: str, carta: dict) -> tuple[str, bytes]:
+    if formato == "pdf":
+        return nome_arquivo(carta, "pdf"), pdf_cartas([carta])
+    if formato == "docx":
+        return nome_arquivo(carta, "docx"), docx_carta(carta)
+    raise ValueError(f"Formato não suportado: {formato}")
+
+
+def gerar_zip(cartas: list[dict], formato: str, grupos: list[dict] | None = None) -> bytes:
+    # um arquivo por carta (+ consolidado, se vier)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for c in cartas:
+            z.writestr(*_render(formato, c))
+        if grupos is not None:
+            z.writestr("pendencias_por_responsavel.pdf", pdf_pendencias(grupos))
+    return buf.getvalue()
+
+
+def gerar_pdf_unico(cartas: list[dict]) -> bytes:
+    # sem biblioteca de merge: o PDF único é um documento só
+    return pdf_cartas(cartas)
@@ -0,0 +1,21 @@
+-- =========================================================
+-- Pendências agregadas por caso
+-- Rodar no SQL Editor do Supabase.
+-- Só (caso_id, qtd) sai do banco, em vez de todas as linhas de retornos_om;
+-- o app lê a qtd pela casos_dashboard (pendencias_qtd, sql/002).
+-- =========================================================
+create index if not exists retornos_om_pendentes_idx
+    on public.retornos_om (owner_id, caso_id)
+    where status = 'Pendente';
+
+-- security_invoker: a RLS de retornos_om continua valendo (cada usuário vê só o seu)
+create or replace view public.pendencias_por_caso
+with (security_invoker = true) as
+select
+    r.caso_id,
+    count(*)::int as qtd
+from public.retornos_om r
+where r.status = 'Pendente'
+group by r.caso_id;
+
+grant select on public.pendencias_por_caso to authenticated;
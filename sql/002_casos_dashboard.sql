@@ -0,0 +1,24 @@
+-- =========================================================
+-- Snapshot do dashboard (uma única ida ao servidor)
+-- Rodar no SQL Editor do Supabase, depois do 001.
+-- Casos NÃO arquivados, já com a qtd de pendências e o flag de atraso.
+-- =========================================================
+create index if not exists arquivados_caso_id_idx
+    on public.arquivados (caso_id);
+
+create or replace view public.casos_dashboard
+with (security_invoker = true) as
+select
+    c.*,
+    coalesce(p.qtd, 0) as pendencias_qtd,
+    (
+        nullif(c.prazo_final::text, '')::date <= current_date
+        and lower(coalesce(c.status, '')) <> 'resolvido'
+    ) is true as atrasado
+from public.casos c
+left join public.pendencias_por_caso p on p.caso_id = c.id
+where not exists (
+    select 1 from public.arquivados a where a.caso_id = c.id
+);
+
+grant select on public.casos_dashboard to authenticated;
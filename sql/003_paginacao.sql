@@ -0,0 +1,29 @@
+-- =========================================================
+-- Paginação por id (keyset) nas tabelas do app
+-- Rodar no SQL Editor do Supabase, depois do 002.
+-- =========================================================
+
+-- casos arquivados já com a data de arquivamento (sem in_("id", [...]) gigante)
+create or replace view public.casos_arquivados
+with (security_invoker = true) as
+select
+    c.*,
+    a.archived_at
+from public.casos c
+join public.arquivados a on a.caso_id = c.id;
+
+grant select on public.casos_arquivados to authenticated;
+
+-- KPIs do dashboard em uma linha (o dashboard não baixa mais todos os casos)
+create or replace view public.dashboard_kpis
+with (security_invoker = true) as
+select
+    count(*)::int as em_acompanhamento,
+    count(*) filter (where d.atrasado)::int as atrasados,
+    coalesce(sum(d.pendencias_qtd), 0)::int as pendencias
+from public.casos_dashboard d;
+
+grant select on public.dashboard_kpis to authenticated;
+
+create index if not exists casos_owner_id_id_idx
+    on public.casos (owner_id, id desc);
@@ -0,0 +1,54 @@
+-- =========================================================
+-- Distribuição da solicitação numa transação só
+-- Rodar no SQL Editor do Supabase.
+-- Atualiza o caso e aplica o diff de retornos_om em 3 comandos em lote:
+-- delete (OMs removidas), update de prazo (mantidas) e insert (novas).
+-- =========================================================
+-- OM duplicada no mesmo caso impediria o índice único: fica a linha mais antiga
+-- (menor id). Idempotente: sem duplicatas, não apaga nada.
+delete from public.retornos_om a
+using public.retornos_om b
+where a.caso_id = b.caso_id
+  and a.om = b.om
+  and a.id > b.id;
+
+create unique index if not exists retornos_om_caso_om_uidx
+    on public.retornos_om (caso_id, om);
+
+create or replace function public.salvar_solicitacao(
+    p_caso_id bigint,
+    p_assunto_solic text,
+    p_prazo_om date,
+    p_oms text[],
+    p_nr_doc_solicitado text
+) returns void
+language plpgsql
+security invoker
+as $$
+declare
+    v_oms text[] := coalesce(p_oms, '{}');
+begin
+    update public.casos
+       set assunto_solic = p_assunto_solic,
+           prazo_om = p_prazo_om,
+           status = 'Distribuído',
+           nr_doc_solicitado = p_nr_doc_solicitado
+     where id = p_caso_id;
+
+    delete from public.retornos_om
+     where caso_id = p_caso_id
+       and not (om = any (v_oms));
+
+    update public.retornos_om
+       set prazo_om = p_prazo_om
+     where caso_id = p_caso_id
+       and om = any (v_oms);
+
+    insert into public.retornos_om (owner_id, caso_id, om, status, prazo_om, dt_resposta, observacoes)
+    select auth.uid(), p_caso_id, o.om, 'Pendente', p_prazo_om, null, null
+      from (select distinct unnest(v_oms) as om) o
+    on conflict (caso_id, om) do nothing;
+end;
+$$;
+
+grant execute on function public.salvar_solicitacao(bigint, text, date, text[], text) to authenticated;
@@ -0,0 +1,11 @@
+-- =========================================================
+-- Realtime (postgres_changes) para o feed de mudanças do app
+-- Rodar no SQL Editor do Supabase.
+-- =========================================================
+alter publication supabase_realtime add table public.casos;
+alter publication supabase_realtime add table public.retornos_om;
+alter publication supabase_realtime add table public.arquivados;
+
+-- old_record completo no DELETE (o app precisa do caso_id de retornos/arquivados)
+alter table public.retornos_om replica identity full;
+alter table public.arquivados replica identity full;
@@ -0,0 +1,74 @@
+-- =========================================================
+-- Suporte ao espelho local (espelho_local.py): sync incremental
+-- Rodar no SQL Editor do Supabase.
+-- - updated_at em todas as tabelas do app, mantido por trigger
+-- - exclusoes: tombstones para o espelho apagar o que sumiu no servidor
+-- =========================================================
+create or replace function public.tocar_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['casos', 'retornos_om', 'arquivados', 'master_oms', 'responsaveis_contatos'] loop
+        execute format('alter table public.%I add column if not exists updated_at timestamptz not null default clock_timestamp()', t);
+        execute format('create index if not exists %I on public.%I (owner_id, updated_at, id)', t || '_sync_idx', t);
+        execute format('drop trigger if exists tocar_updated_at on public.%I', t);
+        execute format(
+            'create trigger tocar_updated_at before update on public.%I for each row execute function public.tocar_updated_at()',
+            t
+        );
+    end loop;
+end;
+$$;
+
+create table if not exists public.exclusoes (
+    id bigint generated always as identity primary key,
+    owner_id uuid not null,
+    tabela text not null,
+    registro_id bigint not null,
+    excluido_em timestamptz not null default now()
+);
+
+create index if not exists exclusoes_owner_id_idx on public.exclusoes (owner_id, id);
+
+alter table public.exclusoes enable row level security;
+
+drop policy if exists "exclusoes do proprio usuario" on public.exclusoes;
+create policy "exclusoes do proprio usuario" on public.exclusoes
+    for select using (owner_id = auth.uid());
+
+create or replace function public.registrar_exclusao()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.exclusoes (owner_id, tabela, registro_id)
+    values (old.owner_id, tg_table_name, old.id);
+    return old;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['casos', 'retornos_om', 'arquivados', 'master_oms', 'responsaveis_contatos'] loop
+        execute format('drop trigger if exists registrar_exclusao on public.%I', t);
+        execute format(
+            'create trigger registrar_exclusao after delete on public.%I for each row execute function public.registrar_exclusao()',
+            t
+        );
+    end loop;
+end;
+$$;
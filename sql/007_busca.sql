@@ -0,0 +1,83 @@
+-- =========================================================
+-- Busca de casos (texto completo + nº de documento aproximado)
+-- Rodar no SQL Editor do Supabase, depois do 006.
+-- - casos.busca: tsvector gerado (português, sem acento), pesos
+--   A = nº dos documentos, B = origem, C = assuntos
+-- - pg_trgm nos nº de documento (erro de digitação / trecho do número)
+-- - buscar_casos(q): termos por prefixo, todos obrigatórios; devolve linhas
+--   de casos_dashboard já ordenadas por relevância
+-- Equivalente local (espelho SQLite): busca.py
+-- =========================================================
+create extension if not exists pg_trgm;
+create extension if not exists unaccent;
+
+do $$
+begin
+    if not exists (select 1 from pg_ts_config where cfgname = 'pt_busca') then
+        create text search configuration public.pt_busca (copy = pg_catalog.portuguese);
+        alter text search configuration public.pt_busca
+            alter mapping for hword, hword_part, word with public.unaccent, portuguese_stem;
+    end if;
+end;
+$$;
+
+alter table public.casos
+    add column if not exists busca tsvector generated always as (
+        setweight(to_tsvector('public.pt_busca', coalesce(nr_doc_recebido, '') || ' ' || coalesce(nr_doc_solicitado, '')), 'A')
+        || setweight(to_tsvector('public.pt_busca', coalesce(origem, '')), 'B')
+        || setweight(to_tsvector('public.pt_busca', coalesce(assunto_doc, '') || ' ' || coalesce(assunto_solic, '')), 'C')
+    ) stored;
+
+create index if not exists casos_busca_idx
+    on public.casos using gin (busca);
+
+create index if not exists casos_nr_doc_recebido_trgm_idx
+    on public.casos using gin (nr_doc_recebido gin_trgm_ops);
+
+create index if not exists casos_nr_doc_solicitado_trgm_idx
+    on public.casos using gin (nr_doc_solicitado gin_trgm_ops);
+
+create or replace function public.buscar_casos(
+    p_q text,
+    p_limite int default 50
+) returns setof public.casos_dashboard
+language sql
+stable
+security invoker
+as $$
+    with termos as (
+        select string_agg(t || ':*', ' & ') as tsq_txt
+          from regexp_split_to_table(lower(public.unaccent(coalesce(p_q, ''))), '[^[:alnum:]]+') t
+         where t <> ''
+    ),
+    q as (
+        select case when tsq_txt is null then null else to_tsquery('public.pt_busca', tsq_txt) end as tsq,
+               lower(trim(coalesce(p_q, ''))) as txt,
+               '%' || replace(replace(replace(lower(trim(coalesce(p_q, ''))), '\', '\\'), '%', '\%'), '_', '\_') || '%' as padrao
+          from termos
+    ),
+    cand as (
+        select c.id,
+               coalesce(ts_rank(c.busca, q.tsq), 0)
+               + 2 * greatest(similarity(coalesce(c.nr_doc_recebido, ''), q.txt),
+                              similarity(coalesce(c.nr_doc_solicitado, ''), q.txt))
+               + case when c.nr_doc_recebido ilike q.padrao or c.nr_doc_solicitado ilike q.padrao then 0.5 else 0 end
+                 as rank
+          from public.casos c, q
+         where q.txt <> ''
+           and (
+                (q.tsq is not null and c.busca @@ q.tsq)
+                or c.nr_doc_recebido % q.txt
+                or c.nr_doc_solicitado % q.txt
+                or c.nr_doc_recebido ilike q.padrao
+                or c.nr_doc_solicitado ilike q.padrao
+           )
+    )
+    select d.*
+      from cand
+      join public.casos_dashboard d on d.id = cand.id
+     order by cand.rank desc, d.id desc
+     limit least(greatest(coalesce(p_limite, 50), 1), 200);
+$$;
+
+grant execute on function public.buscar_casos(text, int) to authenticated;
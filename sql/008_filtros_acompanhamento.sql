@@ -0,0 +1,32 @@
+-- =========================================================
+-- Filtros e ordenação do Acompanhamento no servidor
+-- Rodar no SQL Editor do Supabase, depois do 007.
+-- Filtros usados pelo app (PostgREST): status=in.(...), origem=ilike.*x*,
+-- prazo_final=gte/lte, atrasado=is.true (+ prazo_final=lte.hoje, para usar o índice),
+-- pendencias_qtd=gt.0, responsaveis=cs.{OM}; ordenação por prazo_final/status + id.
+-- =========================================================
+create index if not exists casos_owner_status_prazo_idx
+    on public.casos (owner_id, status, prazo_final, id);
+
+create index if not exists casos_owner_prazo_idx
+    on public.casos (owner_id, prazo_final, id);
+
+create index if not exists casos_origem_trgm_idx
+    on public.casos using gin (origem gin_trgm_ops);
+
+create index if not exists retornos_om_owner_om_caso_idx
+    on public.retornos_om (owner_id, om, caso_id);
+
+-- coluna calculada do PostgREST: casos_dashboard?select=*,responsaveis&responsaveis=cs.{"OM A"}
+create or replace function public.responsaveis(public.casos_dashboard)
+returns text[]
+language sql
+stable
+security invoker
+as $$
+    select coalesce(array_agg(r.om order by r.om), '{}')
+      from public.retornos_om r
+     where r.caso_id = $1.id;
+$$;
+
+grant execute on function public.responsaveis(public.casos_dashboard) to authenticated;
@@ -0,0 +1,278 @@
+-- =========================================================
+-- KPIs do dashboard mantidos por trigger (leitura de custo constante)
+-- Rodar no SQL Editor do Supabase, depois do 008.
+-- - kpis_resumo: uma linha por usuário (em acompanhamento, pendências,
+--   atrasados já consolidados até consolidado_ate)
+-- - kpis_prazos: casos abertos (não resolvidos, não arquivados) por data de
+--   prazo, só para prazos depois de consolidado_ate
+-- - atrasados = consolidados + baldes com prazo <= hoje; a virada diária
+--   (kpis_virar_dia, pg_cron) só move os baldes vencidos para o contador,
+--   a leitura continua certa mesmo se o job atrasar
+-- - dashboard_kpis passa a ler daqui (mesmas colunas)
+-- =========================================================
+create table if not exists public.kpis_resumo (
+    owner_id uuid primary key,
+    em_acompanhamento int not null default 0,
+    pendencias int not null default 0,
+    atrasados_consolidados int not null default 0,
+    consolidado_ate date not null default current_date,
+    atualizado_em timestamptz not null default now()
+);
+
+create table if not exists public.kpis_prazos (
+    owner_id uuid not null,
+    prazo date not null,
+    qtd int not null default 0,
+    primary key (owner_id, prazo)
+);
+
+alter table public.kpis_resumo enable row level security;
+alter table public.kpis_prazos enable row level security;
+
+drop policy if exists "kpis do proprio usuario" on public.kpis_resumo;
+create policy "kpis do proprio usuario" on public.kpis_resumo
+    for select using (owner_id = auth.uid());
+
+drop policy if exists "kpis do proprio usuario" on public.kpis_prazos;
+create policy "kpis do proprio usuario" on public.kpis_prazos
+    for select using (owner_id = auth.uid());
+
+-- prazo que conta para atraso (null = não conta: sem prazo ou resolvido)
+create or replace function public._kpis_prazo(p_prazo text, p_status text)
+returns date
+language sql
+stable
+as $$
+    select case when lower(coalesce(p_status, '')) <> 'resolvido' then nullif(p_prazo, '')::date end;
+$$;
+
+create or replace function public._kpis_arquivado(p_caso_id bigint)
+returns boolean
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select exists (select 1 from public.arquivados a where a.caso_id = p_caso_id);
+$$;
+
+-- soma deltas no resumo (trava a linha do usuário) e no balde do prazo
+create or replace function public._kpis_somar(p_owner uuid, p_em int, p_pend int, p_prazo date, p_prazo_delta int)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_ate date;
+begin
+    if p_owner is null then
+        return;
+    end if;
+
+    insert into public.kpis_resumo (owner_id) values (p_owner)
+    on conflict (owner_id) do nothing;
+
+    update public.kpis_resumo
+       set em_acompanhamento = em_acompanhamento + p_em,
+           pendencias = pendencias + p_pend,
+           atrasados_consolidados = atrasados_consolidados
+               + case when p_prazo is not null and p_prazo <= consolidado_ate then p_prazo_delta else 0 end,
+           atualizado_em = now()
+     where owner_id = p_owner
+    returning consolidado_ate into v_ate;
+
+    if p_prazo is not null and p_prazo > v_ate and p_prazo_delta <> 0 then
+        insert into public.kpis_prazos (owner_id, prazo, qtd) values (p_owner, p_prazo, p_prazo_delta)
+        on conflict (owner_id, prazo) do update set qtd = public.kpis_prazos.qtd + excluded.qtd;
+        delete from public.kpis_prazos where owner_id = p_owner and prazo = p_prazo and qtd = 0;
+    end if;
+end;
+$$;
+
+-- contribuição inteira de um caso (arquivar = tirar, desarquivar = devolver)
+create or replace function public._kpis_caso_inteiro(p_caso_id bigint, p_sinal int)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    c record;
+    v_pend int;
+begin
+    select owner_id, prazo_final::text as prazo, status into c from public.casos where id = p_caso_id;
+    if not found then
+        return;
+    end if;
+    select count(*) into v_pend from public.retornos_om where caso_id = p_caso_id and status = 'Pendente';
+    perform public._kpis_somar(c.owner_id, p_sinal, p_sinal * v_pend, public._kpis_prazo(c.prazo, c.status), p_sinal);
+end;
+$$;
+
+create or replace function public.kpis_trg_casos()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op <> 'INSERT' and not public._kpis_arquivado(old.id) then
+        perform public._kpis_somar(old.owner_id, -1, 0, public._kpis_prazo(old.prazo_final::text, old.status), -1);
+    end if;
+    if tg_op <> 'DELETE' and not public._kpis_arquivado(new.id) then
+        perform public._kpis_somar(new.owner_id, 1, 0, public._kpis_prazo(new.prazo_final::text, new.status), 1);
+    end if;
+    return null;
+end;
+$$;
+
+create or replace function public.kpis_trg_retornos()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op <> 'INSERT' and old.status = 'Pendente' and not public._kpis_arquivado(old.caso_id) then
+        perform public._kpis_somar(old.owner_id, 0, -1, null, 0);
+    end if;
+    if tg_op <> 'DELETE' and new.status = 'Pendente' and not public._kpis_arquivado(new.caso_id) then
+        perform public._kpis_somar(new.owner_id, 0, 1, null, 0);
+    end if;
+    return null;
+end;
+$$;
+
+create or replace function public.kpis_trg_arquivados()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op <> 'INSERT' then
+        perform public._kpis_caso_inteiro(old.caso_id, 1);
+    end if;
+    if tg_op <> 'DELETE' then
+        perform public._kpis_caso_inteiro(new.caso_id, -1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists kpis on public.casos;
+create trigger kpis
+    after insert or delete or update of prazo_final, status, owner_id on public.casos
+    for each row execute function public.kpis_trg_casos();
+
+drop trigger if exists kpis on public.retornos_om;
+create trigger kpis
+    after insert or delete or update of status, caso_id, owner_id on public.retornos_om
+    for each row execute function public.kpis_trg_retornos();
+
+drop trigger if exists kpis on public.arquivados;
+create trigger kpis
+    after insert or delete or update of caso_id on public.arquivados
+    for each row execute function public.kpis_trg_arquivados();
+
+-- virada do dia: baldes vencidos entram no contador consolidado
+create or replace function public.kpis_virar_dia()
+returns int
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    r record;
+    v_movidos int;
+    n int := 0;
+begin
+    for r in select owner_id from public.kpis_resumo where consolidado_ate < current_date for update loop
+        with movidos as (
+            delete from public.kpis_prazos
+             where owner_id = r.owner_id and prazo <= current_date
+            returning qtd
+        )
+        select coalesce(sum(qtd), 0) into v_movidos from movidos;
+
+        update public.kpis_resumo
+           set atrasados_consolidados = atrasados_consolidados + v_movidos,
+               consolidado_ate = current_date,
+               atualizado_em = now()
+         where owner_id = r.owner_id;
+        n := n + 1;
+    end loop;
+    return n;
+end;
+$$;
+
+-- recálculo completo (carga inicial / reparo); só para o service role
+create or replace function public.kpis_recalcular(p_owner uuid default null)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    delete from public.kpis_prazos where p_owner is null or owner_id = p_owner;
+    delete from public.kpis_resumo where p_owner is null or owner_id = p_owner;
+
+    insert into public.kpis_resumo (owner_id, em_acompanhamento, pendencias, atrasados_consolidados, consolidado_ate)
+    select c.owner_id,
+           count(*),
+           coalesce(sum(p.qtd), 0),
+           count(*) filter (where public._kpis_prazo(c.prazo_final::text, c.status) <= current_date),
+           current_date
+      from public.casos c
+      left join (
+          select caso_id, count(*) as qtd from public.retornos_om where status = 'Pendente' group by caso_id
+      ) p on p.caso_id = c.id
+     where c.owner_id is not null
+       and (p_owner is null or c.owner_id = p_owner)
+       and not exists (select 1 from public.arquivados a where a.caso_id = c.id)
+     group by c.owner_id;
+
+    insert into public.kpis_prazos (owner_id, prazo, qtd)
+    select c.owner_id, public._kpis_prazo(c.prazo_final::text, c.status), count(*)
+      from public.casos c
+     where c.owner_id is not null
+       and (p_owner is null or c.owner_id = p_owner)
+       and public._kpis_prazo(c.prazo_final::text, c.status) > current_date
+       and not exists (select 1 from public.arquivados a where a.caso_id = c.id)
+     group by 1, 2;
+end;
+$$;
+
+-- funções internas (security definer): nada delas exposto como RPC
+revoke execute on function public.kpis_recalcular(uuid) from public, anon, authenticated;
+revoke execute on function public.kpis_virar_dia() from public, anon, authenticated;
+revoke execute on function public._kpis_somar(uuid, int, int, date, int) from public, anon, authenticated;
+revoke execute on function public._kpis_caso_inteiro(bigint, int) from public, anon, authenticated;
+revoke execute on function public._kpis_arquivado(bigint) from public, anon, authenticated;
+
+select public.kpis_recalcular();
+
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule('kpis-virar-dia', '5 0 * * *', 'select public.kpis_virar_dia()');
+    end if;
+end;
+$$;
+
+-- leitura: uma linha, custo independente do volume de casos
+drop view if exists public.dashboard_kpis;
+create view public.dashboard_kpis
+with (security_invoker = true) as
+select
+    coalesce(r.em_acompanhamento, 0)::int as em_acompanhamento,
+    (
+        coalesce(r.atrasados_consolidados, 0)
+        + coalesce((select sum(p.qtd) from public.kpis_prazos p where p.owner_id = u.owner_id and p.prazo <= current_date), 0)
+    )::int as atrasados,
+    coalesce(r.pendencias, 0)::int as pendencias
+from (select auth.uid() as owner_id) u
+left join public.kpis_resumo r on r.owner_id = u.owner_id;
+
+grant select on public.dashboard_kpis to authenticated;
@@ -0,0 +1,52 @@
+-- =========================================================
+-- Cobrança em lote: uma linha por responsável (OM) com tudo o que está
+-- pendente em casos vencidos, já com os contatos cadastrados
+-- Rodar no SQL Editor do Supabase, depois do 009.
+-- - vencido = caso atrasado (prazo final) ou prazo da OM já passou
+-- - pendente = retorno ainda não "Respondido" (mesma regra do build_msg_cobranca)
+-- - itens / contatos em jsonb, ordenados por prazo / nome
+-- Equivalente local (espelho SQLite): espelho_local._VIEWS
+-- =========================================================
+create index if not exists retornos_om_om_idx
+    on public.retornos_om (om);
+
+create or replace view public.cobranca_por_responsavel
+with (security_invoker = true) as
+with pend as (
+    select r.om,
+           d.id as caso_id,
+           d.assunto_solic,
+           d.nr_doc_solicitado,
+           coalesce(nullif(r.prazo_om::text, '')::date, nullif(d.prazo_om::text, '')::date) as prazo_om,
+           nullif(d.prazo_final::text, '')::date as prazo_final
+      from public.retornos_om r
+      join public.casos_dashboard d on d.id = r.caso_id
+     where lower(coalesce(r.status, '')) <> 'respondido'
+       and lower(coalesce(d.status, '')) <> 'resolvido'
+       and (
+            d.atrasado
+            or coalesce(nullif(r.prazo_om::text, '')::date, nullif(d.prazo_om::text, '')::date) <= current_date
+       )
+)
+select p.om as responsavel,
+       count(*)::int as qtd,
+       min(coalesce(p.prazo_om, p.prazo_final)) as prazo_mais_antigo,
+       jsonb_agg(
+           jsonb_build_object(
+               'caso_id', p.caso_id,
+               'assunto_solic', p.assunto_solic,
+               'nr_doc_solicitado', p.nr_doc_solicitado,
+               'prazo_om', p.prazo_om,
+               'prazo_final', p.prazo_final
+           )
+           order by coalesce(p.prazo_om, p.prazo_final) nulls last, p.caso_id
+       ) as itens,
+       coalesce((
+           select jsonb_agg(jsonb_build_object('contato_nome', ct.contato_nome, 'telefone', ct.telefone) order by ct.contato_nome)
+             from public.responsaveis_contatos ct
+            where ct.responsavel = p.om
+       ), '[]'::jsonb) as contatos
+  from pend p
+ group by p.om;
+
+grant select on public.cobranca_por_responsavel to authenticated;
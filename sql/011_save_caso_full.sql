@@ -0,0 +1,97 @@
+-- =========================================================
+-- "Salvar" do formulário Documento / Solicitação / Resposta numa transação só
+-- Rodar no SQL Editor do Supabase, depois do 004.
+-- - com p_caso_id: atualiza o documento (vazio vira "-", como o app fazia)
+-- - sem p_caso_id: cria o caso a partir do documento ou, sem documento,
+--   só da solicitação (mesmos padrões de insert_documento_safe /
+--   insert_solicitacao_sem_documento)
+-- - solicitação: salvar_solicitacao (sql/004) na mesma transação
+-- - resposta: com nº -> Resolvido (resolved_at = hoje), sem nº -> Pendente
+-- - devolve a linha final do caso (o app não precisa de outro fetch_caso)
+-- Equivalente local (espelho SQLite): EspelhoLocal._rpc_save_caso_full
+-- =========================================================
+create or replace function public.save_caso_full(
+    p_caso_id bigint,
+    p_nr_doc_recebido text,
+    p_assunto_doc text,
+    p_origem text,
+    p_prazo_final date,
+    p_observacoes text,
+    p_assunto_solic text,
+    p_prazo_om date,
+    p_nr_doc_solicitado text,
+    p_oms text[],
+    p_nr_doc_resposta text
+) returns public.casos
+language plpgsql
+security invoker
+as $$
+declare
+    v_oms text[] := coalesce(p_oms, '{}');
+    v_nr_doc text := nullif(trim(coalesce(p_nr_doc_recebido, '')), '');
+    v_assunto_doc text := nullif(trim(coalesce(p_assunto_doc, '')), '');
+    v_origem text := nullif(trim(coalesce(p_origem, '')), '');
+    v_obs text := nullif(trim(coalesce(p_observacoes, '')), '');
+    v_assunto_solic text := nullif(trim(coalesce(p_assunto_solic, '')), '');
+    v_nr_solic text := nullif(trim(coalesce(p_nr_doc_solicitado, '')), '');
+    v_nr_resp text := nullif(trim(coalesce(p_nr_doc_resposta, '')), '');
+    v_tem_solic boolean;
+    v_aplicar_solic boolean;
+    v_id bigint;
+    v_row public.casos;
+begin
+    v_tem_solic := v_assunto_solic is not null or v_nr_solic is not null or p_prazo_om is not null or cardinality(v_oms) > 0;
+
+    if p_caso_id is not null then
+        update public.casos
+           set nr_doc_recebido = coalesce(v_nr_doc, '-'),
+               assunto_doc = coalesce(v_assunto_doc, '-'),
+               origem = coalesce(v_origem, '-'),
+               prazo_final = p_prazo_final,
+               observacoes = coalesce(v_obs, '-'),
+               assunto_solic = v_assunto_solic,
+               prazo_om = p_prazo_om,
+               nr_doc_solicitado = v_nr_solic
+         where id = p_caso_id
+        returning id into v_id;
+        if v_id is null then
+            raise exception 'Caso % não encontrado.', p_caso_id using errcode = 'P0002';
+        end if;
+        v_aplicar_solic := v_tem_solic;
+
+    elsif v_nr_doc is not null or v_assunto_doc is not null or v_origem is not null or p_prazo_final is not null or v_obs is not null then
+        insert into public.casos (owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, status, created_at)
+        values (auth.uid(), coalesce(v_nr_doc, '-'), coalesce(v_assunto_doc, '-'), coalesce(v_origem, '-'),
+                p_prazo_final, coalesce(v_obs, '-'), 'Recebido', now())
+        returning id into v_id;
+        v_aplicar_solic := v_tem_solic;
+
+    elsif v_assunto_solic is not null then
+        insert into public.casos (
+            owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes,
+            assunto_solic, prazo_om, nr_doc_solicitado, status, created_at
+        )
+        values (auth.uid(), '-', '-', '-', null, '-', v_assunto_solic, p_prazo_om, coalesce(v_nr_solic, '00'), 'Distribuído', now())
+        returning id into v_id;
+        v_aplicar_solic := cardinality(v_oms) > 0;
+
+    else
+        raise exception 'Preencha algum campo para salvar.' using errcode = '22023';
+    end if;
+
+    if v_aplicar_solic then
+        perform public.salvar_solicitacao(v_id, v_assunto_solic, p_prazo_om, v_oms, coalesce(v_nr_solic, '00'));
+    end if;
+
+    update public.casos
+       set nr_doc_resposta = v_nr_resp,
+           status = case when v_nr_resp is not null then 'Resolvido' else 'Pendente' end,
+           resolved_at = case when v_nr_resp is not null then current_date end
+     where id = v_id
+    returning * into v_row;
+
+    return v_row;
+end;
+$$;
+
+grant execute on function public.save_caso_full(bigint, text, text, text, date, text, text, date, text, text[], text) to authenticated;
@@ -0,0 +1,27 @@
+-- =========================================================
+-- Excluir vários casos numa transação só (Arquivados → 🗑️ com seleção múltipla)
+-- Rodar no SQL Editor do Supabase, depois do 011.
+-- - apaga retornos_om, arquivados e casos dos ids informados, nessa ordem
+-- - tudo ou nada: se um delete falhar, nenhum caso some pela metade
+-- - RLS continua valendo (security invoker): só apaga o que é do usuário
+-- - devolve quantos casos foram excluídos
+-- - arquivar / restaurar em lote não precisam de RPC (um upsert / um delete com in_)
+-- Equivalente local (espelho SQLite): EspelhoLocal._rpc_delete_casos
+-- =========================================================
+create or replace function public.delete_casos(p_ids bigint[])
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+    v_n integer;
+begin
+    delete from public.retornos_om where caso_id = any(p_ids);
+    delete from public.arquivados where caso_id = any(p_ids);
+    delete from public.casos where id = any(p_ids);
+    get diagnostics v_n = row_count;
+    return v_n;
+end;
+$$;
+
+grant execute on function public.delete_casos(bigint[]) to authenticated;
@@ -0,0 +1,39 @@
+-- =========================================================
+-- Política de arquivamento automático: casos resolvidos há mais de N dias
+-- Rodar no SQL Editor do Supabase, depois do 012.
+-- - resolvido = status "Resolvido" com resolved_at preenchido
+-- - p_dias: idade mínima (resolved_at <= hoje - p_dias)
+-- - p_limite: no máximo p_limite casos por chamada (transações curtas);
+--   quem chama repete até voltar menos que p_limite (arquivamento.py)
+-- - owner_id vem do caso: roda tanto pelo app (RLS, só os do usuário)
+--   quanto pelo job agendado com a service role (todos os usuários)
+-- - devolve quantos casos foram arquivados nesta chamada
+-- Equivalente local (espelho SQLite): EspelhoLocal._rpc_arquivar_resolvidos
+-- =========================================================
+create index if not exists casos_resolvidos_idx
+    on public.casos (resolved_at, id)
+    where lower(coalesce(status, '')) = 'resolvido';
+
+create or replace function public.arquivar_resolvidos(p_dias integer, p_limite integer default 500)
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+    v_n integer;
+begin
+    insert into public.arquivados (owner_id, caso_id, archived_at)
+    select c.owner_id, c.id, now()
+      from public.casos c
+     where lower(coalesce(c.status, '')) = 'resolvido'
+       and nullif(c.resolved_at::text, '')::date <= current_date - greatest(p_dias, 0)
+       and not exists (select 1 from public.arquivados a where a.caso_id = c.id)
+     order by c.resolved_at, c.id
+     limit greatest(p_limite, 1)
+    on conflict (caso_id) do nothing;
+    get diagnostics v_n = row_count;
+    return v_n;
+end;
+$$;
+
+grant execute on function public.arquivar_resolvidos(integer, integer) to authenticated;
@@ -0,0 +1,150 @@
+-- =========================================================
+-- Arquivo frio: arquivados antigos saem de casos / retornos_om / arquivados
+-- Rodar no SQL Editor do Supabase, depois do 013.
+-- - casos_frios: a linha do caso + archived_at + retornos (jsonb com as linhas de retornos_om);
+--   sem a coluna gerada busca (sql/007): volta a ser calculada quando o caso é restaurado
+-- - congelar_arquivados: move em lotes os arquivados há mais de p_dias (arquivamento.py --congelar-dias)
+-- - restaurar_casos: tira do arquivo (quente ou frio) e devolve o caso ao acompanhamento
+-- - casos_arquivados passa a ser quente + frio (a tela de Arquivados não muda)
+-- - delete_casos (sql/012) também apaga do frio
+-- - anos antigos do frio viram snapshots Parquet / JSONL.gz (historico.py)
+-- Equivalente local (espelho SQLite): espelho_local (tabela casos_frios, _VIEWS, _rpc_*)
+-- =========================================================
+create table if not exists public.casos_frios (
+    like public.casos including defaults,
+    archived_at timestamptz,
+    retornos jsonb not null default '[]'::jsonb,
+    primary key (id)
+);
+
+-- o like copia busca como coluna comum (só o valor de quando congelou)
+alter table public.casos_frios drop column if exists busca;
+
+create index if not exists casos_frios_owner_id_id_idx on public.casos_frios (owner_id, id desc);
+create index if not exists casos_frios_archived_at_idx on public.casos_frios (archived_at);
+create index if not exists casos_frios_sync_idx on public.casos_frios (owner_id, updated_at, id);
+
+alter table public.casos_frios enable row level security;
+
+drop policy if exists "casos_frios do proprio usuario" on public.casos_frios;
+create policy "casos_frios do proprio usuario" on public.casos_frios
+    for all using (owner_id = auth.uid()) with check (owner_id = auth.uid());
+
+-- mesmo tratamento das outras tabelas do sql/006 (sync incremental do espelho)
+drop trigger if exists tocar_updated_at on public.casos_frios;
+create trigger tocar_updated_at before update on public.casos_frios
+    for each row execute function public.tocar_updated_at();
+drop trigger if exists registrar_exclusao on public.casos_frios;
+create trigger registrar_exclusao after delete on public.casos_frios
+    for each row execute function public.registrar_exclusao();
+
+drop view if exists public.casos_arquivados;
+create view public.casos_arquivados
+with (security_invoker = true) as
+select c.id, c.owner_id, c.nr_doc_recebido, c.assunto_doc, c.origem, c.prazo_final, c.observacoes,
+       c.assunto_solic, c.prazo_om, c.nr_doc_solicitado, c.status, c.created_at, c.nr_doc_resposta,
+       c.resolved_at, c.updated_at, a.archived_at
+  from public.casos c
+  join public.arquivados a on a.caso_id = c.id
+union all
+select f.id, f.owner_id, f.nr_doc_recebido, f.assunto_doc, f.origem, f.prazo_final, f.observacoes,
+       f.assunto_solic, f.prazo_om, f.nr_doc_solicitado, f.status, f.created_at, f.nr_doc_resposta,
+       f.resolved_at, f.updated_at, f.archived_at
+  from public.casos_frios f;
+
+grant select on public.casos_arquivados to authenticated;
+
+create or replace function public.congelar_arquivados(p_dias integer, p_limite integer default 500)
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+    v_ids bigint[];
+begin
+    select array_agg(caso_id order by archived_at, caso_id) into v_ids
+      from (
+        select a.caso_id, a.archived_at
+          from public.arquivados a
+         where a.archived_at < now() - make_interval(days => greatest(p_dias, 0))
+         order by a.archived_at, a.caso_id
+         limit greatest(p_limite, 1)
+      ) x;
+    if v_ids is null then
+        return 0;
+    end if;
+
+    insert into public.casos_frios (
+        id, owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, assunto_solic, prazo_om,
+        nr_doc_solicitado, status, created_at, nr_doc_resposta, resolved_at, updated_at, archived_at, retornos
+    )
+    select c.id, c.owner_id, c.nr_doc_recebido, c.assunto_doc, c.origem, c.prazo_final, c.observacoes, c.assunto_solic, c.prazo_om,
+           c.nr_doc_solicitado, c.status, c.created_at, c.nr_doc_resposta, c.resolved_at, clock_timestamp(), a.archived_at,
+           coalesce((select jsonb_agg(to_jsonb(r) order by r.id) from public.retornos_om r where r.caso_id = c.id), '[]'::jsonb)
+      from public.casos c
+      join public.arquivados a on a.caso_id = c.id
+     where c.id = any(v_ids)
+    on conflict (id) do nothing;
+
+    delete from public.retornos_om where caso_id = any(v_ids);
+    delete from public.arquivados where caso_id = any(v_ids);
+    delete from public.casos where id = any(v_ids);
+    return cardinality(v_ids);
+end;
+$$;
+
+create or replace function public.restaurar_casos(p_ids bigint[])
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+    v_n integer;
+    v_frios integer;
+begin
+    delete from public.arquivados where caso_id = any(p_ids);
+    get diagnostics v_n = row_count;
+
+    -- colunas explícitas: busca é gerada e não aceita valor no insert
+    insert into public.casos (
+        id, owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, observacoes, assunto_solic, prazo_om,
+        nr_doc_solicitado, status, created_at, nr_doc_resposta, resolved_at, updated_at
+    ) overriding system value
+    select f.id, f.owner_id, f.nr_doc_recebido, f.assunto_doc, f.origem, f.prazo_final, f.observacoes, f.assunto_solic, f.prazo_om,
+           f.nr_doc_solicitado, f.status, f.created_at, f.nr_doc_resposta, f.resolved_at, clock_timestamp()
+      from public.casos_frios f
+     where f.id = any(p_ids);
+
+    insert into public.retornos_om overriding system value
+    select (jsonb_populate_record(null::public.retornos_om, r.value || jsonb_build_object('updated_at', clock_timestamp()))).*
+      from public.casos_frios f
+     cross join lateral jsonb_array_elements(f.retornos) r
+     where f.id = any(p_ids);
+
+    delete from public.casos_frios where id = any(p_ids);
+    get diagnostics v_frios = row_count;
+    return v_n + v_frios;
+end;
+$$;
+
+create or replace function public.delete_casos(p_ids bigint[])
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+    v_n integer;
+    v_frios integer;
+begin
+    delete from public.retornos_om where caso_id = any(p_ids);
+    delete from public.arquivados where caso_id = any(p_ids);
+    delete from public.casos where id = any(p_ids);
+    get diagnostics v_n = row_count;
+    delete from public.casos_frios where id = any(p_ids);
+    get diagnostics v_frios = row_count;
+    return v_n + v_frios;
+end;
+$$;
+
+grant execute on function public.congelar_arquivados(integer, integer) to authenticated;
+grant execute on function public.restaurar_casos(bigint[]) to authenticated;
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+# =========================================================
+# Arquivo frio (sql/014) num Postgres de verdade: congelar e restaurar
+# Uso: python -m pytest -q test_arquivo_frio.py (Postgres: ver conftest.py)
+# =========================================================
+DONO = "00000000-0000-0000-0000-000000000001"
+
+
+def _caso(c, nr_doc: str, assunto: str, oms: list[str], arquivado_ha_dias: int) -> int:
+    cid = c.execute(
+        "insert into public.casos (owner_id, nr_doc_recebido, assunto_doc, origem, prazo_final, status, resolved_at) "
+        "values (%s, %s, %s, 'DGPM', current_date - 30, 'Resolvido', current_date - 20) returning id",
+        (DONO, nr_doc, assunto),
+    ).fetchone()[0]
+    for om in oms:
+        c.execute(
+            "insert into public.retornos_om (owner_id, caso_id, om, status) values (%s, %s, %s, 'Respondido')",
+            (DONO, cid, om),
+        )
+    c.execute(
+        "insert into public.arquivados (owner_id, caso_id, archived_at) values (%s, %s, now() - make_interval(days => %s))",
+        (DONO, cid, arquivado_ha_dias),
+    )
+    return cid
+
+
+@pytest.fixture
+def conn(banco_migrado):
+    with psycopg.connect(banco_migrado, autocommit=True) as c:
+        c.execute("select set_config('request.jwt.claim.sub', %s, false)", (DONO,))
+        yield c
+
+
+def test_frio_nao_guarda_busca(conn):
+    colunas = {r[0] for r in conn.execute(
+        "select column_name from information_schema.columns where table_schema = 'public' and table_name = 'casos_frios'"
+    )}
+    assert "busca" not in colunas
+    assert {"archived_at", "retornos", "updated_at"} <= colunas
+
+
+def test_restaura_caso_quente_e_caso_frio(conn):
+    quente = _caso(conn, "OF-100", "Férias do pessoal", ["OM A"], arquivado_ha_dias=10)
+    frio = _caso(conn, "OF-200", "Reparo da viatura", ["OM B", "OM C"], arquivado_ha_dias=400)
+    retornos_frio = conn.execute(
+        "select id, om from public.retornos_om where caso_id = %s order by id", (frio,)
+    ).fetchall()
+
+    assert conn.execute("select public.congelar_arquivados(365)").fetchone()[0] == 1
+    assert conn.execute("select count(*) from public.casos where id = %s", (frio,)).fetchone()[0] == 0
+    assert conn.execute("select jsonb_array_length(retornos) from public.casos_frios where id = %s", (frio,)).fetchone()[0] == 2
+    arquivados = [r[0] for r in conn.execute("select id from public.casos_arquivados order by id")]
+    assert arquivados == [quente, frio]
+
+    assert conn.execute("select public.restaurar_casos(%s)", ([quente, frio],)).fetchone()[0] == 2
+
+    assert conn.execute("select count(*) from public.arquivados").fetchone()[0] == 0
+    assert conn.execute("select count(*) from public.casos_frios").fetchone()[0] == 0
+    nr, assunto, busca = conn.execute(
+        "select nr_doc_recebido, assunto_doc, busca::text from public.casos where id = %s", (frio,)
+    ).fetchone()
+    assert (nr, assunto) == ("OF-200", "Reparo da viatura")
+    assert "viatura" in busca  # recalculada no insert, não copiada do frio
+    assert conn.execute(
+        "select id, om from public.retornos_om where caso_id = %s order by id", (frio,)
+    ).fetchall() == retornos_frio
+    dashboard = {r[0] for r in conn.execute("select id from public.casos_dashboard")}
+    assert {quente, frio} <= dashboard
+
+    # ids restaurados com o valor antigo: a identidade continua gerando ids novos sem colidir
+    novo = _caso(conn, "OF-300", "Outro", [], arquivado_ha_dias=0)
+    assert novo > frio
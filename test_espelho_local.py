@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+from postgrest import APIError
+
+from espelho_local import EspelhoLocal
+
+# =========================================================
+# Espelho local (espelho_local.py) contra um servidor de mentira em memória
+# - push da outbox: ids temporários, recusa -> _outbox_falhas, erro retentável fica na fila
+# - pull: tombstones de exclusoes apagam a linha local
+# Uso: python -m pytest -q test_espelho_local.py
+# =========================================================
+
+
+class _Resposta:
+    def __init__(self, data):
+        self.data = data
+        self.count = None
+
+
+class _Consulta:
+    # o mínimo do builder do postgrest que o espelho usa; só eq / in_ filtram de fato
+    def __init__(self, servidor: "_Servidor", tabela: str):
+        self.servidor = servidor
+        self.tabela = tabela
+        self.operacao = "select"
+        self.payload = None
+        self.filtros: list[tuple] = []
+
+    def select(self, *_, **__):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def limit(self, *_):
+        return self
+
+    def insert(self, payload):
+        self.operacao, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, **_):
+        self.operacao, self.payload = "upsert", payload
+        return self
+
+    def update(self, payload):
+        self.operacao, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.operacao = "delete"
+        return self
+
+    def _filtro(self, *filtro):
+        self.filtros.append(filtro)
+        return self
+
+    def eq(self, c, v):
+        return self._filtro("eq", c, v)
+
+    def gt(self, c, v):
+        return self._filtro("gt", c, v)
+
+    def in_(self, c, v):
+        return self._filtro("in_", c, v)
+
+    def contains(self, c, v):
+        return self._filtro("contains", c, v)
+
+    def or_(self, expr):
+        return self._filtro("or_", expr)
+
+    def _casa(self, linha: dict) -> bool:
+        for f in self.filtros:
+            if f[0] == "eq" and linha.get(f[1]) != f[2]:
+                return False
+            if f[0] == "in_" and linha.get(f[1]) not in f[2]:
+                return False
+        return True
+
+    def execute(self):
+        s = self.servidor
+        if s.erro is not None and self.operacao != "select":
+            raise s.erro
+        s.chamadas.append((self.tabela, self.operacao, self.filtros))
+        linhas = s.tabelas.setdefault(self.tabela, [])
+        if self.operacao == "select":
+            if self.tabela == "exclusoes":
+                return _Resposta([dict(r) for r in linhas if r["id"] > self.filtros[0][2]])
+            return _Resposta([dict(r) for r in linhas])
+        if self.operacao == "insert":
+            novas = [dict(r, id=next(s.ids), updated_at="2026-10-17T12:00:00") for r in self.payload]
+            linhas.extend(novas)
+            return _Resposta([dict(r) for r in novas])
+        afetadas = [r for r in linhas if self._casa(r)]
+        if self.operacao == "update":
+            for r in afetadas:
+                r.update(self.payload)
+        elif self.operacao == "delete":
+            s.tabelas[self.tabela] = [r for r in linhas if r not in afetadas]
+        return _Resposta([dict(r) for r in afetadas])
+
+
+class _Servidor:
+    def __init__(self):
+        self.tabelas: dict[str, list[dict]] = {}
+        self.chamadas: list[tuple] = []
+        self.erro: Exception | None = None
+        self.ids = iter(range(100, 1000))
+
+    def table(self, nome: str) -> _Consulta:
+        return _Consulta(self, nome)
+
+
+@pytest.fixture
+def esp(tmp_path):
+    e = EspelhoLocal(str(tmp_path / "espelho.db"))
+    yield e
+    e.conn.close()
+
+
+def _ids(esp: EspelhoLocal, tabela: str) -> list:
+    return [r["id"] for r in esp.tabela(tabela).select("*").order("id").execute().data]
+
+
+def test_insert_offline_ganha_id_real(esp):
+    sb = _Servidor()
+    temp = esp.tabela("casos").insert({"nr_doc_recebido": "OF-1", "status": "Recebido"}).execute().data[0]["id"]
+    assert temp < 0
+    esp.tabela("retornos_om").insert({"caso_id": temp, "om": "OM A", "status": "Pendente"}).execute()
+    esp.tabela("casos").update({"status": "Pendente"}).eq("id", temp).execute()
+    assert esp.pendentes() == 3
+
+    esp.sincronizar(sb)
+
+    assert esp.pendentes() == 0 and esp.ultimo_erro is None
+    (caso,) = sb.tabelas["casos"]
+    assert caso["status"] == "Pendente"  # o update foi com o id real
+    assert sb.tabelas["retornos_om"][0]["caso_id"] == caso["id"]
+    assert _ids(esp, "casos") == [caso["id"]]
+    assert esp.tabela("retornos_om").select("*").execute().data[0]["caso_id"] == caso["id"]
+    assert esp._id_map()[("casos", temp)] == caso["id"]
+
+
+def test_recusa_vai_para_falhas(esp):
+    sb = _Servidor()
+    sb.erro = APIError({"message": "new row violates row-level security policy", "code": "42501"})
+    esp.tabela("casos").insert({"nr_doc_recebido": "OF-1"}).execute()
+    esp.tabela("master_oms").insert({"nome": "OM A"}).execute()
+
+    esp.sincronizar(sb)
+
+    assert esp.pendentes() == 0 and esp.ultimo_erro is None
+    falhas = esp.falhas()
+    assert [(f["tabela"], f["operacao"]) for f in falhas] == [("casos", "insert"), ("master_oms", "insert")]
+    assert "42501" in falhas[0]["erro"]
+    assert len(_ids(esp, "casos")) == 1  # a linha local fica
+
+
+@pytest.mark.parametrize(
+    "erro",
+    [
+        APIError({"message": "JWT expired", "code": "PGRST301"}),
+        APIError({"message": "Service Unavailable", "code": 503}),
+        httpx.ConnectError("sem rede"),
+    ],
+)
+def test_erro_retentavel_fica_na_fila(esp, erro):
+    sb = _Servidor()
+    sb.erro = erro
+    esp.tabela("casos").insert({"nr_doc_recebido": "OF-1"}).execute()
+
+    esp.sincronizar(sb)
+
+    assert esp.pendentes() == 1 and esp.falhas() == []
+    assert esp.ultimo_erro
+
+    sb.erro = None
+    esp.sincronizar(sb)
+    assert esp.pendentes() == 0 and len(sb.tabelas["casos"]) == 1
+
+
+def test_tombstone_apaga_linha_local(esp):
+    sb = _Servidor()
+    sb.tabelas["casos"] = [{"id": 5, "nr_doc_recebido": "OF-5", "updated_at": "2026-10-16T10:00:00"}]
+    sb.tabelas["exclusoes"] = []
+    esp.sincronizar(sb)
+    assert _ids(esp, "casos") == [5]
+
+    sb.tabelas["casos"] = []
+    sb.tabelas["exclusoes"] = [{"id": 1, "tabela": "casos", "registro_id": 5}]
+    assert "casos" in esp.sincronizar(sb)
+    assert _ids(esp, "casos") == []
+
+
+def test_filtros_reenviados_pelo_builder(esp):
+    sb = _Servidor()
+    sb.tabelas["casos"] = [{"id": 5, "status": None, "updated_at": "2026-10-16T10:00:00"}]
+    esp.sincronizar(sb)
+    sb.chamadas.clear()
+
+    esp.tabela("casos").update({"status": "Pendente"}).or_("status.is.null,status.eq.Recebido").execute()
+    esp.tabela("casos").update({"prazo_om": "2026-11-01"}).contains("responsaveis", ["OM A"]).execute()
+    esp.tabela("casos").delete().in_("id", [5]).execute()
+    esp.sincronizar(sb)
+
+    escritas = [c for c in sb.chamadas if c[1] != "select"]
+    assert escritas == [
+        ("casos", "update", [("or_", "status.is.null,status.eq.Recebido")]),
+        ("casos", "update", [("contains", "responsaveis", ["OM A"])]),
+        ("casos", "delete", [("in_", "id", [5])]),
+    ]
+
+
+def test_filtro_sem_reenvio_recusado_ao_gravar(esp):
+    with pytest.raises(ValueError):
+        esp.tabela("casos").update({"status": "Pendente"}).filter("assunto_doc", "like", "*férias*").execute()
+    assert esp.pendentes() == 0
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import exportacao
+import visao
+
+# =========================================================
+# Exportação XLSX / CSV (exportacao.py), tudo em memória
+# - o resultado passa pelo mesmo conversor do st.download_button
+# - cor da linha = categoria de urgência da tela (visao.URGENCIA_CSS)
+# Uso: python -m pytest -q test_exportacao.py
+# =========================================================
+HOJE = date(2026, 10, 17)
+LAYOUT = [
+    ("Id", "id", "int"),
+    ("Origem", "origem", "texto"),
+    ("Prazo Final", "prazo_final", "data"),
+    ("Status", "status", "texto"),
+]
+
+
+def _paginas():
+    # duas páginas, como o keyset do app entrega
+    yield pd.DataFrame(
+        [
+            {"id": 1, "origem": "DGPM", "prazo_final": "2026-10-10", "status": "Pendente"},  # atrasado
+            {"id": 2, "origem": None, "prazo_final": "2026-10-20", "status": "Pendente"},  # vence em breve
+        ]
+    )
+    yield pd.DataFrame()
+    yield pd.DataFrame(
+        [
+            {"id": 3, "origem": "CPN", "prazo_final": "2026-12-31", "status": "Pendente"},  # ok
+            {"id": 4, "origem": "a;b \"c\"", "prazo_final": None, "status": "Resolvido"},  # resolvido
+        ]
+    )
+
+
+@pytest.mark.parametrize("formato", ["xlsx", "csv"])
+def test_saida_aceita_pelo_download_button(formato):
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+    dados = exportacao.exportar(_paginas(), LAYOUT, formato, "Teste", HOJE)
+    convertido, _ = convert_data_to_bytes_and_infer_mime(dados, RuntimeError("tipo não suportado"))
+    assert convertido == dados and len(dados) > 0
+
+
+def test_csv():
+    dados = exportacao.exportar(_paginas(), LAYOUT, "csv", hoje=HOJE)
+    assert dados.startswith(b"\xef\xbb\xbf")  # utf-8-sig: o Excel abre com acento
+    linhas = dados.decode("utf-8-sig").splitlines()
+    assert linhas == [
+        "Id;Origem;Prazo Final;Status",
+        "1;DGPM;10/10/2026;Pendente",
+        "2;-;20/10/2026;Pendente",
+        "3;CPN;31/12/2026;Pendente",
+        '4;"a;b ""c""";;Resolvido',
+    ]
+
+
+def test_xlsx_cores_por_urgencia():
+    from openpyxl import load_workbook
+
+    dados = exportacao.exportar(_paginas(), LAYOUT, "xlsx", "Acompanhamento", HOJE)
+    ws = load_workbook(io.BytesIO(dados)).active
+    assert ws.title == "Acompanhamento"
+    assert [c.value for c in ws[1]] == ["Id", "Origem", "Prazo Final", "Status"]
+
+    def fundo(urgencia: int) -> str | None:
+        cor, _ = exportacao._cores_css(visao.URGENCIA_CSS[urgencia])
+        return cor
+
+    esperado = {
+        1: fundo(visao.URG_ATRASADO),
+        2: fundo(visao.URG_VENCE_EM_BREVE),
+        3: None,
+        4: fundo(visao.URG_RESOLVIDO),
+    }
+    for linha in ws.iter_rows(min_row=2):
+        cor = esperado[linha[0].value]
+        preenchido = linha[1].fill.fill_type == "solid"
+        assert preenchido == (cor is not None)
+        if cor:
+            assert linha[1].fill.start_color.rgb.endswith(cor)
+    prazo = ws.cell(row=2, column=3)
+    assert prazo.value.date() == date(2026, 10, 10) and prazo.number_format == "DD/MM/YYYY"
+
+
+def test_cores_css():
+    assert exportacao._cores_css("background-color: #fef9c3; color: #713f12;") == ("FEF9C3", "713F12")
+    assert exportacao._cores_css("") == (None, None)
+
+
+def test_formato_invalido():
+    with pytest.raises(ValueError):
+        exportacao.exportar(_paginas(), LAYOUT, "pdf")
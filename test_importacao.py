@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import importacao
+
+# =========================================================
+# Importação Excel / CSV (importacao.py), planilhas montadas em memória
+# - datas: datetime do Excel, dd/mm/aaaa, ISO; inválidas viram erro da linha
+# - erro reportado pela linha da planilha (cabeçalho = linha 1), mesmo entre blocos
+# Uso: python -m pytest -q test_importacao.py
+# =========================================================
+INVALIDO = "Prazo Final inválido (use dd/mm/aaaa)"
+SEM_IDENT = "sem Nr Doc e sem Assunto"
+
+
+def _importar(arquivo: bytes, nome: str, linhas_por_bloco: int = importacao.LINHAS_POR_BLOCO):
+    # (válidos de todos os blocos, erros de todos os blocos), como o app acumula
+    validos, erros = [], []
+    for bloco in importacao.ler_planilha(io.BytesIO(arquivo), nome, linhas_por_bloco):
+        ok, err = importacao.validar(bloco)
+        validos.append(ok)
+        erros += err
+    return pd.concat(validos), erros
+
+
+def _xlsx(linhas: list[list]) -> bytes:
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    for r in linhas:
+        wb.active.append(r)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_xlsx_datas_e_erros_por_linha():
+    dados = _xlsx(
+        [
+            ["Nº Doc", "Assunto", "Origem", "Prazo Final", "Obs.", "Outra coluna"],
+            [1235.0, "Férias", "DGPM", datetime(2026, 11, 3), None, "x"],  # 2
+            ["Of. 2", "", "", "31/12/2026", "obs", None],  # 3
+            [None, None, None, None, None, None],  # 4: vazia, ignorada
+            [None, None, "CPN", "2026-01-05", None, None],  # 5
+            ["Of. 4", "a", None, "31/13/2026", None, None],  # 6
+            ["Of. 5", "b", None, "2026-02-30", None, None],  # 7
+            ["Of. 6", None, None, "05-01-2026", None, None],  # 8
+        ]
+    )
+    # bloco de 3 linhas: a numeração continua certa no segundo e no terceiro bloco
+    validos, erros = _importar(dados, "docs.xlsx", linhas_por_bloco=3)
+
+    assert validos.to_dict("index") == {
+        2: {"nr_doc_recebido": "1235", "assunto_doc": "Férias", "origem": "DGPM", "prazo_final": "2026-11-03", "observacoes": "-"},
+        3: {"nr_doc_recebido": "Of. 2", "assunto_doc": "-", "origem": "-", "prazo_final": "2026-12-31", "observacoes": "obs"},
+        8: {"nr_doc_recebido": "Of. 6", "assunto_doc": "-", "origem": "-", "prazo_final": "2026-01-05", "observacoes": "-"},
+    }
+    assert erros == [(5, SEM_IDENT), (6, INVALIDO), (7, INVALIDO)]
+
+
+@pytest.mark.parametrize("codificacao", ["utf-8-sig", "latin-1"])
+def test_csv(codificacao):
+    texto = "Nr Doc;Assunto;Prazo\nA1;Assunto á;05/01/2026\nA2;;\n;;xx\n;;\nA5;;5/1/26\n"
+    validos, erros = _importar(texto.encode(codificacao), "docs.csv")
+
+    assert validos["nr_doc_recebido"].to_dict() == {2: "A1", 3: "A2", 6: "A5"}
+    assert validos.loc[2, "assunto_doc"] == "Assunto á"
+    assert validos["prazo_final"].to_dict() == {2: "2026-01-05", 3: None, 6: "2026-01-05"}
+    assert erros == [(4, INVALIDO), (4, SEM_IDENT)]
+
+
+def test_csv_virgula():
+    validos, erros = _importar(b"numero,assunto,origem\n10,Reparo,CPN\n", "docs.csv")
+    assert validos.to_dict("records") == [
+        {"nr_doc_recebido": "10", "assunto_doc": "Reparo", "origem": "CPN", "prazo_final": None, "observacoes": "-"}
+    ]
+    assert erros == []
+
+
+def test_lotes_guardam_a_linha():
+    validos, _ = _importar(_xlsx([["Nr Doc"]] + [[f"Of. {i}"] for i in range(5)]), "docs.xlsx")
+    assert [linhas for linhas, _ in importacao.lotes(validos, 2)] == [[2, 3], [4, 5], [6]]
+
+
+def test_cabecalho_e_formato_invalidos():
+    with pytest.raises(ValueError):
+        list(importacao.ler_planilha(io.BytesIO(b"a;b\n1;2\n"), "docs.csv"))
+    with pytest.raises(ValueError):
+        importacao.ler_planilha(io.BytesIO(b""), "docs.ods")
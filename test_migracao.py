@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+import migrar_sqlite_para_supabase as migrar  # noqa: E402
+
+# =========================================================
+# Migração SQLite -> Postgres retomável (migrar_sqlite_para_supabase.py)
+# - SQLite temporário com o esquema do controle_docs.sqlite original
+# - a primeira execução cai no meio (erro injetado num lote); a segunda
+#   continua do checkpoint sem duplicar nem perder linha
+# Uso: python -m pytest -q test_migracao.py (Postgres: ver conftest.py)
+# =========================================================
+ORIGEM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "controle_docs.sqlite")
+DONO = "00000000-0000-0000-0000-000000000001"
+N_CASOS = 37
+
+
+@pytest.fixture
+def sqlite_legado(tmp_path):
+    caminho = str(tmp_path / "legado.sqlite")
+    with sqlite3.connect(ORIGEM) as src, sqlite3.connect(caminho) as dst:
+        for (ddl,) in src.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name <> 'sqlite_sequence'"):
+            dst.execute(ddl)
+        for i in range(1, N_CASOS + 1):
+            dst.execute(
+                "INSERT INTO casos (id, nr_doc_recebido, assunto_doc, origem, prazo_final, status, created_at) "
+                "VALUES (?, ?, ?, 'CML', '2025-12-12', 'Pendente', '2025-12-13T20:01:15')",
+                (i * 3, f"{1000 + i}", f"assunto {i}"),
+            )
+            for om in ("25 BI Pqdt", "26 BI Pqdt"):
+                dst.execute(
+                    "INSERT INTO retornos_om (caso_id, om, status, prazo_om) VALUES (?, ?, 'Pendente', '2025-12-19')",
+                    (i * 3, om),
+                )
+            if i % 5 == 0:
+                dst.execute("INSERT INTO arquivados (caso_id, archived_at) VALUES (?, '2025-12-17T22:14:20')", (i * 3,))
+        for i in range(7):
+            dst.execute("INSERT INTO master_oms (nome, created_at) VALUES (?, '2025-12-14T14:04:50')", (f"{20 + i}º BI",))
+    return caminho
+
+
+def _contagens(url: str) -> dict[str, tuple[int, int]]:
+    # (linhas, ids distintos) por tabela
+    with psycopg.connect(url) as c:
+        return {
+            t: c.execute(f"select count(*), count(distinct id) from public.{t}").fetchone()
+            for t in ("casos", "retornos_om", "arquivados", "master_oms")
+        }
+
+
+def test_retoma_do_checkpoint_sem_duplicar(banco, sqlite_legado, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", banco)
+    argv = ["--sqlite", sqlite_legado, "--lote", "10", "--owner-id", DONO]
+    checkpoint = sqlite_legado + ".migracao.json"
+
+    # cai no 7º lote: casos (4 lotes) e master_oms (1) já foram, retornos_om pela metade
+    original = migrar.load_batch
+    lotes = {"n": 0}
+
+    def load_batch_instavel(*args, **kwargs):
+        lotes["n"] += 1
+        if lotes["n"] == 7:
+            raise RuntimeError("conexão caiu")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(migrar, "load_batch", load_batch_instavel)
+    with pytest.raises(RuntimeError):
+        migrar.main(argv)
+
+    with open(checkpoint, encoding="utf-8") as f:
+        estado = json.load(f)
+    assert estado["casos"] == {"ultimo_id": N_CASOS * 3, "linhas": N_CASOS, "concluida": True}
+    assert estado["retornos_om"]["concluida"] is False
+    assert estado["retornos_om"]["linhas"] == 10  # só o lote confirmado
+    assert _contagens(banco)["retornos_om"] == (10, 10)
+
+    monkeypatch.setattr(migrar, "load_batch", original)
+    migrar.main(argv)
+    esperado = {"casos": N_CASOS, "retornos_om": N_CASOS * 2, "arquivados": N_CASOS // 5, "master_oms": 7}
+    assert _contagens(banco) == {t: (n, n) for t, n in esperado.items()}
+
+    # concluída: rodar de novo não envia nada; --reiniciar reenvia tudo por upsert, sem duplicar
+    migrar.main(argv)
+    migrar.main(argv + ["--reiniciar"])
+    assert _contagens(banco) == {t: (n, n) for t, n in esperado.items()}
+
+    with psycopg.connect(banco) as c:
+        assert c.execute("select count(*) from public.casos where owner_id = %s", (DONO,)).fetchone()[0] == N_CASOS
+        # sequence acompanha os ids migrados: o próximo insert do app não colide
+        novo = c.execute("insert into public.casos (nr_doc_recebido) values ('novo') returning id").fetchone()[0]
+        assert novo > N_CASOS * 3
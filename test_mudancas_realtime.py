@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import mudancas_realtime
+from mudancas_realtime import BroadcasterLocal, FeedMudancas
+
+# =========================================================
+# Feed de mudanças com o broadcaster local (sem rede)
+# Uso: python -m pytest -q test_mudancas_realtime.py
+# =========================================================
+
+
+def _feeds(n: int) -> tuple[BroadcasterLocal, list[FeedMudancas]]:
+    b = BroadcasterLocal()
+    feeds = [FeedMudancas(b) for _ in range(n)]
+    for f in feeds:
+        f.iniciar()
+    return b, feeds
+
+
+def test_evento_chega_em_todas_as_sessoes():
+    b, feeds = _feeds(3)
+    b.publicar("casos", "update", {"id": 7, "status": "Resolvido"}, {"id": 7})
+    for f in feeds:
+        assert f.drenar() == [
+            {"tabela": "casos", "tipo": "UPDATE", "registro": {"id": 7, "status": "Resolvido"}, "anterior": {"id": 7}}
+        ]
+        assert f.drenar() == []
+
+
+def test_ordem_e_filas_independentes():
+    b, (a, c) = _feeds(2)
+    b.publicar("casos", "INSERT", {"id": 1})
+    assert [e["registro"]["id"] for e in a.drenar()] == [1]
+    b.publicar("retornos_om", "DELETE", None, {"id": 2})
+    b.publicar("arquivados", "INSERT", {"caso_id": 1})
+    assert [e["tabela"] for e in c.drenar()] == ["casos", "retornos_om", "arquivados"]
+    assert [e["tabela"] for e in a.drenar()] == ["retornos_om", "arquivados"]
+
+
+def test_broadcaster_parado_nao_entrega():
+    b, (f,) = _feeds(1)
+    f.parar()
+    b.publicar("casos", "INSERT", {"id": 1})
+    assert f.drenar() == []
+    assert not f.ativo and not f.conectado
+
+
+def test_sessao_ociosa_solta_a_assinatura(monkeypatch):
+    b, (f,) = _feeds(1)
+    monkeypatch.setattr(mudancas_realtime, "IDLE_SEGUNDOS", -1)
+    b.publicar("casos", "INSERT", {"id": 1})
+    assert f.drenar() == []
+    assert not f.ativo
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+import espelho_local
+
+# =========================================================
+# Pendências agregadas por caso (sql/001 + 002 e as views do espelho local)
+# - só retornos com status 'Pendente' contam; caso sem pendência fica com 0
+# - caso arquivado sai da casos_dashboard
+# Uso: python -m pytest -q test_pendencias.py (Postgres: ver conftest.py)
+# =========================================================
+DONO = "00000000-0000-0000-0000-000000000001"
+CASOS = [1, 2, 3, 4]
+RETORNOS = [
+    (1, "OM A", "Pendente"),
+    (1, "OM B", "Pendente"),
+    (1, "OM C", "Respondido"),
+    (2, "OM A", "Respondido"),
+    (3, "OM A", "Pendente"),
+    (4, "OM B", "Pendente"),
+]
+ARQUIVADOS = [4]
+PENDENCIAS = {1: 2, 3: 1, 4: 1}
+DASHBOARD = {1: 2, 2: 0, 3: 1}
+
+
+def _carregar(executar, marca: str):
+    # marca: o placeholder do driver ("?" no sqlite3, "%s" no psycopg)
+    def inserir(tabela: str, linha: dict):
+        executar(f"INSERT INTO {tabela} ({', '.join(linha)}) VALUES ({', '.join([marca] * len(linha))})", list(linha.values()))
+
+    for cid in CASOS:
+        inserir("casos", {"id": cid, "owner_id": DONO, "nr_doc_recebido": f"D{cid}", "status": "Pendente"})
+    for i, (cid, om, status) in enumerate(RETORNOS, start=1):
+        inserir("retornos_om", {"id": i, "owner_id": DONO, "caso_id": cid, "om": om, "status": status})
+    for i, cid in enumerate(ARQUIVADOS, start=1):
+        inserir("arquivados", {"id": i, "owner_id": DONO, "caso_id": cid})
+
+
+def test_espelho_local(tmp_path):
+    esp = espelho_local.EspelhoLocal(str(tmp_path / "espelho.sqlite"), owner_id=DONO)
+    with esp.conn:
+        _carregar(esp.conn.execute, "?")
+    pend = esp.tabela("pendencias_por_caso").select("*").execute().data
+    assert {r["caso_id"]: r["qtd"] for r in pend} == PENDENCIAS
+    dash = esp.tabela("casos_dashboard").select("id", "pendencias_qtd").execute().data
+    assert {r["id"]: r["pendencias_qtd"] for r in dash} == DASHBOARD
+
+
+def test_servidor(banco_migrado):
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(banco_migrado, autocommit=True) as c:
+        _carregar(c.execute, "%s")
+        assert dict(c.execute("select caso_id, qtd from public.pendencias_por_caso").fetchall()) == PENDENCIAS
+        assert dict(c.execute("select id, pendencias_qtd from public.casos_dashboard").fetchall()) == DASHBOARD
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# Urgência dos casos (classificação vetorizada)
+# - calculada uma vez a partir das datas ISO cruas (prazo_final) e do status
+# - o estilo das tabelas sai da categoria, sem callback por linha no Styler
+# =========================================================
+URG_OK = 0
+URG_VENCE_EM_BREVE = 1
+URG_ATRASADO = 2
+URG_RESOLVIDO = 3
+
+DIAS_VENCE_EM_BREVE = 5
+
+URGENCIA_CSS = {
+    URG_OK: "",
+    URG_VENCE_EM_BREVE: "background-color: #fef9c3; color: #713f12;",
+    URG_ATRASADO: "background-color: #fee2e2; color: #7f1d1d;",
+    URG_RESOLVIDO: "background-color: #dcfce7; color: #14532d;",
+}
+_CSS_POR_CODIGO = np.array([URGENCIA_CSS[k] for k in sorted(URGENCIA_CSS)], dtype=object)
+
+
+def classificar_urgencia(prazo_final: pd.Series, status: pd.Series, hoje: date | None = None) -> np.ndarray:
+    hoje = hoje or date.today()
+    prazos = pd.to_datetime(prazo_final, errors="coerce")
+    dias = (prazos - pd.Timestamp(hoje)).dt.days.to_numpy(dtype="float64", na_value=np.nan)
+    resolvido = status.fillna("").astype(str).str.strip().str.lower().to_numpy() == "resolvido"
+
+    return np.select(
+        [resolvido, dias <= 0, (dias >= 1) & (dias <= DIAS_VENCE_EM_BREVE)],
+        [URG_RESOLVIDO, URG_ATRASADO, URG_VENCE_EM_BREVE],
+        default=URG_OK,
+    ).astype("int8")
+
+
+def estilos_por_urgencia(df_show: pd.DataFrame, urgencia: np.ndarray) -> pd.DataFrame:
+    css = _CSS_POR_CODIGO[np.asarray(urgencia, dtype="int64")]
+    return pd.DataFrame(
+        np.repeat(css[:, None], df_show.shape[1], axis=1),
+        index=df_show.index,
+        columns=df_show.columns,
+    )
+
+
+def estilizar(df_show: pd.DataFrame, urgencia: np.ndarray):
+    estilos = estilos_por_urgencia(df_show, urgencia)
+    return df_show.style.apply(lambda _: estilos, axis=None)
+
+
+# =========================================================
+# Tabelas de exibição (Acompanhamento / Arquivados)
+# - layout = [(título, coluna de origem, tipo)], tipo: "int" | "texto" | "data" | "qtd"
+# - datas parseadas uma vez e mantidas tipadas (o formato vai no column_config)
+# - memo pelo hash do conteúdo: rerun com os mesmos dados não refaz nada
+# =========================================================
+LAYOUT_ACOMPANHAMENTO = [
+    ("Id", "id", "int"),
+    ("Origem", "origem", "texto"),
+    ("Nr Doc (Recebido)", "nr_doc_recebido", "texto"),
+    ("Assunto (Documento)", "assunto_doc", "texto"),
+    ("Prazo Final", "prazo_final", "data"),
+    ("Nr Doc (Solicitado)", "nr_doc_solicitado", "texto"),
+    ("Assunto (Solicitação)", "assunto_solic", "texto"),
+    ("Prazo OM", "prazo_om", "data"),
+    ("Pendências (Qtd)", "pendencias_qtd", "qtd"),
+    ("Status", "status", "texto"),
+    ("Nr Doc (Resposta)", "nr_doc_resposta", "texto"),
+]
+
+LAYOUT_ARQUIVADOS = [
+    ("Id", "id", "int"),
+    ("Origem", "origem", "texto"),
+    ("Nr Doc (Recebido)", "nr_doc_recebido", "texto"),
+    ("Assunto (Documento)", "assunto_doc", "texto"),
+    ("Prazo Final", "prazo_final", "data"),
+    ("Nr Doc (Solicitado)", "nr_doc_solicitado", "texto"),
+    ("Assunto (Solicitação)", "assunto_solic", "texto"),
+    ("Prazo OM", "prazo_om", "data"),
+    ("Nr Doc (Resposta)", "nr_doc_resposta", "texto"),
+    ("Status", "status", "texto"),
+]
+
+MEMO_MAX = 16
+_MEMO: OrderedDict[tuple, tuple[pd.DataFrame, np.ndarray]] = OrderedDict()
+_MEMO_LOCK = threading.Lock()  # o memo é do processo: as sessões do Streamlit rodam em threads
+
+
+def colunas_data(layout: list[tuple[str, str, str]]) -> list[str]:
+    return [titulo for titulo, _, tipo in layout if tipo == "data"]
+
+
+def _hash_conteudo(df: pd.DataFrame, colunas: list[str]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(colunas).encode())
+    h.update(pd.util.hash_pandas_object(df[colunas], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _montar(df: pd.DataFrame, layout: list[tuple[str, str, str]], hoje: date) -> tuple[pd.DataFrame, np.ndarray]:
+    n = len(df)
+    cols: dict[str, pd.Series] = {}
+    datas: dict[str, pd.Series] = {}
+    for titulo, col, tipo in layout:
+        serie = df[col] if col in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+        if tipo == "data":
+            if col not in datas:
+                datas[col] = pd.to_datetime(serie, errors="coerce")
+            cols[titulo] = datas[col]
+        elif tipo == "int":
+            cols[titulo] = serie.astype(int)
+        elif tipo == "qtd":
+            cols[titulo] = serie.fillna(0).astype(int)
+        else:
+            cols[titulo] = serie.astype(object).where(serie.notna(), "-")
+
+    status = df["status"] if "status" in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+    prazo = datas.get("prazo_final")
+    if prazo is None:
+        prazo = df["prazo_final"] if "prazo_final" in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+    return pd.DataFrame(cols, index=df.index), classificar_urgencia(prazo, status, hoje)
+
+
+def montar_tabela(
+    df: pd.DataFrame,
+    layout: list[tuple[str, str, str]],
+    hoje: date | None = None,
+    memo: bool = True,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    # devolve (df_show, urgencia); trate o resultado como somente leitura (vem do memo)
+    # memo=False: páginas de exportação, que não se repetem e só tirariam a tela do memo
+    hoje = hoje or date.today()
+    if not memo:
+        return _montar(df, layout, hoje)
+    origem = [c for c in dict.fromkeys([col for _, col, _ in layout] + ["status", "prazo_final"]) if c in df.columns]
+    chave = (tuple(layout), hoje, _hash_conteudo(df, origem))
+
+    with _MEMO_LOCK:
+        hit = _MEMO.get(chave)
+        if hit is not None:
+            _MEMO.move_to_end(chave)
+            return hit
+
+    # monta fora do lock (outras sessões não esperam); corrida só monta duas vezes
+    res = _montar(df, layout, hoje)
+    with _MEMO_LOCK:
+        _MEMO[chave] = res
+        _MEMO.move_to_end(chave)
+        while len(_MEMO) > MEMO_MAX:
+            _MEMO.popitem(last=False)
+    return res